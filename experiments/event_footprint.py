@@ -0,0 +1,72 @@
+"""Compare per-event memory and allocations of Event vs CompactEvent.
+
+``LegacyEvent`` reproduces ``Event`` as it was before it gained ``slots=True``,
+so the before/after numbers come from the same run.
+
+Run with: PYTHONPATH=src python experiments/event_footprint.py
+"""
+
+from __future__ import annotations
+
+import tracemalloc
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, MutableMapping
+
+from legotrains.state import CompactEvent, Event, EventSeverity
+
+COUNT = 100_000
+
+
+@dataclass(frozen=True)
+class LegacyEvent:
+    type: str
+    message: str
+    severity: EventSeverity = EventSeverity.INFO
+    payload: MutableMapping[str, Any] | None = None
+    timestamp: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    sequence: int = field(default=0, compare=False)
+
+
+def make_legacy_events() -> list[LegacyEvent]:
+    return [
+        LegacyEvent(type="command", message="freight speed set to 20", payload={"train": "freight"})
+        for _ in range(COUNT)
+    ]
+
+
+def make_events() -> list[Event]:
+    return [
+        Event(type="command", message="freight speed set to 20", payload={"train": "freight"})
+        for _ in range(COUNT)
+    ]
+
+
+def make_compact_events() -> list[CompactEvent]:
+    return [
+        CompactEvent("command", "freight speed set to 20", EventSeverity.INFO, "freight")
+        for _ in range(COUNT)
+    ]
+
+
+def measure(label: str, factory: Callable[[], list]) -> None:
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    events = factory()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    stats = after.compare_to(before, "filename")
+    size = sum(stat.size_diff for stat in stats)
+    blocks = sum(stat.count_diff for stat in stats)
+    print(f"{label:>23}: {size / COUNT:7.1f} bytes/event, {blocks / COUNT:5.2f} live allocations/event")
+    del events
+
+
+def main() -> None:
+    measure("Event before (no slots)", make_legacy_events)
+    measure("Event", make_events)
+    measure("CompactEvent", make_compact_events)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Persistent cache of hub addresses learned for trains configured by name."""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import os
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable
+
+CACHE_VERSION = 1
+DEFAULT_MAX_AGE_SECONDS = 30 * 24 * 3600.0
+
+
+@dataclass(frozen=True, slots=True)
+class CachedAddress:
+    """Address a hub was last reached at, with when and through which BLE adapter."""
+
+    name: str
+    address: str
+    last_seen: float
+    adapter: str | None = None
+
+
+class AddressCache:
+    """Name-to-address map persisted as JSON so name-only trains can connect directly.
+
+    Entries recorded through a different BLE adapter or older than ``max_age``
+    seconds are ignored. A missing or unreadable file simply starts an empty
+    cache; saves replace the file atomically.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        adapter: str | None = None,
+        max_age: float | None = DEFAULT_MAX_AGE_SECONDS,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._path = path
+        self._adapter = adapter
+        self._max_age = max_age
+        self._clock = clock
+        self._entries: dict[str, CachedAddress] = {}
+
+    @classmethod
+    def load(
+        cls,
+        path: Path,
+        *,
+        adapter: str | None = None,
+        max_age: float | None = DEFAULT_MAX_AGE_SECONDS,
+        clock: Callable[[], float] = time.time,
+    ) -> AddressCache:
+        cache = cls(path, adapter=adapter, max_age=max_age, clock=clock)
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+            entries = data["entries"] if data.get("version") == CACHE_VERSION else {}
+            for key, raw in entries.items():
+                cache._entries[key] = CachedAddress(
+                    name=str(raw["name"]),
+                    address=str(raw["address"]),
+                    last_seen=float(raw["last_seen"]),
+                    adapter=raw.get("adapter"),
+                )
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            cache._entries.clear()
+        return cache
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, name: str) -> CachedAddress | None:
+        """Usable entry for ``name``, if any."""
+
+        entry = self._entries.get(name.lower())
+        if entry is None or entry.adapter != self._adapter:
+            return None
+        if self._max_age is not None and self._clock() - entry.last_seen > self._max_age:
+            return None
+        return entry
+
+    def remember(self, name: str, address: str) -> bool:
+        """Record ``address`` for ``name``; returns True when the entry changed."""
+
+        key = name.lower()
+        previous = self._entries.get(key)
+        self._entries[key] = CachedAddress(name, address, self._clock(), self._adapter)
+        return previous is None or previous.address != address or previous.adapter != self._adapter
+
+    def forget(self, name: str) -> bool:
+        return self._entries.pop(name.lower(), None) is not None
+
+    def save(self) -> None:
+        payload = {
+            "version": CACHE_VERSION,
+            "entries": {key: asdict(entry) for key, entry in self._entries.items()},
+        }
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        handle, temp_name = tempfile.mkstemp(dir=self._path.parent, prefix=f".{self._path.name}.")
+        try:
+            with os.fdopen(handle, "w", encoding="utf-8") as stream:
+                json.dump(payload, stream, indent=2, sort_keys=True)
+            os.replace(temp_name, self._path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.unlink(temp_name)
+            raise
+
+
+__all__ = ["AddressCache", "CachedAddress"]
@@ -0,0 +1,172 @@
+"""Per-train mailbox that coalesces speed commands before they reach the hub."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import time
+from dataclasses import dataclass, field
+from enum import Enum, auto
+from typing import Awaitable, Callable, Protocol
+
+
+class CommandOutcome(Enum):
+    """How a posted command ended: written to the hub, or replaced before it was."""
+
+    WRITTEN = auto()
+    SUPERSEDED = auto()
+
+
+class SpeedController(Protocol):
+    async def set_speed(self, identifier: str, speed: int) -> None: ...
+
+    async def stop(self, identifier: str) -> None: ...
+
+
+@dataclass(slots=True)
+class _Slot:
+    speed: int | None = None
+    speed_waiters: list[asyncio.Future[CommandOutcome]] = field(default_factory=list)
+    stop: bool = False
+    stop_waiters: list[asyncio.Future[CommandOutcome]] = field(default_factory=list)
+    target: int | None = None
+    last_write: float | None = None
+    wake: asyncio.Event = field(default_factory=asyncio.Event)
+    worker: asyncio.Task[None] | None = None
+
+
+class CommandMailbox:
+    """Latest-value-wins delivery of speed commands, one writer per train.
+
+    A speed posted while an earlier one is still waiting replaces it; the earlier
+    caller's future resolves to ``CommandOutcome.SUPERSEDED`` and only the write
+    that actually happens resolves to ``WRITTEN`` (or its error). Speed writes
+    per train are spaced at least ``1 / max_write_rate`` seconds apart. Stops
+    skip the rate limit, are never coalesced away, and are written before any
+    speed that is still waiting; a pending speed posted before the stop is
+    discarded in its favour.
+    """
+
+    def __init__(
+        self,
+        controller: SpeedController,
+        *,
+        max_write_rate: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._controller = controller
+        self._min_interval = 0.0
+        self.max_write_rate = max_write_rate
+        self._clock = clock
+        self._slots: dict[str, _Slot] = {}
+        self.coalesced = 0
+
+    @property
+    def max_write_rate(self) -> float | None:
+        """Speed writes per train per second; changes apply from the next write."""
+
+        return 1.0 / self._min_interval if self._min_interval else None
+
+    @max_write_rate.setter
+    def max_write_rate(self, value: float | None) -> None:
+        if value is not None and value <= 0:
+            raise ValueError("max_write_rate must be positive.")
+        self._min_interval = 1.0 / value if value else 0.0
+
+    def target(self, identifier: str) -> int | None:
+        """Newest speed posted for ``identifier`` that has not settled yet."""
+
+        slot = self._slots.get(identifier)
+        return slot.target if slot else None
+
+    def post_speed(self, identifier: str, speed: int) -> asyncio.Future[CommandOutcome]:
+        slot = self._slot(identifier)
+        future: asyncio.Future[CommandOutcome] = asyncio.get_running_loop().create_future()
+        if slot.speed is not None:
+            self.coalesced += 1
+            _supersede(slot.speed_waiters)
+        slot.speed = speed
+        slot.speed_waiters = [future]
+        slot.target = speed
+        self._kick(identifier, slot)
+        return future
+
+    def post_stop(self, identifier: str) -> asyncio.Future[CommandOutcome]:
+        slot = self._slot(identifier)
+        future: asyncio.Future[CommandOutcome] = asyncio.get_running_loop().create_future()
+        if slot.speed is not None:
+            # The stop overrides the speed that was still waiting.
+            self.coalesced += 1
+            _supersede(slot.speed_waiters)
+            slot.speed, slot.speed_waiters = None, []
+        slot.stop = True
+        slot.stop_waiters.append(future)
+        slot.target = 0
+        self._kick(identifier, slot)
+        return future
+
+    async def close(self) -> None:
+        workers = [slot.worker for slot in self._slots.values() if slot.worker]
+        for worker in workers:
+            worker.cancel()
+        for worker in workers:
+            with contextlib.suppress(asyncio.CancelledError):
+                await worker
+        for slot in self._slots.values():
+            for future in slot.speed_waiters + slot.stop_waiters:
+                future.cancel()
+        self._slots.clear()
+
+    def _slot(self, identifier: str) -> _Slot:
+        slot = self._slots.get(identifier)
+        if slot is None:
+            slot = self._slots[identifier] = _Slot()
+        return slot
+
+    def _kick(self, identifier: str, slot: _Slot) -> None:
+        slot.wake.set()
+        if slot.worker is None or slot.worker.done():
+            slot.worker = asyncio.get_running_loop().create_task(self._drain(identifier, slot))
+
+    async def _drain(self, identifier: str, slot: _Slot) -> None:
+        while slot.stop or slot.speed is not None:
+            if slot.stop:
+                waiters, slot.stop, slot.stop_waiters = slot.stop_waiters, False, []
+                await self._write(waiters, self._controller.stop(identifier))
+                continue
+            if slot.last_write is not None:
+                delay = slot.last_write + self._min_interval - self._clock()
+                if delay > 0:
+                    # A stop posted meanwhile wakes us up and goes first.
+                    slot.wake.clear()
+                    with contextlib.suppress(asyncio.TimeoutError):
+                        await asyncio.wait_for(slot.wake.wait(), timeout=delay)
+                    continue
+            speed, waiters = slot.speed, slot.speed_waiters
+            slot.speed, slot.speed_waiters = None, []
+            assert speed is not None
+            slot.last_write = self._clock()
+            await self._write(waiters, self._controller.set_speed(identifier, speed))
+        slot.target = None
+
+    @staticmethod
+    async def _write(waiters: list[asyncio.Future[CommandOutcome]], write: Awaitable[None]) -> None:
+        try:
+            await write
+        except Exception as exc:
+            for future in waiters:
+                if not future.done():
+                    future.set_exception(exc)
+        else:
+            for future in waiters:
+                if not future.done():
+                    future.set_result(CommandOutcome.WRITTEN)
+
+
+def _supersede(waiters: list[asyncio.Future[CommandOutcome]]) -> None:
+    for future in waiters:
+        if not future.done():
+            future.set_result(CommandOutcome.SUPERSEDED)
+
+
+__all__ = ["CommandMailbox", "CommandOutcome", "SpeedController"]
@@ -11,15 +11,24 @@ import re
 import yaml
 
 DEFAULT_CONFIG_PATH: Final[Path] = Path.home() / ".legotrains.yaml"
+DEFAULT_ADDRESS_CACHE_PATH: Final[Path] = Path.home() / ".legotrains-addresses.json"
 CONFIG_ENV_VAR: Final[str] = "LEGOTRAINS_CONFIG_FILE"
 TRAIN_MAC_ENV_PREFIX: Final[str] = "LEGOTRAINS_TRAIN_"
 BLE_ADAPTER_ENV: Final[str] = "LEGOTRAINS_BLE_ADAPTER"
 BLE_SCAN_INTERVAL_ENV: Final[str] = "LEGOTRAINS_BLE_SCAN_INTERVAL"
 BLE_CONNECT_TIMEOUT_ENV: Final[str] = "LEGOTRAINS_BLE_CONNECT_TIMEOUT"
+BLE_MAX_CONCURRENT_CONNECTS_ENV: Final[str] = "LEGOTRAINS_BLE_MAX_CONCURRENT_CONNECTS"
+BLE_MAX_WRITE_RATE_ENV: Final[str] = "LEGOTRAINS_BLE_MAX_WRITE_RATE"
 HARDWARE_ADAPTER_ENV: Final[str] = "LEGOTRAINS_HARDWARE_ADAPTER"
+JOURNAL_DIR_ENV: Final[str] = "LEGOTRAINS_JOURNAL_DIR"
+ADDRESS_CACHE_ENV: Final[str] = "LEGOTRAINS_ADDRESS_CACHE"
 
 DEFAULT_SCAN_INTERVAL_SECONDS: Final[float] = 2.5
 DEFAULT_CONNECT_TIMEOUT_SECONDS: Final[float] = 8.0
+DEFAULT_MAX_CONCURRENT_CONNECTS: Final[int] = 2
+DEFAULT_MAX_WRITE_RATE: Final[float] = 20.0  # speed writes per second per hub
+HARDWARE_ADAPTERS: Final[tuple[str, ...]] = ("pylgbst", "lwp3")
+DEFAULT_HARDWARE_ADAPTER: Final[str] = "pylgbst"
 
 DEFAULT_TRAINS: Final[tuple[dict[str, str | None]], ...] = (
     {"id": "freight", "name": "FreightTrain", "hub_mac": None},
@@ -55,6 +64,8 @@ class BLEConfig:
     adapter: str | None
     scan_interval: float
     connect_timeout: float
+    max_concurrent_connects: int = DEFAULT_MAX_CONCURRENT_CONNECTS
+    max_write_rate: float = DEFAULT_MAX_WRITE_RATE
 
 
 @dataclass(frozen=True)
@@ -64,13 +75,16 @@ class AppConfig:
     trains: tuple[TrainConfig, ...]
     ble: BLEConfig
     log_level: str
+    journal_dir: Path | None = None
+    hardware_adapter: str = DEFAULT_HARDWARE_ADAPTER
+    address_cache: Path | None = None
 
 
 def load_config(path: Path | None = None, env: Mapping[str, str] | None = None) -> AppConfig:
     """Load configuration from YAML and environment overrides."""
 
     env_map: MutableMapping[str, str] = dict(os.environ if env is None else env)
-    config_path = _resolve_config_path(path, env_map)
+    config_path = resolve_config_path(path, env_map)
     data = _load_yaml(config_path)
 
     trains = _parse_trains(data.get("trains"))
@@ -78,11 +92,30 @@ def load_config(path: Path | None = None, env: Mapping[str, str] | None = None)
 
     ble = _parse_ble(data.get("ble"), env_map)
     log_level = (data.get("log_level") or env_map.get("LEGOTRAINS_LOG_LEVEL") or "INFO").upper()
+    journal_raw = env_map.get(JOURNAL_DIR_ENV) or data.get("journal_dir")
+    journal_dir = Path(str(journal_raw)).expanduser() if journal_raw else None
+    hardware_adapter = str(
+        env_map.get(HARDWARE_ADAPTER_ENV) or data.get("hardware_adapter") or DEFAULT_HARDWARE_ADAPTER
+    ).lower()
+    if hardware_adapter not in HARDWARE_ADAPTERS:
+        raise ConfigError(
+            f"Unknown hardware adapter `{hardware_adapter}`; expected one of {', '.join(HARDWARE_ADAPTERS)}."
+        )
+
+    return AppConfig(
+        trains=trains,
+        ble=ble,
+        log_level=log_level,
+        journal_dir=journal_dir,
+        hardware_adapter=hardware_adapter,
+        address_cache=_parse_address_cache(data, env_map),
+    )
 
-    return AppConfig(trains=trains, ble=ble, log_level=log_level)
 
+def resolve_config_path(path_override: Path | None = None, env: Mapping[str, str] | None = None) -> Path:
+    """Return the config file ``load_config`` would read for these arguments."""
 
-def _resolve_config_path(path_override: Path | None, env_map: Mapping[str, str]) -> Path:
+    env_map = os.environ if env is None else env
     if path_override is not None:
         return path_override
     env_path = env_map.get(CONFIG_ENV_VAR)
@@ -91,6 +124,59 @@ def _resolve_config_path(path_override: Path | None, env_map: Mapping[str, str])
     return DEFAULT_CONFIG_PATH
 
 
+@dataclass(frozen=True)
+class ConfigDiff:
+    """Structural difference between two ``AppConfig`` values."""
+
+    added: tuple[TrainConfig, ...] = ()
+    removed: tuple[TrainConfig, ...] = ()
+    changed: tuple[TrainConfig, ...] = ()  # new configs of trains whose name or MAC changed
+    scan_interval: float | None = None
+    connect_timeout: float | None = None
+    max_write_rate: float | None = None
+    restart_required: tuple[str, ...] = ()  # names of changed settings that only apply at startup
+
+    @property
+    def is_empty(self) -> bool:
+        return not (
+            self.added
+            or self.removed
+            or self.changed
+            or self.scan_interval is not None
+            or self.connect_timeout is not None
+            or self.max_write_rate is not None
+            or self.restart_required
+        )
+
+
+def diff_configs(old: AppConfig, new: AppConfig) -> ConfigDiff:
+    """Compare trains by identifier and the remaining settings of ``old`` and ``new``."""
+
+    startup_settings = {
+        "ble.adapter": (old.ble.adapter, new.ble.adapter),
+        "ble.max_concurrent_connects": (old.ble.max_concurrent_connects, new.ble.max_concurrent_connects),
+        "hardware_adapter": (old.hardware_adapter, new.hardware_adapter),
+        "address_cache": (old.address_cache, new.address_cache),
+        "journal_dir": (old.journal_dir, new.journal_dir),
+        "log_level": (old.log_level, new.log_level),
+    }
+    old_trains = {train.identifier: train for train in old.trains}
+    new_trains = {train.identifier: train for train in new.trains}
+    return ConfigDiff(
+        added=tuple(train for identifier, train in new_trains.items() if identifier not in old_trains),
+        removed=tuple(train for identifier, train in old_trains.items() if identifier not in new_trains),
+        changed=tuple(
+            train
+            for identifier, train in new_trains.items()
+            if identifier in old_trains and old_trains[identifier] != train
+        ),
+        scan_interval=new.ble.scan_interval if new.ble.scan_interval != old.ble.scan_interval else None,
+        connect_timeout=new.ble.connect_timeout if new.ble.connect_timeout != old.ble.connect_timeout else None,
+        max_write_rate=new.ble.max_write_rate if new.ble.max_write_rate != old.ble.max_write_rate else None,
+        restart_required=tuple(name for name, (before, after) in startup_settings.items() if before != after),
+    )
+
+
 def _load_yaml(path: Path) -> dict[str, Any]:
     if not path.exists():
         return {}
@@ -104,6 +190,17 @@ def _load_yaml(path: Path) -> dict[str, Any]:
     return data
 
 
+def _parse_address_cache(data: Mapping[str, Any], env_map: Mapping[str, str]) -> Path | None:
+    """Cache file path; ``off`` (or ``false``/null in YAML) disables the cache."""
+
+    raw = env_map[ADDRESS_CACHE_ENV] if ADDRESS_CACHE_ENV in env_map else data.get(
+        "address_cache", DEFAULT_ADDRESS_CACHE_PATH
+    )
+    if raw is None or raw is False or str(raw).strip().lower() in ("", "off", "false", "none"):
+        return None
+    return Path(str(raw)).expanduser()
+
+
 def _parse_trains(raw: Any) -> tuple[TrainConfig, ...]:
     source: Sequence[Any]
     if raw is None:
@@ -170,20 +267,41 @@ def _parse_ble(raw: Any, env_map: Mapping[str, str]) -> BLEConfig:
         default=DEFAULT_CONNECT_TIMEOUT_SECONDS,
     )
 
+    max_concurrent = _read_float(
+        key=BLE_MAX_CONCURRENT_CONNECTS_ENV,
+        env_map=env_map,
+        default=DEFAULT_MAX_CONCURRENT_CONNECTS,
+    )
+    max_write_rate = _read_float(
+        key=BLE_MAX_WRITE_RATE_ENV,
+        env_map=env_map,
+        default=DEFAULT_MAX_WRITE_RATE,
+    )
+
     if isinstance(raw, Mapping):
         adapter = str(raw.get("adapter")) if raw.get("adapter") is not None else adapter
         scan_interval = _read_numeric_config(raw.get("scan_interval"), scan_interval, "scan_interval")
         connect_timeout = _read_numeric_config(raw.get("connect_timeout"), connect_timeout, "connect_timeout")
+        max_concurrent = _read_numeric_config(
+            raw.get("max_concurrent_connects"), max_concurrent, "max_concurrent_connects"
+        )
+        max_write_rate = _read_numeric_config(raw.get("max_write_rate"), max_write_rate, "max_write_rate")
 
     if scan_interval <= 0:
         raise ConfigError("scan_interval must be greater than zero.")
     if connect_timeout <= 0:
         raise ConfigError("connect_timeout must be greater than zero.")
+    if max_concurrent < 1 or max_concurrent != int(max_concurrent):
+        raise ConfigError("max_concurrent_connects must be a positive integer.")
+    if max_write_rate <= 0:
+        raise ConfigError("max_write_rate must be greater than zero.")
 
     return BLEConfig(
         adapter=(adapter or None),
         scan_interval=scan_interval,
         connect_timeout=connect_timeout,
+        max_concurrent_connects=int(max_concurrent),
+        max_write_rate=max_write_rate,
     )
 
 
@@ -215,8 +333,12 @@ def _is_valid_mac(value: str) -> bool:
 __all__ = [
     "AppConfig",
     "BLEConfig",
+    "ConfigDiff",
     "TrainConfig",
     "ConfigError",
+    "diff_configs",
     "load_config",
+    "resolve_config_path",
     "DEFAULT_CONFIG_PATH",
+    "DEFAULT_ADDRESS_CACHE_PATH",
 ]
@@ -0,0 +1,114 @@
+"""Polls the config file and applies changes to running services."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import os
+from pathlib import Path
+from typing import Awaitable, Callable, Mapping
+
+from .config import AppConfig, ConfigDiff, ConfigError, diff_configs, load_config
+from .state import Event, EventBus, EventSeverity
+
+ConfigApplier = Callable[[AppConfig, ConfigDiff], Awaitable[None]]
+
+
+class ConfigWatcher:
+    """Reloads ``path`` when its mtime or size changes and hands over the diff.
+
+    Polling keeps this dependency-free; a parse error leaves the running
+    configuration in place and is reported on the event bus.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        config: AppConfig,
+        apply: ConfigApplier,
+        *,
+        env: Mapping[str, str] | None = None,
+        interval: float = 1.0,
+        event_bus: EventBus | None = None,
+    ) -> None:
+        self._path = path
+        self._config = config
+        self._apply = apply
+        self._env = env
+        self._interval = interval
+        self._event_bus = event_bus
+        self._signature = self._stat()
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def config(self) -> AppConfig:
+        return self._config
+
+    def start(self) -> None:
+        if self._task and not self._task.done():
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def check(self) -> ConfigDiff | None:
+        """Reload if the file changed; returns the applied diff, if any."""
+
+        signature = self._stat()
+        if signature == self._signature:
+            return None
+        self._signature = signature
+        if not self._has_content():
+            # Missing or blank usually means an editor is mid-save (or the file
+            # was removed); loading it would fall back to the default trains.
+            self._publish(
+                f"Config file {self._path} is missing or empty; keeping the running configuration",
+                EventSeverity.WARNING,
+            )
+            return None
+        try:
+            config = load_config(self._path, self._env)
+        except ConfigError as exc:
+            self._publish(f"Config reload failed: {exc}", EventSeverity.ERROR)
+            return None
+        diff = diff_configs(self._config, config)
+        if diff.is_empty:
+            self._config = config
+            return None
+        await self._apply(config, diff)
+        self._config = config  # only once applied, so a failed apply is retried by the next diff
+        self._publish(f"Config reloaded from {self._path}", EventSeverity.INFO)
+        return diff
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._interval)
+            try:
+                await self.check()
+            except Exception as exc:  # keep watching after a failed apply
+                self._publish(f"Config reload failed: {exc}", EventSeverity.ERROR)
+
+    def _has_content(self) -> bool:
+        try:
+            return bool(self._path.read_bytes().strip())
+        except OSError:
+            return False
+
+    def _stat(self) -> tuple[int, int] | None:
+        try:
+            stat = os.stat(self._path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _publish(self, message: str, severity: EventSeverity) -> None:
+        if self._event_bus:
+            self._event_bus.publish_nowait(Event(type="config_reload", message=message, severity=severity))
+
+
+__all__ = ["ConfigApplier", "ConfigWatcher"]
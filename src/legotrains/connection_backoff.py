@@ -0,0 +1,107 @@
+"""Per-hub retry backoff with jitter and a circuit breaker."""
+
+from __future__ import annotations
+
+import random
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+
+class ConnectionBackoffError(RuntimeError):
+    """Raised when a connect is refused because the hub is backing off."""
+
+    def __init__(self, identifier: str, retry_in: float, *, circuit_open: bool) -> None:
+        reason = "circuit open" if circuit_open else "backing off"
+        super().__init__(f"{identifier}: {reason}, retry in {retry_in:.1f}s")
+        self.identifier = identifier
+        self.retry_in = retry_in
+        self.circuit_open = circuit_open
+
+
+@dataclass(frozen=True)
+class BackoffPolicy:
+    """Delays are ``base * factor ** (failures - 1)`` capped at ``max_delay``.
+
+    ``jitter`` is the fraction of the delay that is randomized (0.5 means the
+    actual delay is drawn from [0.5 * delay, delay]). After ``failure_threshold``
+    consecutive failures the circuit opens for ``cooldown`` seconds; the first
+    attempt after that decides whether it closes again.
+    """
+
+    base: float = 1.0
+    factor: float = 2.0
+    max_delay: float = 60.0
+    jitter: float = 0.5
+    failure_threshold: int = 5
+    cooldown: float = 300.0
+
+
+@dataclass(slots=True)
+class _HubBackoff:
+    failures: int = 0
+    retry_at: float = 0.0
+    circuit_open: bool = False
+
+
+class ConnectionBackoff:
+    """Tracks consecutive connect failures per hub and when to try again."""
+
+    def __init__(
+        self,
+        policy: BackoffPolicy | None = None,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+        rng: random.Random | None = None,
+    ) -> None:
+        self._policy = policy or BackoffPolicy()
+        self._clock = clock
+        self._rng = rng or random.Random()
+        self._hubs: dict[str, _HubBackoff] = {}
+
+    @property
+    def policy(self) -> BackoffPolicy:
+        return self._policy
+
+    def check(self, identifier: str) -> None:
+        """Raise ``ConnectionBackoffError`` if ``identifier`` may not be tried yet."""
+
+        hub = self._hubs.get(identifier)
+        if hub is None:
+            return
+        remaining = hub.retry_at - self._clock()
+        if remaining > 0:
+            raise ConnectionBackoffError(identifier, remaining, circuit_open=hub.circuit_open)
+
+    def is_open(self, identifier: str) -> bool:
+        hub = self._hubs.get(identifier)
+        return bool(hub and hub.circuit_open)
+
+    def failures(self, identifier: str) -> int:
+        hub = self._hubs.get(identifier)
+        return hub.failures if hub else 0
+
+    def record_success(self, identifier: str) -> None:
+        self._hubs.pop(identifier, None)
+
+    def record_failure(self, identifier: str) -> bool:
+        """Schedule the next attempt; returns True when this failure opened the circuit."""
+
+        policy = self._policy
+        hub = self._hubs.setdefault(identifier, _HubBackoff())
+        hub.failures += 1
+        was_open = hub.circuit_open
+        if hub.failures >= policy.failure_threshold:
+            hub.circuit_open = True
+            delay = policy.cooldown
+        else:
+            delay = min(policy.max_delay, policy.base * policy.factor ** (hub.failures - 1))
+            delay *= 1 - policy.jitter * self._rng.random()
+        hub.retry_at = self._clock() + delay
+        return hub.circuit_open and not was_open
+
+    def reset(self, identifier: str) -> None:
+        self._hubs.pop(identifier, None)
+
+
+__all__ = ["BackoffPolicy", "ConnectionBackoff", "ConnectionBackoffError"]
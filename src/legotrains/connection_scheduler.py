@@ -0,0 +1,88 @@
+"""Bounded-concurrency dispatch of hub connection attempts."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+from typing import Any, Awaitable, Callable
+
+from .config import DEFAULT_MAX_CONCURRENT_CONNECTS
+
+
+class ConnectionScheduler:
+    """Runs connect calls in the background with at most ``max_concurrent`` in flight.
+
+    Requests for an identifier that is already queued or connecting are ignored,
+    so repeated scans do not pile up attempts for the same hub. Failures are left
+    to ``connect`` to report (the connection manager publishes
+    ``hub_connect_failed``); the next scan simply submits again.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[..., Awaitable[None]],
+        *,
+        max_concurrent: int = DEFAULT_MAX_CONCURRENT_CONNECTS,
+    ) -> None:
+        if max_concurrent < 1:
+            raise ValueError("max_concurrent must be at least 1.")
+        self._connect = connect
+        self._max_concurrent = max_concurrent
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._tasks: dict[str, asyncio.Task[None]] = {}
+        self._in_flight = 0
+
+    @property
+    def max_concurrent(self) -> int:
+        return self._max_concurrent
+
+    @property
+    def pending(self) -> frozenset[str]:
+        """Identifiers queued or currently connecting."""
+
+        return frozenset(self._tasks)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def submit(self, identifier: str, **kwargs: Any) -> bool:
+        """Schedule a connect for ``identifier``; False if one is already pending."""
+
+        if identifier in self._tasks:
+            return False
+        task = asyncio.get_running_loop().create_task(self._run(identifier, kwargs))
+        self._tasks[identifier] = task
+        return True
+
+    async def join(self) -> None:
+        """Wait until every submitted connect has finished."""
+
+        while self._tasks:
+            await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+
+    async def stop(self) -> None:
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        self._tasks.clear()
+
+    async def _run(self, identifier: str, kwargs: dict[str, Any]) -> None:
+        try:
+            async with self._semaphore:
+                self._in_flight += 1
+                try:
+                    await self._connect(identifier, **kwargs)
+                except Exception:  # reported by the connect callable
+                    pass
+                finally:
+                    self._in_flight -= 1
+        finally:
+            if self._tasks.get(identifier) is asyncio.current_task():
+                del self._tasks[identifier]
+
+
+__all__ = ["ConnectionScheduler"]
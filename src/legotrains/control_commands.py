@@ -2,9 +2,12 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+import asyncio
+from dataclasses import dataclass, field
 from typing import Protocol
 
+from .command_mailbox import CommandMailbox, CommandOutcome
+from .config import DEFAULT_MAX_WRITE_RATE
 from .control_input import CommandType, InputCommand
 from .hardware_registry import HubRegistry
 from .state import Event, EventBus, EventSeverity
@@ -27,43 +30,57 @@ class TrainCommandHandler:
     registry: HubRegistry
     connections: ConnectionController
     event_bus: EventBus | None = None
+    max_write_rate: float | None = DEFAULT_MAX_WRITE_RATE
+    _mailbox: CommandMailbox = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._mailbox = CommandMailbox(self.connections, max_write_rate=self.max_write_rate)
+
+    @property
+    def mailbox(self) -> CommandMailbox:
+        return self._mailbox
 
     async def handle(self, cmd: InputCommand) -> None:
+        """Apply ``cmd`` and wait until its hub write has completed or been superseded."""
+
+        await self.submit(cmd)
+
+    def submit(self, cmd: InputCommand) -> asyncio.Future[None]:
+        """Queue ``cmd`` without waiting for the hub; used for key repeat in the UI.
+
+        Speed changes are relative to the newest queued target, so repeated steps
+        accumulate even while earlier writes are still pending.
+        """
+
         train = self.registry.get(cmd.train_id)
-        current_speed = train.state.speed
+        pending = self._mailbox.target(cmd.train_id)
+        current_speed = train.state.speed if pending is None else pending
 
         if cmd.command == CommandType.SPEED_STEP:
-            delta = cmd.value or 0
-            target = clamp_speed(current_speed + delta)
-            if await self._try_set_speed(cmd.train_id, target):
-                await self._log(f"{cmd.train_id} speed set to {target}")
+            target = clamp_speed(current_speed + (cmd.value or 0))
+            write = self._mailbox.post_speed(cmd.train_id, target)
+            message = f"{cmd.train_id} speed set to {target}"
         elif cmd.command == CommandType.SPEED_MAX:
             target = clamp_speed(cmd.value or 0)
-            if await self._try_set_speed(cmd.train_id, target):
-                await self._log(f"{cmd.train_id} max speed {target}")
+            write = self._mailbox.post_speed(cmd.train_id, target)
+            message = f"{cmd.train_id} max speed {target}"
         elif cmd.command == CommandType.SPEED_STOP:
-            if await self._try_stop(cmd.train_id):
-                await self._log(f"{cmd.train_id} stopped", severity=EventSeverity.INFO)
+            write = self._mailbox.post_stop(cmd.train_id)
+            message = f"{cmd.train_id} stopped"
         else:
             raise ValueError(f"Unsupported command: {cmd.command}")
+        return asyncio.ensure_future(self._report(write, message))
 
-    async def _log(self, message: str, *, severity: EventSeverity = EventSeverity.INFO) -> None:
-        if not self.event_bus:
-            return
-        await self.event_bus.publish(Event(type="command", message=message, severity=severity))
-
-    async def _try_set_speed(self, train_id: str, speed: int) -> bool:
+    async def _report(self, write: asyncio.Future[CommandOutcome], message: str) -> None:
         try:
-            await self.connections.set_speed(train_id, speed)
-            return True
+            outcome = await write
         except RuntimeError as exc:
             await self._log(str(exc), severity=EventSeverity.WARNING)
-            return False
+        else:
+            if outcome is CommandOutcome.WRITTEN:  # a superseded command never reached the hub
+                await self._log(message)
 
-    async def _try_stop(self, train_id: str) -> bool:
-        try:
-            await self.connections.stop(train_id)
-            return True
-        except RuntimeError as exc:
-            await self._log(str(exc), severity=EventSeverity.WARNING)
-            return False
+    async def _log(self, message: str, *, severity: EventSeverity = EventSeverity.INFO) -> None:
+        if not self.event_bus:
+            return
+        self.event_bus.publish_nowait(Event(type="command", message=message, severity=severity))
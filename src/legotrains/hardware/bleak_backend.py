@@ -18,6 +18,7 @@ class BleakScannerBackend(ScannerBackend):
             ScanResult(
                 address=device.address,
                 name=getattr(device, "name", None),
+                device=device,
             )
             for device in devices
         ]
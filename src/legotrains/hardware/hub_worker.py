@@ -0,0 +1,123 @@
+"""Single-thread, ordered executor dedicated to one hub."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Callable, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True, slots=True)
+class HubWorkerMetrics:
+    """Snapshot of a worker's queue; waits are seconds spent queued before running."""
+
+    queue_depth: int
+    max_queue_depth: int
+    completed: int
+    total_wait: float
+    max_wait: float
+
+    @property
+    def mean_wait(self) -> float:
+        return self.total_wait / self.completed if self.completed else 0.0
+
+
+class HubWorker:
+    """Runs blocking hub calls on one private thread, in submission order.
+
+    Each hub gets its own worker, so a slow connect or write on one hub never
+    delays or reorders commands for another, unlike the loop's shared default
+    executor.
+    """
+
+    def __init__(self, name: str, *, clock: Callable[[], float] = time.perf_counter) -> None:
+        self._name = name
+        self._clock = clock
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"legotrains-hub-{name}")
+        self._lock = threading.Lock()
+        self._depth = 0
+        self._max_depth = 0
+        self._completed = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    def metrics(self) -> HubWorkerMetrics:
+        with self._lock:
+            return HubWorkerMetrics(
+                queue_depth=self._depth,
+                max_queue_depth=self._max_depth,
+                completed=self._completed,
+                total_wait=self._total_wait,
+                max_wait=self._max_wait,
+            )
+
+    async def run(
+        self,
+        func: Callable[..., T],
+        *args: Any,
+        discard: Callable[[T], None] | None = None,
+    ) -> T:
+        """Run ``func(*args)`` on the hub thread after everything submitted before it.
+
+        Cancelling the await cannot stop a call that is already running; when
+        that call later succeeds its result is handed to ``discard`` (on the hub
+        thread) so resources such as a freshly connected hub are not leaked.
+        """
+
+        with self._lock:
+            self._depth += 1
+            self._max_depth = max(self._max_depth, self._depth)
+        submitted = self._clock()
+        try:
+            future = self._executor.submit(self._call, submitted, func, args)
+        except RuntimeError:  # worker already shut down
+            with self._lock:
+                self._depth -= 1
+            raise
+        future.add_done_callback(self._release_if_cancelled)
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            if discard is not None:
+                future.add_done_callback(partial(_discard_late_result, discard))
+            raise
+
+    def shutdown(self, *, wait: bool = False) -> None:
+        self._executor.shutdown(wait=wait)
+
+    def _release_if_cancelled(self, future: Future[Any]) -> None:
+        if future.cancelled():  # never reached _call, which does the bookkeeping
+            with self._lock:
+                self._depth -= 1
+
+    def _call(self, submitted: float, func: Callable[..., T], args: tuple[Any, ...]) -> T:
+        waited = self._clock() - submitted
+        try:
+            return func(*args)
+        finally:
+            with self._lock:
+                self._depth -= 1
+                self._completed += 1
+                self._total_wait += waited
+                self._max_wait = max(self._max_wait, waited)
+
+
+def _discard_late_result(discard: Callable[[T], None], future: Future[T]) -> None:
+    if future.cancelled() or future.exception() is not None:
+        return
+    with contextlib.suppress(Exception):
+        discard(future.result())
+
+
+__all__ = ["HubWorker", "HubWorkerMetrics"]
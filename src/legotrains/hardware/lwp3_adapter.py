@@ -0,0 +1,334 @@
+"""Native asyncio hub adapter speaking LEGO Wireless Protocol 3 over bleak."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Protocol
+
+from bleak import BleakClient, BleakScanner
+
+from ..hardware_connection import HubAdapter, HubSession
+from ..state import EventBus
+
+LWP3_SERVICE_UUID = "00001623-1212-efde-1623-785feabcd123"
+LWP3_CHARACTERISTIC_UUID = "00001624-1212-efde-1623-785feabcd123"
+
+MSG_HUB_ATTACHED_IO = 0x04
+MSG_PORT_OUTPUT_COMMAND = 0x81
+MSG_PORT_OUTPUT_FEEDBACK = 0x82
+
+IO_EVENT_DETACHED = 0x00
+IO_EVENT_ATTACHED = 0x01
+# Device types that accept StartPower on mode 0: medium/train motors and the
+# Powered Up / Technic motors commonly fitted to trains.
+MOTOR_IO_TYPES = frozenset({0x0001, 0x0002, 0x0026, 0x002E, 0x002F, 0x0030, 0x0031, 0x0041, 0x004B, 0x004C})
+
+FEEDBACK_IN_PROGRESS = 0x01
+FEEDBACK_COMPLETED = 0x02
+FEEDBACK_DISCARDED = 0x04
+FEEDBACK_IDLE = 0x08
+
+STARTUP_IMMEDIATE_WITH_FEEDBACK = 0x11
+SUBCMD_WRITE_DIRECT_MODE_DATA = 0x51
+DEFAULT_MOTOR_PORT = 0x00  # port A
+MOTOR_FLOAT = 0
+PORT_DISCOVERY_TIMEOUT = 1.0
+DEFAULT_PIPELINE_DEPTH = 4
+FEEDBACK_TIMEOUT = 0.5
+
+
+class GattClient(Protocol):
+    """Subset of ``bleak.BleakClient`` used by the adapter."""
+
+    @property
+    def is_connected(self) -> bool: ...
+
+    async def connect(self) -> Any: ...
+
+    async def disconnect(self) -> Any: ...
+
+    async def start_notify(self, char_specifier: str, callback: Callable[[Any, bytearray], Any]) -> None: ...
+
+    async def write_gatt_char(
+        self,
+        char_specifier: str,
+        data: bytes,
+        response: bool | None = None,
+    ) -> None: ...
+
+
+GattClientFactory = Callable[[Any, Callable[[Any], None]], GattClient]
+DeviceResolver = Callable[[str], Awaitable[Any]]
+
+
+def encode_message(message_type: int, payload: bytes) -> bytes:
+    """Frame ``payload`` with the common LWP3 header (length, hub id 0, type)."""
+
+    length = len(payload) + 3
+    if length > 127:
+        raise ValueError("LWP3 messages longer than 127 bytes are not supported.")
+    return bytes((length, 0x00, message_type)) + payload
+
+
+def encode_start_power(port: int, power: int) -> bytes:
+    """Port Output Command: WriteDirectModeData(mode 0, power %) on ``port``."""
+
+    power = max(-100, min(100, power))
+    return encode_message(
+        MSG_PORT_OUTPUT_COMMAND,
+        bytes((port, STARTUP_IMMEDIATE_WITH_FEEDBACK, SUBCMD_WRITE_DIRECT_MODE_DATA, 0x00, power & 0xFF)),
+    )
+
+
+def decode_attached_io(message: bytes) -> tuple[int, int, int | None] | None:
+    """Return ``(port, event, io_type)`` for a Hub Attached I/O message."""
+
+    if len(message) < 5 or message[2] != MSG_HUB_ATTACHED_IO:
+        return None
+    port, event = message[3], message[4]
+    if event == IO_EVENT_DETACHED or len(message) < 7:
+        return port, event, None
+    return port, event, int.from_bytes(message[5:7], "little")
+
+
+def decode_port_feedback(message: bytes) -> list[tuple[int, int]]:
+    """Return ``(port, flags)`` pairs from a Port Output Command Feedback message."""
+
+    if len(message) < 5 or message[2] != MSG_PORT_OUTPUT_FEEDBACK:
+        return []
+    body = message[3 : message[0]]
+    return [(body[index], body[index + 1]) for index in range(0, len(body) - 1, 2)]
+
+
+@dataclass(slots=True)
+class PipelineStats:
+    """Counters for motor commands reconciled against port output feedback."""
+
+    sent: int = 0
+    completed: int = 0
+    discarded: int = 0
+    unacknowledged: int = 0  # given up on after ``feedback_timeout``
+
+
+@dataclass(slots=True)
+class _Outstanding:
+    sequence: int
+    power: int
+    sent_at: float
+
+
+class Lwp3HubSession(HubSession):
+    """Session writing motor commands straight to the hub characteristic from the loop.
+
+    Writes are pipelined: each command is sent without response and gets a
+    sequence number, and up to ``pipeline_depth`` commands may be waiting for
+    Port Output Command Feedback at once. Feedback is matched to the oldest
+    outstanding command (the hub reports in order); a command whose feedback
+    never arrives is written off after ``feedback_timeout`` so a lost
+    notification cannot stall the pipeline. ``pipeline_depth=1`` gives the
+    classic one-command-per-acknowledgement behaviour.
+    """
+
+    def __init__(
+        self,
+        client: GattClient,
+        *,
+        port: int = DEFAULT_MOTOR_PORT,
+        pipeline_depth: int = DEFAULT_PIPELINE_DEPTH,
+        feedback_timeout: float = FEEDBACK_TIMEOUT,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if pipeline_depth < 1:
+            raise ValueError("pipeline_depth must be at least 1.")
+        self._client = client
+        self._port = port
+        self._pipeline_depth = pipeline_depth
+        self._feedback_timeout = feedback_timeout
+        self._clock = clock
+        self._disconnect_callbacks: list[Callable[[], None]] = []
+        self._outstanding: deque[_Outstanding] = deque()
+        self._sequence = 0
+        self._slot_freed = asyncio.Event()
+        self._write_lock = asyncio.Lock()
+        self.stats = PipelineStats()
+        self.acknowledged_power: int | None = None
+
+    @property
+    def port(self) -> int:
+        return self._port
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._outstanding)
+
+    async def set_speed(self, speed: int) -> None:
+        await self._send_power(speed)
+
+    async def stop(self) -> None:
+        await self._send_power(MOTOR_FLOAT)
+
+    async def flush(self) -> None:
+        """Wait until every command sent so far has been reconciled."""
+
+        while self._outstanding:
+            await self._wait_for_slot(0)
+
+    async def close(self) -> None:
+        await self._client.disconnect()
+
+    async def probe(self) -> None:
+        if not self._client.is_connected:
+            raise RuntimeError("Hub is no longer connected")
+
+    def add_disconnect_callback(self, callback: Callable[[], None]) -> None:
+        self._disconnect_callbacks.append(callback)
+
+    def handle_notification(self, message: bytes) -> None:
+        """Reconcile outstanding commands with a Port Output Command Feedback message."""
+
+        for port, flags in decode_port_feedback(message):
+            if port != self._port:
+                continue
+            if flags & FEEDBACK_DISCARDED:
+                self._reconcile(completed=False)
+            if flags & FEEDBACK_COMPLETED:
+                self._reconcile(completed=True)
+
+    def _handle_disconnect(self) -> None:
+        for callback in tuple(self._disconnect_callbacks):
+            callback()
+
+    def _reconcile(self, *, completed: bool) -> None:
+        if not self._outstanding:
+            return
+        command = self._outstanding.popleft()
+        if completed:
+            self.stats.completed += 1
+            self.acknowledged_power = command.power
+        else:
+            self.stats.discarded += 1
+        self._slot_freed.set()
+
+    async def _send_power(self, power: int) -> None:
+        async with self._write_lock:  # keeps sequence order equal to write order
+            await self._wait_for_slot(self._pipeline_depth - 1)
+            if not self._client.is_connected:
+                raise RuntimeError("Hub is not connected")
+            self._sequence += 1
+            self._outstanding.append(_Outstanding(self._sequence, power, self._clock()))
+            self.stats.sent += 1
+            try:
+                await self._client.write_gatt_char(
+                    LWP3_CHARACTERISTIC_UUID, encode_start_power(self._port, power), response=False
+                )
+            except BaseException:
+                self._outstanding.pop()
+                self.stats.sent -= 1
+                raise
+
+    async def _wait_for_slot(self, limit: int) -> None:
+        """Wait until at most ``limit`` commands are outstanding."""
+
+        while len(self._outstanding) > limit:
+            oldest = self._outstanding[0]
+            remaining = oldest.sent_at + self._feedback_timeout - self._clock()
+            if remaining <= 0:
+                self._outstanding.popleft()
+                self.stats.unacknowledged += 1
+                continue
+            self._slot_freed.clear()
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._slot_freed.wait(), timeout=remaining)
+
+
+class Lwp3Adapter(HubAdapter):
+    """``HubAdapter`` for Powered Up hubs that needs no threads or pylgbst.
+
+    After connecting it subscribes to hub notifications and picks the first
+    motor the hub announces via Hub Attached I/O, falling back to port A if
+    none shows up within ``port_timeout`` seconds.
+    """
+
+    def __init__(
+        self,
+        *,
+        event_bus: EventBus | None = None,
+        adapter: str | None = None,
+        client_factory: GattClientFactory | None = None,
+        resolve_device: DeviceResolver | None = None,
+        port_timeout: float = PORT_DISCOVERY_TIMEOUT,
+        pipeline_depth: int = DEFAULT_PIPELINE_DEPTH,
+    ) -> None:
+        self._event_bus = event_bus
+        self._adapter = adapter
+        self._client_factory = client_factory or self._bleak_client
+        self._resolve_device = resolve_device or self._find_device
+        self._port_timeout = port_timeout
+        self._pipeline_depth = pipeline_depth
+
+    async def connect(self, target: str, *, device: Any | None = None) -> HubSession:
+        if device is None:
+            device = await self._resolve_device(target)
+        if device is None:
+            raise RuntimeError(f"No hub found for {target}")
+        session: Lwp3HubSession | None = None
+
+        def on_disconnect(_: Any) -> None:
+            if session is not None:
+                session._handle_disconnect()
+
+        client = self._client_factory(device, on_disconnect)
+        await client.connect()
+        motor_port: asyncio.Future[int] = asyncio.get_running_loop().create_future()
+
+        def on_notify(_: Any, data: bytearray) -> None:
+            message = bytes(data)
+            if len(message) > 2 and message[2] == MSG_PORT_OUTPUT_FEEDBACK:
+                if session is not None:
+                    session.handle_notification(message)
+                return
+            attached = decode_attached_io(message)
+            if attached and not motor_port.done():
+                port, event, io_type = attached
+                if event == IO_EVENT_ATTACHED and io_type in MOTOR_IO_TYPES:
+                    motor_port.set_result(port)
+
+        try:
+            await client.start_notify(LWP3_CHARACTERISTIC_UUID, on_notify)
+            port = DEFAULT_MOTOR_PORT
+            with contextlib.suppress(asyncio.TimeoutError):
+                port = await asyncio.wait_for(motor_port, timeout=self._port_timeout)
+        except BaseException:
+            with contextlib.suppress(Exception):
+                await client.disconnect()
+            raise
+        if self._event_bus:
+            await self._event_bus.log(f"Connected to {target} over LWP3 (motor port {port})")
+        session = Lwp3HubSession(client, port=port, pipeline_depth=self._pipeline_depth)
+        return session
+
+    def _bleak_client(self, device: Any, on_disconnect: Callable[[Any], None]) -> GattClient:
+        kwargs: dict[str, Any] = {"adapter": self._adapter} if self._adapter else {}
+        return BleakClient(device, disconnected_callback=on_disconnect, **kwargs)
+
+    async def _find_device(self, target: str) -> Any:
+        kwargs: dict[str, Any] = {"adapter": self._adapter} if self._adapter else {}
+        if ":" in target:
+            return await BleakScanner.find_device_by_address(target, **kwargs)
+        return await BleakScanner.find_device_by_name(target, **kwargs)
+
+
+__all__ = [
+    "GattClient",
+    "Lwp3Adapter",
+    "Lwp3HubSession",
+    "PipelineStats",
+    "decode_attached_io",
+    "decode_port_feedback",
+    "encode_message",
+    "encode_start_power",
+]
@@ -3,8 +3,8 @@
 from __future__ import annotations
 
 import asyncio
-from dataclasses import dataclass
-from typing import Callable, Optional
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
 
 from pylgbst import get_connection_bleak
 from pylgbst.hub import MoveHub
@@ -12,6 +12,7 @@ from pylgbst.peripherals import EncodedMotor
 
 from ..state import Event, EventBus, EventSeverity
 from ..hardware_connection import HubAdapter, HubSession
+from .hub_worker import HubWorker
 
 
 def _resolve_connection_target(target: str) -> tuple[Optional[str], Optional[str]]:
@@ -24,6 +25,7 @@ def _resolve_connection_target(target: str) -> tuple[Optional[str], Optional[str
 class PylgbstHubSession(HubSession):
     hub: MoveHub
     event_bus: EventBus | None = None
+    worker: HubWorker = field(default_factory=lambda: HubWorker("session"))
 
     def __post_init__(self) -> None:
         self._motor: EncodedMotor | None = None
@@ -33,8 +35,6 @@ class PylgbstHubSession(HubSession):
         if self._motor:
             return self._motor
 
-        loop = asyncio.get_running_loop()
-
         def _load_motor() -> EncodedMotor:
             motor = self.hub.motor_A or self.hub.motor_B or self.hub.motor_external
             if not motor:
@@ -43,25 +43,34 @@ class PylgbstHubSession(HubSession):
 
         async with self._lock:
             if not self._motor:
-                self._motor = await loop.run_in_executor(None, _load_motor)
+                self._motor = await self.worker.run(_load_motor)
                 if self.event_bus:
                     await self.event_bus.publish(Event(type="hub_ready", message="Motor initialized"))
             return self._motor
 
     async def set_speed(self, speed: int) -> None:
         motor = await self._ensure_motor()
-        loop = asyncio.get_running_loop()
-        await loop.run_in_executor(None, motor.power, speed / 100.0)
+        await self.worker.run(motor.power, speed / 100.0)
 
     async def stop(self) -> None:
         if not self._motor:
             return
-        loop = asyncio.get_running_loop()
-        await loop.run_in_executor(None, self._motor.stop)
+        await self.worker.run(self._motor.stop)
 
     async def close(self) -> None:
-        loop = asyncio.get_running_loop()
-        await loop.run_in_executor(None, self.hub.disconnect)
+        try:
+            await self.worker.run(self.hub.disconnect)
+        finally:
+            self.worker.shutdown()
+
+    async def probe(self) -> None:
+        """Raise if the underlying pylgbst connection reports it is no longer alive."""
+
+        is_alive = getattr(self.hub.connection, "is_alive", None)
+        if is_alive is None:
+            return
+        if not await self.worker.run(is_alive):
+            raise RuntimeError("Hub connection is no longer alive")
 
 
 class PylgbstAdapter(HubAdapter):
@@ -76,15 +85,29 @@ class PylgbstAdapter(HubAdapter):
         self._connection_factory = connection_factory
         self._hub_cls = hub_cls
 
-    async def connect(self, target: str) -> HubSession:
-        hub_mac, hub_name = _resolve_connection_target(target)
+    async def connect(self, target: str, *, device: Any | None = None) -> HubSession:
+        # pylgbst only accepts a MAC, so the advertisement's address is the most
+        # of ``device`` it can use; matching by address ends its discovery on the
+        # first advertisement from the hub instead of waiting on the name.
+        if device is not None:
+            hub_mac, hub_name = device.address, None
+        else:
+            hub_mac, hub_name = _resolve_connection_target(target)
         if self._event_bus:
             await self._event_bus.log(f"Found mac:{hub_mac} name:{hub_name} - connecting...")
-        loop = asyncio.get_running_loop()
+        # The hub's own worker also performs the connect, so a slow connect
+        # only ever blocks this hub.
+        worker = HubWorker(target)
 
         def _connect() -> MoveHub:
             connection = self._connection_factory(hub_mac=hub_mac, hub_name=hub_name)
             return self._hub_cls(connection)
 
-        hub = await loop.run_in_executor(None, _connect)
-        return PylgbstHubSession(hub=hub, event_bus=self._event_bus)
+        try:
+            # A connect that outlives the caller's timeout would otherwise leave
+            # the hub connected (and no longer advertising) with nobody to close it.
+            hub = await worker.run(_connect, discard=lambda late: late.disconnect())
+        except BaseException:
+            worker.shutdown()
+            raise
+        return PylgbstHubSession(hub=hub, event_bus=self._event_bus, worker=worker)
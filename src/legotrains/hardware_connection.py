@@ -3,11 +3,21 @@
 from __future__ import annotations
 
 import asyncio
+import contextlib
+import time
+from collections.abc import AsyncIterator, Callable, Iterable, Mapping
 from dataclasses import dataclass, field
-from typing import Protocol
+from typing import Any, Protocol, runtime_checkable
 
+from .address_cache import AddressCache, CachedAddress
+from .config import DEFAULT_CONNECT_TIMEOUT_SECONDS, TrainConfig
+from .connection_backoff import ConnectionBackoff
 from .hardware_registry import HubRegistry
-from .state import Event, EventBus, EventSeverity, HubConnectionState, StateStore
+from .state import AppState, Event, EventBus, EventSeverity, HubConnectionState, StateStore
+
+
+LOST_SESSION_CLOSE_TIMEOUT_SECONDS = 2.0
+LOSS_PROBE_TIMEOUT_SECONDS = 2.0
 
 
 class HubSession(Protocol):
@@ -20,10 +30,29 @@ class HubSession(Protocol):
     async def close(self) -> None: ...
 
 
+@runtime_checkable
+class DisconnectNotifier(Protocol):
+    """Session that can report a dropped link; the callback may fire on any thread."""
+
+    def add_disconnect_callback(self, callback: Callable[[], None]) -> None: ...
+
+
+@runtime_checkable
+class ProbeableSession(Protocol):
+    """Session offering a cheap liveness check that raises when the link is gone."""
+
+    async def probe(self) -> None: ...
+
+
 class HubAdapter(Protocol):
-    """Protocol for creating hub sessions."""
+    """Protocol for creating hub sessions.
+
+    ``device`` is the backend's handle for the hub from the scan that found it
+    (e.g. a bleak ``BLEDevice``); adapters that can use it connect straight away
+    instead of discovering the hub again.
+    """
 
-    async def connect(self, target: str) -> HubSession: ...
+    async def connect(self, target: str, *, device: Any | None = None) -> HubSession: ...
 
 
 @dataclass
@@ -31,6 +60,20 @@ class _ConnectionRecord:
     identifier: str
     session: HubSession | None = None
     lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    commanded_speed: int = 0
+
+
+@dataclass(frozen=True)
+class GroupActuation:
+    """Outcome of a group command.
+
+    ``skew`` is the spread in seconds between the first and the last successful
+    write completing.
+    """
+
+    succeeded: tuple[str, ...]
+    failed: Mapping[str, Exception]
+    skew: float
 
 
 class HubConnectionManager:
@@ -44,6 +87,9 @@ class HubConnectionManager:
         event_bus: EventBus | None = None,
         loop: asyncio.AbstractEventLoop | None = None,
         state_store: StateStore | None = None,
+        connect_timeout: float | None = DEFAULT_CONNECT_TIMEOUT_SECONDS,
+        backoff: ConnectionBackoff | None = None,
+        address_cache: AddressCache | None = None,
     ) -> None:
         self._registry = registry
         self._adapter = adapter
@@ -54,17 +100,138 @@ class HubConnectionManager:
         self._event_bus = event_bus
         self._loop = loop
         self._state_store = state_store
+        self.connect_timeout = connect_timeout
+        self._backoff = backoff or ConnectionBackoff()
+        self._address_cache = address_cache
+        self._loss_listeners: list[Callable[[str], None]] = []
+        self._background: set[asyncio.Task[None]] = set()
+
+    @property
+    def backoff(self) -> ConnectionBackoff:
+        return self._backoff
+
+    @property
+    def address_cache(self) -> AddressCache | None:
+        return self._address_cache
+
+    def add_session_lost_listener(self, listener: Callable[[str], None]) -> None:
+        """Call ``listener(identifier)`` on the loop whenever a live session is lost."""
+
+        self._loss_listeners.append(listener)
+
+    def remove_session_lost_listener(self, listener: Callable[[str], None]) -> None:
+        with contextlib.suppress(ValueError):
+            self._loss_listeners.remove(listener)
+
+    def has_train(self, identifier: str) -> bool:
+        """True until ``remove_train`` has fully completed for ``identifier``."""
+
+        return identifier in self._connections
+
+    def active_sessions(self) -> dict[str, HubSession]:
+        return {
+            identifier: record.session
+            for identifier, record in self._connections.items()
+            if record.session
+        }
+
+    async def add_train(self, config: TrainConfig) -> None:
+        """Register a new train without touching existing sessions."""
+
+        registered = self._registry.add_train(config)
+        self._connections[config.identifier] = _ConnectionRecord(identifier=config.identifier)
+        if self._state_store:
+            await self._state_store.upsert_trains((registered.state,))
+        await self._publish_event(
+            Event(
+                type="train_added",
+                message=f"Added {config.identifier}",
+                severity=EventSeverity.INFO,
+                payload={"train": config.identifier},
+            )
+        )
+
+    async def remove_train(self, identifier: str) -> None:
+        """Disconnect (if needed) and forget ``identifier``; other sessions are untouched."""
+
+        record = self._connections[identifier]
+        async with record.lock:
+            if record.session:
+                session, record.session = record.session, None
+                await self._close_reporting_errors(identifier, session)
+            if identifier in self._registry:  # already gone when retrying a failed removal
+                self._registry.remove_train(identifier)
+            self._backoff.reset(identifier)
+            if self._state_store:
+                await self._state_store.remove_train(identifier)
+            # Dropped last, so a failure above leaves the train fully registered.
+            del self._connections[identifier]
+        await self._publish_event(
+            Event(
+                type="train_removed",
+                message=f"Removed {identifier}",
+                severity=EventSeverity.INFO,
+                payload={"train": identifier},
+            )
+        )
+
+    async def update_train(self, config: TrainConfig) -> None:
+        """Apply a changed config; only reconnects when the hub match target changed."""
+
+        record = self._connections[config.identifier]
+        reconnect = False
+        async with record.lock:
+            previous = self._registry.get(config.identifier)
+            self._registry.update_config(config)
+            retarget = previous.config.match_identifier != config.match_identifier
+            if retarget:
+                self._backoff.reset(config.identifier)
+            if record.session and retarget:
+                session, record.session = record.session, None
+                await self._close_reporting_errors(config.identifier, session)
+                reconnect = True
+                self._registry.update_hub_state(
+                    config.identifier, connection_state=HubConnectionState.DISCONNECTED
+                )
+            await self._sync_state_store(config.identifier)
+        if reconnect:
+            # Failures are already reported as hub_connect_failed; the scanner retries.
+            with contextlib.suppress(Exception):
+                await self.connect(config.identifier)
 
     async def handle_discovery(self, identifier: str) -> None:
         await self.connect(identifier)
 
-    async def connect(self, identifier: str, *, rssi: float | None = None) -> None:
+    async def connect(self, identifier: str, *, rssi: float | None = None, device: Any | None = None) -> None:
+        """Open a session for ``identifier``.
+
+        ``device`` is passed through to the adapter when the caller already has
+        the hub's advertisement, sparing the adapter a discovery scan. Without
+        one, a train configured only by name is dialled at its cached address;
+        if that fails the entry is dropped (without backing the hub off) so the
+        next attempt goes back to name discovery.
+
+        Each attempt is bounded by ``connect_timeout``. After a failure the hub is
+        backed off (exponentially, with jitter) and repeated failures open a
+        circuit for a cooldown; attempts in either window raise
+        ``ConnectionBackoffError`` without touching the adapter.
+        """
+
+        await self._open(identifier, rssi=rssi, device=device, settle=True)
+
+    async def _open(self, identifier: str, *, rssi: float | None, device: Any | None, settle: bool) -> None:
+        """Body of ``connect``; with ``settle=False`` a success leaves the backoff to the caller."""
+
         record = self._connections[identifier]
         async with record.lock:
-            if record.session:
+            if record.session or self._connections.get(identifier) is not record:
                 return
+            self._backoff.check(identifier)
             train = self._registry.get(identifier)
             target = train.config.match_identifier
+            cached = self._cached_address(train.config) if device is None else None
+            if cached is not None:
+                target = cached.address
             await self._update_state(identifier, HubConnectionState.CONNECTING, rssi=rssi)
             await self._publish_event(
                 Event(
@@ -75,19 +242,42 @@ class HubConnectionManager:
                 )
             )
             try:
-                session = await self._adapter.connect(target)
+                attempt = (
+                    self._adapter.connect(target, device=device)
+                    if device is not None
+                    else self._adapter.connect(target)
+                )
+                session = await asyncio.wait_for(attempt, timeout=self.connect_timeout)
             except Exception as exc:
+                reason: object = exc
+                if isinstance(exc, asyncio.TimeoutError):
+                    reason = f"timed out after {self.connect_timeout:g}s"
+                if cached is not None:
+                    await self._forget_address(train.config)
+                    reason = f"cached address {cached.address}: {reason}"
+                opened = cached is None and self._backoff.record_failure(identifier)
                 await self._update_state(identifier, HubConnectionState.DISCONNECTED, rssi=rssi)
                 await self._publish_event(
                     Event(
                         type="hub_connect_failed",
-                        message=f"Failed to connect {identifier}: {exc}",
+                        message=f"Failed to connect {identifier}: {reason}",
                         severity=EventSeverity.ERROR,
                         payload={"train": identifier},
                     )
                 )
+                if opened:
+                    await self._publish_circuit_open(identifier)
                 raise
+            if settle:
+                self._backoff.record_success(identifier)
+            learned = cached.address if cached else getattr(device, "address", None)
+            await self._remember_address(train.config, learned)
             record.session = session
+            if isinstance(session, DisconnectNotifier):
+                loop = asyncio.get_running_loop()
+                session.add_disconnect_callback(
+                    lambda: loop.call_soon_threadsafe(self._spawn_session_lost, identifier, session)
+                )
             await self._update_state(identifier, HubConnectionState.CONNECTED, rssi=rssi)
             await self._publish_event(
                 Event(
@@ -98,6 +288,47 @@ class HubConnectionManager:
                 )
             )
 
+    async def _publish_circuit_open(self, identifier: str) -> None:
+        await self._publish_event(
+            Event(
+                type="hub_circuit_open",
+                message=(
+                    f"Pausing connects to {identifier} for "
+                    f"{self._backoff.policy.cooldown:g}s after repeated failures"
+                ),
+                severity=EventSeverity.WARNING,
+                payload={"train": identifier},
+            )
+        )
+
+    def _cached_address(self, config: TrainConfig) -> CachedAddress | None:
+        if self._address_cache is None or config.hub_mac:
+            return None
+        return self._address_cache.get(config.name)
+
+    async def _remember_address(self, config: TrainConfig, address: str | None) -> None:
+        if self._address_cache is None or config.hub_mac or not address:
+            return
+        self._address_cache.remember(config.name, address)
+        await self._save_address_cache()
+
+    async def _forget_address(self, config: TrainConfig) -> None:
+        if self._address_cache is not None and self._address_cache.forget(config.name):
+            await self._save_address_cache()
+
+    async def _save_address_cache(self) -> None:
+        assert self._address_cache is not None
+        try:
+            self._address_cache.save()
+        except OSError as exc:
+            await self._publish_event(
+                Event(
+                    type="address_cache_error",
+                    message=f"Could not save {self._address_cache.path}: {exc}",
+                    severity=EventSeverity.WARNING,
+                )
+            )
+
     async def disconnect(self, identifier: str) -> None:
         record = self._connections[identifier]
         async with record.lock:
@@ -115,21 +346,82 @@ class HubConnectionManager:
                 )
             )
 
+    async def reconnect(self, identifier: str) -> None:
+        """Connect again and re-send the last commanded speed.
+
+        The hub only counts as recovered once the speed is restored: a failed
+        restore is recorded against the backoff, so a hub that connects and then
+        fails straight away still ends up behind the circuit breaker.
+        """
+
+        self._backoff.check(identifier)
+        await self._open(identifier, rssi=None, device=None, settle=False)
+        speed = self._connections[identifier].commanded_speed
+        try:
+            if speed:
+                await self.set_speed(identifier, speed)
+        except Exception:
+            if self._backoff.record_failure(identifier):
+                await self._publish_circuit_open(identifier)
+            raise
+        self._backoff.record_success(identifier)
+
+    async def session_lost(self, identifier: str, session: HubSession, reason: object) -> None:
+        """Drop ``session`` after a link failure; stale reports for old sessions are ignored."""
+
+        record = self._connections.get(identifier)
+        if record is None or record.session is not session:
+            return
+        record.session = None
+        await self._update_state(identifier, HubConnectionState.DISCONNECTED)
+        await self._publish_event(
+            Event(
+                type="hub_lost",
+                message=f"Lost connection to {identifier}: {reason}",
+                severity=EventSeverity.WARNING,
+                payload={"train": identifier},
+            )
+        )
+        for listener in tuple(self._loss_listeners):
+            listener(identifier)
+        # Closing goes last and in the background: a session whose link died
+        # mid-write may never finish closing (pylgbst queues close behind the
+        # hung write), and that must not hold up the state or the listeners.
+        self._track(asyncio.get_running_loop().create_task(self._close_lost_session(session)))
+
     async def set_speed(self, identifier: str, speed: int) -> None:
         session = await self._require_session(identifier)
-        await session.set_speed(speed)
-        self._registry.set_speed(identifier, speed)
-        await self._sync_state_store()
+        await self._actuate(identifier, session, speed, stop=False)
 
     async def stop(self, identifier: str) -> None:
         session = await self._require_session(identifier)
-        await session.stop()
-        self._registry.set_speed(identifier, 0)
-        await self._sync_state_store()
+        await self._actuate(identifier, session, 0, stop=True)
+
+    async def set_speeds(self, speeds: Mapping[str, int]) -> GroupActuation:
+        """Write every speed in ``speeds`` concurrently and commit them as one state update."""
+
+        return await self._actuate_group({identifier: (speed, False) for identifier, speed in speeds.items()})
+
+    async def stop_many(self, identifiers: Iterable[str]) -> GroupActuation:
+        """Stop several trains concurrently; see ``set_speeds``."""
+
+        return await self._actuate_group({identifier: (0, True) for identifier in identifiers})
+
+    async def wait_until_connected(self, identifier: str, *, timeout: float | None = None) -> None:
+        """Wait until ``identifier`` reports CONNECTED; raises ``TimeoutError``."""
+
+        if not self._state_store:
+            raise RuntimeError("Waiting for connections requires a state store.")
+        await self._state_store.wait_for(
+            lambda state: _is_connected(state, identifier),
+            trains=(identifier,),
+            timeout=timeout,
+        )
 
     async def shutdown(self) -> None:
-        for identifier in list(self._connections):
-            await self.disconnect(identifier)
+        async with self._state_transaction():
+            for identifier in list(self._connections):
+                await self.disconnect(identifier)
 
     async def _require_session(self, identifier: str) -> HubSession:
         record = self._connections[identifier]
@@ -144,19 +436,122 @@ class HubConnectionManager:
         *,
         rssi: float | None = None,
     ) -> None:
-        self._registry.update_hub_state(identifier, connection_state=connection_state, rssi=rssi)
-        await self._sync_state_store()
+        previous = self._registry.get(identifier).state.hub
+        hub = self._registry.update_hub_state(identifier, connection_state=connection_state, rssi=rssi)
+        if hub is not previous:
+            await self._sync_state_store(identifier)
+
+    async def _actuate(self, identifier: str, session: HubSession, speed: int, *, stop: bool) -> None:
+        self._connections[identifier].commanded_speed = speed
+        try:
+            await (session.stop() if stop else session.set_speed(speed))
+        except Exception as exc:
+            if await self._link_lost(session):
+                await self.session_lost(identifier, session, exc)
+            raise
+        previous = self._registry.get(identifier).state
+        if self._registry.set_speed(identifier, speed) is not previous:
+            await self._sync_state_store(identifier)
+
+    @staticmethod
+    async def _link_lost(session: HubSession) -> bool:
+        """After a failed write, tell a dead link from a command the hub rejected.
+
+        Sessions that cannot be probed are assumed lost.
+        """
+
+        if not isinstance(session, ProbeableSession):
+            return True
+        try:
+            await asyncio.wait_for(session.probe(), timeout=LOSS_PROBE_TIMEOUT_SECONDS)
+        except Exception:
+            return True
+        return False
+
+    async def _actuate_group(self, commands: Mapping[str, tuple[int, bool]]) -> GroupActuation:
+        sessions: dict[str, HubSession] = {}
+        failed: dict[str, Exception] = {}
+        for identifier in commands:
+            try:
+                sessions[identifier] = await self._require_session(identifier)
+            except (KeyError, RuntimeError) as exc:
+                failed[identifier] = exc
+        completed: dict[str, float] = {}
+
+        async def actuate(identifier: str) -> None:
+            speed, stop = commands[identifier]
+            try:
+                await self._actuate(identifier, sessions[identifier], speed, stop=stop)
+            except Exception as exc:
+                failed[identifier] = exc
+            else:
+                completed[identifier] = time.perf_counter()
+
+        async with self._state_transaction():
+            await asyncio.gather(*(actuate(identifier) for identifier in sessions))
+        times = completed.values()
+        return GroupActuation(
+            succeeded=tuple(identifier for identifier in commands if identifier in completed),
+            failed=failed,
+            skew=max(times) - min(times) if times else 0.0,
+        )
+
+    def _spawn_session_lost(self, identifier: str, session: HubSession) -> None:
+        self._track(
+            asyncio.get_running_loop().create_task(self.session_lost(identifier, session, "link dropped"))
+        )
+
+    def _track(self, task: asyncio.Task[None]) -> None:
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _close_reporting_errors(self, identifier: str, session: HubSession) -> None:
+        """Close ``session`` for good; a failing or hanging close is only reported."""
+
+        try:
+            await asyncio.wait_for(session.close(), timeout=LOST_SESSION_CLOSE_TIMEOUT_SECONDS)
+        except Exception as exc:
+            reason = "timed out" if isinstance(exc, asyncio.TimeoutError) else exc
+            await self._publish_event(
+                Event(
+                    type="hub_close_failed",
+                    message=f"Closing the session for {identifier} failed: {reason}",
+                    severity=EventSeverity.WARNING,
+                    payload={"train": identifier},
+                )
+            )
+
+    async def _close_lost_session(self, session: HubSession) -> None:
+        with contextlib.suppress(Exception):
+            await asyncio.wait_for(session.close(), timeout=LOST_SESSION_CLOSE_TIMEOUT_SECONDS)
 
     async def _publish_event(self, event: Event) -> None:
         if not self._event_bus:
             return
-        loop = self._loop or asyncio.get_event_loop()
-        if loop.is_running():
-            await self._event_bus.publish(event)
-        else:  # pragma: no cover
-            asyncio.run(self._event_bus.publish(event))
+        self._event_bus.publish_nowait(event)
+
+    async def _sync_state_store(self, *identifiers: str) -> None:
+        """Push registry state for ``identifiers`` (or every train) into the store."""
+
+        if not self._state_store:
+            return
+        if identifiers:
+            states = tuple(self._registry.get(identifier).state for identifier in identifiers)
+        else:
+            states = self._registry.train_states()
+        await self._state_store.upsert_trains(states)
+
+    @contextlib.asynccontextmanager
+    async def _state_transaction(self) -> AsyncIterator[None]:
+        """Coalesce state store updates made inside the block into one commit."""
 
-    async def _sync_state_store(self) -> None:
         if not self._state_store:
+            yield
             return
-        await self._state_store.upsert_trains(self._registry.train_states())
+        async with self._state_store.transaction():
+            yield
+
+
+def _is_connected(state: AppState, identifier: str) -> bool:
+    train = state.get_train(identifier)
+    return bool(train and train.hub and train.hub.connection_state == HubConnectionState.CONNECTED)
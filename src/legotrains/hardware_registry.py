@@ -2,11 +2,12 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from typing import Iterator, Mapping
 
 from .config import TrainConfig
 from .state import HubConnectionState, HubState, TrainState
+from .timeseries import TelemetryRecorder
 
 
 @dataclass(frozen=True)
@@ -20,19 +21,45 @@ class RegisteredTrain:
 class HubRegistry:
     """In-memory registry for configured trains and their hub state."""
 
-    def __init__(self, configs: Mapping[str, TrainConfig]) -> None:
+    def __init__(
+        self,
+        configs: Mapping[str, TrainConfig],
+        *,
+        recorder: TelemetryRecorder | None = None,
+    ) -> None:
+        self._recorder = recorder
+        self._suppressed_updates = 0
         self._trains: dict[str, RegisteredTrain] = {}
+        # Normalized hub MAC / advertised name -> train identifier, so scan
+        # results resolve without walking the fleet.
+        self._by_mac: dict[str, str] = {}
+        self._by_name: dict[str, str] = {}
         for identifier, cfg in configs.items():
             state = TrainState(identifier=cfg.identifier, name=cfg.name)
             self._trains[identifier] = RegisteredTrain(config=cfg, state=state)
+        self._rebuild_indexes()
 
     @classmethod
-    def from_train_configs(cls, configs: tuple[TrainConfig, ...]) -> HubRegistry:
-        return cls({cfg.identifier: cfg for cfg in configs})
+    def from_train_configs(
+        cls,
+        configs: tuple[TrainConfig, ...],
+        *,
+        recorder: TelemetryRecorder | None = None,
+    ) -> HubRegistry:
+        return cls({cfg.identifier: cfg for cfg in configs}, recorder=recorder)
+
+    @property
+    def suppressed_updates(self) -> int:
+        """Updates skipped because they would not have changed any state."""
+
+        return self._suppressed_updates
 
     def __iter__(self) -> Iterator[RegisteredTrain]:
         return iter(self._trains.values())
 
+    def __contains__(self, identifier: object) -> bool:
+        return identifier in self._trains
+
     def train_states(self) -> tuple[TrainState, ...]:
         return tuple(entry.state for entry in self._trains.values())
 
@@ -42,21 +69,67 @@ class HubRegistry:
         except KeyError as exc:
             raise KeyError(f"Train `{identifier}` is not registered.") from exc
 
+    def add_train(self, config: TrainConfig) -> RegisteredTrain:
+        """Register ``config`` at runtime; raises ``ValueError`` if the identifier is taken."""
+
+        if config.identifier in self._trains:
+            raise ValueError(f"Train `{config.identifier}` is already registered.")
+        registered = RegisteredTrain(
+            config=config,
+            state=TrainState(identifier=config.identifier, name=config.name),
+        )
+        self._trains[config.identifier] = registered
+        self._index(config.identifier, config)
+        return registered
+
+    def remove_train(self, identifier: str) -> RegisteredTrain:
+        """Unregister ``identifier`` and drop its telemetry."""
+
+        registered = self.get(identifier)
+        del self._trains[identifier]
+        config = registered.config
+        mac_key = config.hub_mac.upper() if config.hub_mac else None
+        name_key = config.name.lower()
+        freed_mac = mac_key is not None and self._by_mac.get(mac_key) == identifier
+        freed_name = self._by_name.get(name_key) == identifier
+        if freed_mac:
+            del self._by_mac[mac_key]
+        if freed_name:
+            del self._by_name[name_key]
+        if freed_mac or freed_name:
+            # Hand a freed key to the next train sharing it, as a linear scan would.
+            for other_id, other in self._trains.items():
+                if freed_mac and other.config.hub_mac and other.config.hub_mac.upper() == mac_key:
+                    self._by_mac.setdefault(mac_key, other_id)
+                if freed_name and other.config.name.lower() == name_key:
+                    self._by_name.setdefault(name_key, other_id)
+        if self._recorder:
+            self._recorder.discard(identifier)
+        return registered
+
+    def update_config(self, config: TrainConfig) -> RegisteredTrain:
+        """Swap the config of an existing train, keeping its runtime state."""
+
+        current = self.get(config.identifier)
+        if current.config == config:
+            return current
+        state = current.state
+        if state.name != config.name:
+            state = replace(state, name=config.name)
+        updated = RegisteredTrain(config=config, state=state)
+        self._trains[config.identifier] = updated
+        self._rebuild_indexes()
+        return updated
+
     def find_by_mac(self, hub_mac: str) -> RegisteredTrain | None:
-        hub_mac_upper = hub_mac.upper()
-        for train in self._trains.values():
-            if train.config.hub_mac and train.config.hub_mac.upper() == hub_mac_upper:
-                return train
-        return None
+        identifier = self._by_mac.get(hub_mac.upper())
+        return self._trains[identifier] if identifier is not None else None
 
     def find_by_name(self, name: str | None) -> RegisteredTrain | None:
         if not name:
             return None
-        name_lower = name.lower()
-        for train in self._trains.values():
-            if train.config.name.lower() == name_lower:
-                return train
-        return None
+        identifier = self._by_name.get(name.lower())
+        return self._trains[identifier] if identifier is not None else None
 
     def update_hub_state(
         self,
@@ -67,21 +140,25 @@ class HubRegistry:
         rssi: float | None = None,
     ) -> HubState:
         registered = self.get(identifier)
-        hub_state = registered.state.hub or HubState(identifier=identifier)
-        if connection_state is not None:
-            hub_state = HubState(
-                identifier=hub_state.identifier,
-                connection_state=connection_state,
-                battery_level=battery_level if battery_level is not None else hub_state.battery_level,
-                rssi=rssi if rssi is not None else hub_state.rssi,
-            )
-        else:
-            hub_state = HubState(
-                identifier=hub_state.identifier,
-                connection_state=hub_state.connection_state,
-                battery_level=battery_level if battery_level is not None else hub_state.battery_level,
-                rssi=rssi if rssi is not None else hub_state.rssi,
-            )
+        current_hub = registered.state.hub
+        hub_state = current_hub or HubState(identifier=identifier)
+        new_connection = connection_state if connection_state is not None else hub_state.connection_state
+        new_battery = battery_level if battery_level is not None else hub_state.battery_level
+        new_rssi = rssi if rssi is not None else hub_state.rssi
+        if (
+            current_hub is not None
+            and new_connection == current_hub.connection_state
+            and new_battery == current_hub.battery_level
+            and new_rssi == current_hub.rssi
+        ):
+            self._suppressed_updates += 1
+            return current_hub
+        hub_state = HubState(
+            identifier=hub_state.identifier,
+            connection_state=new_connection,
+            battery_level=new_battery,
+            rssi=new_rssi,
+        )
 
         updated_state = TrainState(
             identifier=registered.state.identifier,
@@ -91,11 +168,14 @@ class HubRegistry:
             hub=hub_state,
             active_program=registered.state.active_program,
         )
-        self._trains[identifier] = RegisteredTrain(config=registered.config, state=updated_state)
+        self._store(registered.config, updated_state)
         return hub_state
 
     def set_speed(self, identifier: str, speed: int) -> TrainState:
         registered = self.get(identifier)
+        if registered.state.speed == speed:
+            self._suppressed_updates += 1
+            return registered.state
         updated_state = TrainState(
             identifier=registered.state.identifier,
             name=registered.state.name,
@@ -104,8 +184,26 @@ class HubRegistry:
             hub=registered.state.hub,
             active_program=registered.state.active_program,
         )
-        self._trains[identifier] = RegisteredTrain(config=registered.config, state=updated_state)
+        self._store(registered.config, updated_state)
         return updated_state
 
+    def _rebuild_indexes(self) -> None:
+        """Recompute the lookup indexes; the first registered train wins on duplicates."""
+
+        self._by_mac.clear()
+        self._by_name.clear()
+        for identifier, train in self._trains.items():
+            self._index(identifier, train.config)
+
+    def _index(self, identifier: str, config: TrainConfig) -> None:
+        if config.hub_mac:
+            self._by_mac.setdefault(config.hub_mac.upper(), identifier)
+        self._by_name.setdefault(config.name.lower(), identifier)
+
+    def _store(self, config: TrainConfig, state: TrainState) -> None:
+        self._trains[config.identifier] = RegisteredTrain(config=config, state=state)
+        if self._recorder:
+            self._recorder.record(state)
+
 
 __all__ = ["HubRegistry", "RegisteredTrain"]
@@ -4,9 +4,11 @@ from __future__ import annotations
 
 import asyncio
 from dataclasses import dataclass
-from typing import TYPE_CHECKING, Iterable, Protocol, List
+from typing import TYPE_CHECKING, Any, Iterable, Protocol, List
 import contextlib
 
+from .address_cache import AddressCache
+from .connection_scheduler import ConnectionScheduler
 from .hardware_registry import HubRegistry
 from .state import Event, EventBus, EventSeverity
 
@@ -16,10 +18,15 @@ if TYPE_CHECKING:
 
 @dataclass(slots=True)
 class ScanResult:
-    """Represents a single BLE discovery result."""
+    """Represents a single BLE discovery result.
+
+    ``device`` is the backend's own handle for the advertisement, handed to the
+    hub adapter so it can connect without scanning again.
+    """
 
     address: str
     name: str | None = None
+    device: Any | None = None
 
 
 class ScannerBackend(Protocol):
@@ -41,6 +48,8 @@ class BleScannerService:
         event_bus: EventBus | None = None,
         loop: asyncio.AbstractEventLoop | None = None,
         connection_manager: "HubConnectionManager | None" = None,
+        scheduler: ConnectionScheduler | None = None,
+        address_cache: AddressCache | None = None,
     ) -> None:
         self._registry = registry
         self._backend = backend
@@ -48,18 +57,36 @@ class BleScannerService:
         self._event_bus = event_bus
         self._loop = loop
         self._connection_manager = connection_manager
+        if scheduler is None and connection_manager is not None:
+            scheduler = ConnectionScheduler(connection_manager.connect)
+        self._scheduler = scheduler
+        self._address_cache = address_cache
         self._task: asyncio.Task[None] | None = None
         self._stop_event = asyncio.Event()
 
+    @property
+    def interval(self) -> float:
+        """Seconds between scans; a new value applies after the current wait."""
+
+        return self._interval
+
+    @interval.setter
+    def interval(self, seconds: float) -> None:
+        if seconds <= 0:
+            raise ValueError("Scan interval must be positive.")
+        self._interval = seconds
+
+    @property
+    def scheduler(self) -> ConnectionScheduler | None:
+        return self._scheduler
+
     def start(self) -> None:
         if self._task and not self._task.done():
             return
         loop = self._loop or asyncio.get_event_loop()
         if self._event_bus:
-            loop.create_task(
-                self._event_bus.publish(
-                    Event(type="scanner_start", message="Scanning for hubs...", severity=EventSeverity.INFO)
-                )
+            self._event_bus.publish_nowait(
+                Event(type="scanner_start", message="Scanning for hubs...", severity=EventSeverity.INFO)
             )
         self._task = loop.create_task(self._run())
 
@@ -70,8 +97,11 @@ class BleScannerService:
                 await self._task
             self._task = None
         self._stop_event.set()
+        if self._scheduler:
+            await self._scheduler.stop()
 
     async def _run(self) -> None:
+        self._connect_cached()
         while not self._stop_event.is_set():
             await self._perform_scan()
             try:
@@ -79,6 +109,15 @@ class BleScannerService:
             except asyncio.TimeoutError:
                 continue
 
+    def _connect_cached(self) -> None:
+        """Dial name-only trains at their cached address without waiting for a scan."""
+
+        if not self._scheduler or not self._address_cache:
+            return
+        for train in self._registry:
+            if not train.config.hub_mac and self._address_cache.get(train.config.name):
+                self._scheduler.submit(train.config.identifier)
+
     async def _perform_scan(self) -> None:
         try:
             results = await self._backend.scan()
@@ -98,8 +137,13 @@ class BleScannerService:
                 match_source = "address"
             if not train:
                 continue
-            if self._connection_manager:
-                await self._connection_manager.connect(train.config.identifier)
+            if self._scheduler:
+                # Connects run in the background so a slow hub delays neither
+                # the other matches nor the next scan.
+                if result.device is not None:
+                    self._scheduler.submit(train.config.identifier, device=result.device)
+                else:
+                    self._scheduler.submit(train.config.identifier)
             await self._publish_event(
                 Event(
                     type="hub_discovered",
@@ -108,18 +152,14 @@ class BleScannerService:
                     payload={"train": train.state.identifier, "source": match_source},
                 )
             )
-        await self._log(f"Found BLE devices: {",".join(names)}")
+        await self._log(f"Found BLE devices: {','.join(names)}")
 
     async def _publish_event(self, event: Event) -> None:
         if not self._event_bus:
             return
-        loop = self._loop or asyncio.get_event_loop()
-        if loop.is_running():
-            await self._event_bus.publish(event)
-        else:  # pragma: no cover - fallback
-            asyncio.run(self._event_bus.publish(event))
+        self._event_bus.publish_nowait(event)
 
     async def _log(self, message: str, *, severity: EventSeverity = EventSeverity.INFO) -> None:
         if not self._event_bus:
             return
-        await self._event_bus.publish(Event(type="scanner_log", message=message, severity=severity))
+        self._event_bus.publish_nowait(Event(type="scanner_log", message=message, severity=severity))
@@ -0,0 +1,289 @@
+"""Append-only binary event journal for post-mortem analysis."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import mmap
+import os
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, BinaryIO, Iterable, Iterator
+
+from .state import Event, EventBus, EventSeverity
+from .subscriptions import BackpressurePolicy, SubscriberQueue
+
+SEGMENT_PREFIX = "journal-"
+SEGMENT_SUFFIX = ".ltj"
+DEFAULT_SEGMENT_BYTES = 16 * 1024 * 1024
+
+# Frame: u32 body length, then the body.
+# Body header: sequence, timestamp (µs since epoch), severity, then the byte
+# lengths of type, train, message and JSON payload, followed by those fields.
+_FRAME = struct.Struct("<I")
+_HEADER = struct.Struct("<QqBHHII")
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+@dataclass(frozen=True, slots=True)
+class JournalRecord:
+    """Single event read back from the journal."""
+
+    sequence: int
+    timestamp_us: int
+    severity: EventSeverity
+    type: str
+    train: str | None
+    message: str
+    payload_json: bytes
+
+    @property
+    def timestamp(self) -> datetime:
+        return _EPOCH + timedelta(microseconds=self.timestamp_us)
+
+    @property
+    def payload(self) -> dict[str, Any]:
+        return json.loads(self.payload_json) if self.payload_json else {}
+
+
+def encode_event(event: Event) -> bytes:
+    """Serialize ``event`` into a length-prefixed journal frame."""
+
+    payload = dict(event.payload or {})
+    train = payload.pop("train", None)
+    type_bytes = event.type.encode()
+    train_bytes = str(train).encode() if train is not None else b""
+    message_bytes = event.message.encode()
+    payload_bytes = json.dumps(payload, default=str, separators=(",", ":")).encode() if payload else b""
+    timestamp_us = (event.timestamp - _EPOCH) // timedelta(microseconds=1)
+    header = _HEADER.pack(
+        event.sequence,
+        timestamp_us,
+        event.severity.value,
+        len(type_bytes),
+        len(train_bytes),
+        len(message_bytes),
+        len(payload_bytes),
+    )
+    body_length = len(header) + len(type_bytes) + len(train_bytes) + len(message_bytes) + len(payload_bytes)
+    return b"".join(
+        (_FRAME.pack(body_length), header, type_bytes, train_bytes, message_bytes, payload_bytes)
+    )
+
+
+class EventJournal:
+    """EventBus sink writing events to segmented append-only files.
+
+    Events are encoded on the loop and written by a dedicated thread, so disk
+    I/O never blocks the event loop. Whatever accumulates while a write is in
+    flight goes out in the next write (group commit), with one flush per batch.
+    """
+
+    def __init__(
+        self,
+        event_bus: EventBus,
+        directory: Path,
+        *,
+        segment_bytes: int = DEFAULT_SEGMENT_BYTES,
+        batch_size: int = 512,
+        queue_size: int = 4096,
+        fsync: bool = False,
+    ) -> None:
+        self._bus = event_bus
+        self._directory = directory
+        self._segment_bytes = segment_bytes
+        self._batch_size = batch_size
+        self._queue_size = queue_size
+        self._fsync = fsync
+        self._queue: SubscriberQueue[Event] | None = None
+        self._task: asyncio.Task[None] | None = None
+        self._executor: ThreadPoolExecutor | None = None
+        self._handle: BinaryIO | None = None
+        self._segment_index = 0
+        self._segment_size = 0
+        self.records_written = 0
+
+    @property
+    def directory(self) -> Path:
+        return self._directory
+
+    def start(self) -> None:
+        if self._task and not self._task.done():
+            return
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="legotrains-journal")
+        self._queue = self._bus.subscribe(maxsize=self._queue_size, policy=BackpressurePolicy.BLOCK)
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Write out everything already queued, then close the current segment."""
+
+        if self._queue is not None:
+            self._bus.unsubscribe(self._queue)
+        if self._task:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        if self._queue is not None:
+            await self._write_batch(self._drain_queue(self._queue, limit=None))
+            self._queue = None
+        if self._executor:
+            await asyncio.get_running_loop().run_in_executor(self._executor, self._close_segment)
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    async def _run(self) -> None:
+        assert self._queue is not None
+        while True:
+            first = await self._queue.get()
+            batch = [first]
+            batch.extend(self._drain_queue(self._queue, limit=self._batch_size - 1))
+            await self._write_batch(batch)
+
+    @staticmethod
+    def _drain_queue(queue: SubscriberQueue[Event], *, limit: int | None) -> list[Event]:
+        drained: list[Event] = []
+        while not queue.empty() and (limit is None or len(drained) < limit):
+            drained.append(queue.get_nowait())
+        return drained
+
+    async def _write_batch(self, events: list[Event]) -> None:
+        if not events or self._executor is None:
+            return
+        frames = [encode_event(event) for event in events]
+        write = asyncio.get_running_loop().run_in_executor(self._executor, self._write_frames, frames)
+        # Shielded so that stop() cancelling the writer task cannot cancel a write
+        # that has been queued on the executor but not started yet.
+        await asyncio.shield(write)
+        self.records_written += len(frames)
+
+    # Executor thread only -------------------------------------------------------
+
+    def _write_frames(self, frames: list[bytes]) -> None:
+        pending: list[bytes] = []
+        pending_size = 0
+        for frame in frames:
+            if self._handle is None or self._segment_size + pending_size + len(frame) > self._segment_bytes:
+                if pending:
+                    self._append(pending, pending_size)
+                    pending, pending_size = [], 0
+                if self._handle is None or self._segment_size:
+                    self._open_next_segment()
+            pending.append(frame)
+            pending_size += len(frame)
+        if pending:
+            self._append(pending, pending_size)
+        assert self._handle is not None
+        self._handle.flush()
+        if self._fsync:
+            os.fsync(self._handle.fileno())
+
+    def _append(self, frames: list[bytes], size: int) -> None:
+        assert self._handle is not None
+        self._handle.write(b"".join(frames))
+        self._segment_size += size
+
+    def _open_next_segment(self) -> None:
+        self._close_segment()
+        self._directory.mkdir(parents=True, exist_ok=True)
+        if not self._segment_index:
+            existing = segment_paths(self._directory)
+            self._segment_index = _segment_number(existing[-1]) if existing else 0
+        self._segment_index += 1
+        path = self._directory / f"{SEGMENT_PREFIX}{self._segment_index:06d}{SEGMENT_SUFFIX}"
+        self._handle = path.open("ab")
+        self._segment_size = self._handle.tell()
+
+    def _close_segment(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+            self._segment_size = 0
+
+
+def segment_paths(directory: Path) -> list[Path]:
+    """Journal segment files in ``directory`` in write order."""
+
+    return sorted(directory.glob(f"{SEGMENT_PREFIX}*{SEGMENT_SUFFIX}"), key=_segment_number)
+
+
+def _segment_number(path: Path) -> int:
+    return int(path.stem[len(SEGMENT_PREFIX) :])
+
+
+class JournalReader:
+    """Memory-mapped reader over the segments of an event journal."""
+
+    def __init__(self, directory: Path) -> None:
+        self._directory = directory
+
+    def __iter__(self) -> Iterator[JournalRecord]:
+        return self.records()
+
+    def records(
+        self,
+        *,
+        types: str | Iterable[str] | None = None,
+        train: str | None = None,
+    ) -> Iterator[JournalRecord]:
+        """Iterate records, optionally keeping only type prefixes and one train.
+
+        Filters are checked against the raw bytes before anything is decoded.
+        A partially written trailing record (e.g. after a crash) ends iteration
+        for that segment.
+        """
+
+        type_prefixes = tuple(p.encode() for p in ((types,) if isinstance(types, str) else (types or ())))
+        train_bytes = train.encode() if train is not None else None
+        for path in segment_paths(self._directory):
+            yield from self._read_segment(path, type_prefixes, train_bytes)
+
+    @staticmethod
+    def _read_segment(
+        path: Path,
+        type_prefixes: tuple[bytes, ...],
+        train_bytes: bytes | None,
+    ) -> Iterator[JournalRecord]:
+        with path.open("rb") as handle:
+            if path.stat().st_size == 0:
+                return
+            with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                size = len(view)
+                offset = 0
+                while offset + _FRAME.size <= size:
+                    (body_length,) = _FRAME.unpack_from(view, offset)
+                    body = offset + _FRAME.size
+                    end = body + body_length
+                    if body_length < _HEADER.size or end > size:
+                        return
+                    sequence, timestamp_us, severity, type_len, train_len, message_len, payload_len = (
+                        _HEADER.unpack_from(view, body)
+                    )
+                    offset = end
+                    cursor = body + _HEADER.size
+                    type_raw = view[cursor : cursor + type_len]
+                    if type_prefixes and not type_raw.startswith(type_prefixes):
+                        continue
+                    cursor += type_len
+                    train_raw = view[cursor : cursor + train_len]
+                    if train_bytes is not None and train_raw != train_bytes:
+                        continue
+                    cursor += train_len
+                    message_raw = view[cursor : cursor + message_len]
+                    cursor += message_len
+                    yield JournalRecord(
+                        sequence=sequence,
+                        timestamp_us=timestamp_us,
+                        severity=EventSeverity(severity),
+                        type=type_raw.decode(),
+                        train=train_raw.decode() if train_len else None,
+                        message=message_raw.decode(),
+                        payload_json=view[cursor : cursor + payload_len],
+                    )
+
+
+__all__ = ["EventJournal", "JournalReader", "JournalRecord", "encode_event", "segment_paths"]
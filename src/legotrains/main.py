@@ -23,6 +23,9 @@ def main() -> None:
         input_mapper=runtime.input_mapper,
         event_bus=runtime.event_bus,
         scanner=runtime.scanner,
+        journal=runtime.journal,
+        config_watcher=runtime.config_watcher,
+        supervisor=runtime.supervisor,
     )
     try:
         app.run()
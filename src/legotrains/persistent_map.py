@@ -0,0 +1,227 @@
+"""Persistent (immutable) hash map with structural sharing."""
+
+from __future__ import annotations
+
+from collections.abc import Hashable, Iterable, Iterator, Mapping
+from typing import Any, Generic, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+_BITS = 5
+_WIDTH = 1 << _BITS
+_MASK = _WIDTH - 1
+
+
+class _Leaf:
+    """Single key/value entry stored inside a node."""
+
+    __slots__ = ("key", "hash", "value")
+
+    def __init__(self, key: Any, key_hash: int, value: Any) -> None:
+        self.key = key
+        self.hash = key_hash
+        self.value = value
+
+
+class _Collision:
+    """Bucket for keys whose hashes are identical."""
+
+    __slots__ = ("hash", "leaves")
+
+    def __init__(self, key_hash: int, leaves: tuple[_Leaf, ...]) -> None:
+        self.hash = key_hash
+        self.leaves = leaves
+
+
+class _Node:
+    """Bitmap-indexed trie node; only populated slots are stored."""
+
+    __slots__ = ("bitmap", "children")
+
+    def __init__(self, bitmap: int, children: tuple[Any, ...]) -> None:
+        self.bitmap = bitmap
+        self.children = children
+
+
+_EMPTY_NODE = _Node(0, ())
+
+
+def _slot(key_hash: int, shift: int) -> int:
+    return 1 << ((key_hash >> shift) & _MASK)
+
+
+def _position(bitmap: int, bit: int) -> int:
+    return (bitmap & (bit - 1)).bit_count()
+
+
+def _merge(first: _Leaf | _Collision, second: _Leaf, shift: int) -> Any:
+    if first.hash == second.hash:
+        leaves = first.leaves if isinstance(first, _Collision) else (first,)
+        return _Collision(first.hash, leaves + (second,))
+    first_bit = _slot(first.hash, shift)
+    second_bit = _slot(second.hash, shift)
+    if first_bit == second_bit:
+        return _Node(first_bit, (_merge(first, second, shift + _BITS),))
+    children = (first, second) if first_bit < second_bit else (second, first)
+    return _Node(first_bit | second_bit, children)
+
+
+def _lookup(node: _Node, key: Any, key_hash: int) -> _Leaf | None:
+    shift = 0
+    current: Any = node
+    while True:
+        if isinstance(current, _Node):
+            bit = _slot(key_hash, shift)
+            if not current.bitmap & bit:
+                return None
+            current = current.children[_position(current.bitmap, bit)]
+            shift += _BITS
+        elif isinstance(current, _Leaf):
+            if current.hash == key_hash and current.key == key:
+                return current
+            return None
+        else:
+            for leaf in current.leaves:
+                if leaf.key == key:
+                    return leaf
+            return None
+
+
+def _assoc(node: _Node, leaf: _Leaf, shift: int) -> tuple[_Node, bool]:
+    """Return a copy of ``node`` with ``leaf`` inserted and whether a key was added."""
+
+    bit = _slot(leaf.hash, shift)
+    position = _position(node.bitmap, bit)
+    if not node.bitmap & bit:
+        children = node.children[:position] + (leaf,) + node.children[position:]
+        return _Node(node.bitmap | bit, children), True
+
+    child = node.children[position]
+    added = False
+    if isinstance(child, _Node):
+        replacement, added = _assoc(child, leaf, shift + _BITS)
+    elif isinstance(child, _Leaf):
+        if child.hash == leaf.hash and child.key == leaf.key:
+            replacement = leaf
+        else:
+            replacement, added = _merge(child, leaf, shift + _BITS), True
+    elif child.hash != leaf.hash:
+        replacement, added = _merge(child, leaf, shift + _BITS), True
+    else:
+        leaves = tuple(existing for existing in child.leaves if existing.key != leaf.key)
+        added = len(leaves) == len(child.leaves)
+        replacement = _Collision(child.hash, leaves + (leaf,))
+    children = node.children[:position] + (replacement,) + node.children[position + 1 :]
+    return _Node(node.bitmap, children), added
+
+
+def _dissoc(node: _Node, key: Any, key_hash: int, shift: int) -> Any:
+    """Return ``node`` without ``key``; ``None`` when the node became empty."""
+
+    bit = _slot(key_hash, shift)
+    if not node.bitmap & bit:
+        return node
+    position = _position(node.bitmap, bit)
+    child = node.children[position]
+    if isinstance(child, _Node):
+        replacement: Any = _dissoc(child, key, key_hash, shift + _BITS)
+        if replacement is child:
+            return node
+        if isinstance(replacement, _Node) and len(replacement.children) == 1:
+            only = replacement.children[0]
+            if not isinstance(only, _Node):
+                replacement = only
+    elif isinstance(child, _Leaf):
+        if child.hash != key_hash or child.key != key:
+            return node
+        replacement = None
+    else:
+        leaves = tuple(leaf for leaf in child.leaves if leaf.key != key)
+        if len(leaves) == len(child.leaves):
+            return node
+        replacement = leaves[0] if len(leaves) == 1 else _Collision(child.hash, leaves)
+
+    if replacement is None:
+        children = node.children[:position] + node.children[position + 1 :]
+        if not children:
+            return None
+        return _Node(node.bitmap & ~bit, children)
+    children = node.children[:position] + (replacement,) + node.children[position + 1 :]
+    return _Node(node.bitmap, children)
+
+
+def _iter_leaves(node: Any) -> Iterator[_Leaf]:
+    if isinstance(node, _Node):
+        for child in node.children:
+            yield from _iter_leaves(child)
+    elif isinstance(node, _Leaf):
+        yield node
+    else:
+        yield from node.leaves
+
+
+class PersistentMap(Mapping[K, V], Generic[K, V]):
+    """Immutable mapping where updates return a new map sharing unchanged nodes.
+
+    Lookups and single-key updates are O(log32 n); an update copies only the
+    nodes on the path to the changed key, never the whole map.
+    """
+
+    __slots__ = ("_root", "_size")
+
+    def __init__(self, items: Mapping[K, V] | Iterable[tuple[K, V]] = ()) -> None:
+        root = _EMPTY_NODE
+        size = 0
+        pairs = items.items() if isinstance(items, Mapping) else items
+        for key, value in pairs:
+            root, added = _assoc(root, _Leaf(key, hash(key), value), 0)
+            size += added
+        self._root = root
+        self._size = size
+
+    @classmethod
+    def _from_root(cls, root: _Node, size: int) -> PersistentMap[K, V]:
+        instance = cls.__new__(cls)
+        instance._root = root
+        instance._size = size
+        return instance
+
+    def __getitem__(self, key: K) -> V:
+        leaf = _lookup(self._root, key, hash(key))
+        if leaf is None:
+            raise KeyError(key)
+        return leaf.value
+
+    def __contains__(self, key: object) -> bool:
+        return _lookup(self._root, key, hash(key)) is not None
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[K]:
+        return (leaf.key for leaf in _iter_leaves(self._root))
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self.items())!r})"
+
+    def get(self, key: K, default: Any = None) -> Any:
+        leaf = _lookup(self._root, key, hash(key))
+        return default if leaf is None else leaf.value
+
+    def set(self, key: K, value: V) -> PersistentMap[K, V]:
+        """Return a new map with ``key`` bound to ``value``."""
+
+        root, added = _assoc(self._root, _Leaf(key, hash(key), value), 0)
+        return self._from_root(root, self._size + added)
+
+    def delete(self, key: K) -> PersistentMap[K, V]:
+        """Return a new map without ``key``; raises ``KeyError`` when missing."""
+
+        root = _dissoc(self._root, key, hash(key), 0)
+        if root is self._root:
+            raise KeyError(key)
+        return self._from_root(root or _EMPTY_NODE, self._size - 1)
+
+
+__all__ = ["PersistentMap"]
@@ -6,9 +6,9 @@ from dataclasses import dataclass
 from importlib import import_module
 from importlib.util import find_spec
 from pathlib import Path
-from typing import ClassVar, Dict, Iterable, Type
+from typing import ClassVar, Dict, Iterable, Mapping, Type
 
-from ..hardware_connection import HubConnectionManager
+from ..hardware_connection import GroupActuation, HubConnectionManager
 from ..state import Event, EventBus, EventSeverity
 
 
@@ -65,10 +65,40 @@ class TrainProgram:
         except RuntimeError as exc:
             await self.log(str(exc), severity=EventSeverity.WARNING)
 
+    async def set_speeds(self, speeds: Mapping[str, int]) -> bool:
+        """Set several trains at once so they move off together; True if all succeeded."""
+
+        result = await self._connections.set_speeds(speeds)
+        return await self._report_group(result, "speed set")
+
+    async def stop_all(self, train_ids: Iterable[str]) -> bool:
+        result = await self._connections.stop_many(train_ids)
+        return await self._report_group(result, "stopped")
+
+    async def _report_group(self, result: GroupActuation, action: str) -> bool:
+        for train_id, exc in result.failed.items():
+            await self.log(f"{train_id}: {exc}", severity=EventSeverity.WARNING)
+        if result.succeeded:
+            await self.log(
+                f"{', '.join(result.succeeded)} {action} (skew {result.skew * 1000:.1f} ms)",
+                severity=EventSeverity.INFO,
+            )
+        return not result.failed
+
+    async def wait_until_connected(self, train_id: str, *, timeout: float | None = None) -> bool:
+        """Wait for a train's hub to connect instead of polling with ``asyncio.sleep``."""
+
+        try:
+            await self._connections.wait_until_connected(train_id, timeout=timeout)
+            return True
+        except (RuntimeError, TimeoutError) as exc:
+            await self.log(str(exc) or f"{train_id} did not connect in time", severity=EventSeverity.WARNING)
+            return False
+
     async def log(self, message: str, *, severity: EventSeverity = EventSeverity.INFO) -> None:
         if not self._event_bus:
             return
-        await self._event_bus.publish(Event(type="program_log", message=message, severity=severity))
+        self._event_bus.publish_nowait(Event(type="program_log", message=message, severity=severity))
 
 
 _REGISTRY: Dict[str, Type[TrainProgram]] = {}
@@ -15,8 +15,6 @@ class StartAllTrains(TrainProgram):
     )
 
     async def execute(self) -> None:
-        await self.set_speed("freight", 20)
-        await self.set_speed("passenger", 20)
+        await self.set_speeds({"freight": 20, "passenger": 20})
         await asyncio.sleep(2)
-        await self.stop("freight")
-        await self.stop("passenger")
+        await self.stop_all(("freight", "passenger"))
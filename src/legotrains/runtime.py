@@ -4,16 +4,25 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Any
 
-from .config import AppConfig, load_config
+from .address_cache import AddressCache
+from .config import AppConfig, ConfigDiff, TrainConfig, load_config, resolve_config_path
+from .config_watcher import ConfigWatcher
 from .control_commands import TrainCommandHandler
 from .control_input import InputMapper, default_input_mapper
+from .connection_scheduler import ConnectionScheduler
 from .hardware_connection import HubAdapter, HubConnectionManager
 from .hardware_registry import HubRegistry
 from .hardware_scanner import BleScannerService
 from .hardware.bleak_backend import BleakScannerBackend
-from .hardware.pylgbst_adapter import PylgbstAdapter
-from .state import AppState, EventBus, StateStore
+from .journal import EventJournal
+from .session_supervisor import SessionSupervisor
+from .state import AppState, Event, EventBus, EventSeverity, StateStore
+from .timeseries import TelemetryRecorder
+
+
+SESSION_PROBE_INTERVAL_SECONDS = 5.0
 
 
 @dataclass(slots=True)
@@ -26,25 +35,102 @@ class RuntimeContext:
     command_handler: TrainCommandHandler
     input_mapper: InputMapper
     scanner: BleScannerService | None = None
+    journal: EventJournal | None = None
+    telemetry: TelemetryRecorder | None = None
+    config_watcher: ConfigWatcher | None = None
+    supervisor: SessionSupervisor | None = None
+
+    async def add_train(self, config: TrainConfig) -> None:
+        """Bring a new train online; the scanner picks it up on its next pass."""
+
+        await self.connection_manager.add_train(config)
+
+    async def remove_train(self, identifier: str) -> None:
+        await self.connection_manager.remove_train(identifier)
+
+    async def apply_config(self, config: AppConfig, diff: ConfigDiff) -> None:
+        """Apply only what ``diff`` reports; untouched hubs keep their sessions.
+
+        Trains, ``ble.scan_interval``, ``ble.connect_timeout`` and
+        ``ble.max_write_rate`` apply live. ``ble.adapter``,
+        ``ble.max_concurrent_connects``, ``hardware_adapter``, ``address_cache``,
+        ``journal_dir`` and ``log_level`` only take effect after a restart, so a
+        change to any of them publishes a ``restart_required`` warning. Safe to
+        re-run after a partial failure: trains already removed or added are
+        reconciled instead of failing again.
+        """
+
+        manager = self.connection_manager
+        for train in diff.removed:
+            if manager.has_train(train.identifier):
+                await self.remove_train(train.identifier)
+        for train in (*diff.changed, *diff.added):
+            if manager.has_train(train.identifier):
+                await manager.update_train(train)
+            else:
+                await self.add_train(train)
+        if diff.scan_interval is not None and self.scanner:
+            self.scanner.interval = diff.scan_interval
+        if diff.connect_timeout is not None:
+            manager.connect_timeout = diff.connect_timeout
+        if diff.max_write_rate is not None:
+            self.command_handler.mailbox.max_write_rate = diff.max_write_rate
+        if diff.restart_required:
+            settings = ", ".join(diff.restart_required)
+            await self.event_bus.publish(
+                Event(
+                    type="restart_required",
+                    message=f"Restart LegoTrains to apply the changed {settings} setting(s)",
+                    severity=EventSeverity.WARNING,
+                    payload={"settings": list(diff.restart_required)},
+                )
+            )
+        self.config = config
 
 
 class NullHubAdapter(HubAdapter):
-    async def connect(self, target: str):
+    async def connect(self, target: str, *, device: Any | None = None):
         raise RuntimeError("No hub adapter configured.")
 
 
+def build_hub_adapter(config: AppConfig, event_bus: EventBus | None = None) -> HubAdapter:
+    """Instantiate the adapter named by ``config.hardware_adapter``.
+
+    Imports are deferred so only the selected backend's dependencies are needed.
+    """
+
+    if config.hardware_adapter == "lwp3":
+        from .hardware.lwp3_adapter import Lwp3Adapter
+
+        return Lwp3Adapter(event_bus=event_bus, adapter=config.ble.adapter)
+    from .hardware.pylgbst_adapter import PylgbstAdapter
+
+    return PylgbstAdapter(event_bus=event_bus)
+
+
 def build_runtime() -> RuntimeContext:
     config = load_config()
-    registry = HubRegistry.from_train_configs(config.trains)
+    telemetry = TelemetryRecorder()
+    registry = HubRegistry.from_train_configs(config.trains, recorder=telemetry)
     state_store = StateStore(AppState(trains=registry.train_states()))
     event_bus = EventBus()
+    address_cache = (
+        AddressCache.load(config.address_cache, adapter=config.ble.adapter) if config.address_cache else None
+    )
     connection_manager = HubConnectionManager(
         registry,
-        PylgbstAdapter(event_bus=event_bus),
+        build_hub_adapter(config, event_bus),
         event_bus=event_bus,
         state_store=state_store,
+        connect_timeout=config.ble.connect_timeout,
+        address_cache=address_cache,
+    )
+    command_handler = TrainCommandHandler(
+        registry=registry,
+        connections=connection_manager,
+        event_bus=event_bus,
+        max_write_rate=config.ble.max_write_rate,
     )
-    command_handler = TrainCommandHandler(registry=registry, connections=connection_manager, event_bus=event_bus)
     mapper = default_input_mapper()
     scanner = None
     try:
@@ -58,9 +144,16 @@ def build_runtime() -> RuntimeContext:
             interval=config.ble.scan_interval,
             event_bus=event_bus,
             connection_manager=connection_manager,
+            scheduler=ConnectionScheduler(
+                connection_manager.connect,
+                max_concurrent=config.ble.max_concurrent_connects,
+            ),
+            address_cache=address_cache,
         )
 
-    return RuntimeContext(
+    journal = EventJournal(event_bus, config.journal_dir) if config.journal_dir else None
+
+    runtime = RuntimeContext(
         config=config,
         event_bus=event_bus,
         state_store=state_store,
@@ -69,4 +162,14 @@ def build_runtime() -> RuntimeContext:
         command_handler=command_handler,
         input_mapper=mapper,
         scanner=scanner,
+        journal=journal,
+        telemetry=telemetry,
+        supervisor=SessionSupervisor(connection_manager, probe_interval=SESSION_PROBE_INTERVAL_SECONDS),
+    )
+    runtime.config_watcher = ConfigWatcher(
+        resolve_config_path(),
+        config,
+        runtime.apply_config,
+        event_bus=event_bus,
     )
+    return runtime
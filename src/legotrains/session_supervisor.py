@@ -0,0 +1,107 @@
+"""Background supervision of hub sessions: liveness probes and reconnects."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+
+from .connection_backoff import ConnectionBackoffError
+from .hardware_connection import HubConnectionManager, ProbeableSession
+
+
+class SessionSupervisor:
+    """Reconnects hubs whose sessions are lost and restores their last speed.
+
+    Loss is reported by the connection manager (disconnect callbacks and failed
+    writes) and, when ``probe_interval`` is set, by periodically probing
+    sessions that implement ``ProbeableSession``. Reconnect attempts honour the
+    manager's backoff and circuit breaker.
+    """
+
+    def __init__(
+        self,
+        manager: HubConnectionManager,
+        *,
+        probe_interval: float | None = None,
+        probe_timeout: float = 2.0,
+        retry_delay: float = 1.0,
+    ) -> None:
+        self._manager = manager
+        self._probe_interval = probe_interval
+        self._probe_timeout = probe_timeout
+        self._retry_delay = retry_delay
+        self._reconnects: dict[str, asyncio.Task[None]] = {}
+        self._probe_task: asyncio.Task[None] | None = None
+        self._running = False
+
+    @property
+    def reconnecting(self) -> frozenset[str]:
+        return frozenset(self._reconnects)
+
+    def start(self) -> None:
+        if self._running:
+            return
+        self._running = True
+        self._manager.add_session_lost_listener(self._on_session_lost)
+        if self._probe_interval:
+            self._probe_task = asyncio.get_running_loop().create_task(self._probe_loop())
+
+    async def stop(self) -> None:
+        if not self._running:
+            return
+        self._running = False
+        self._manager.remove_session_lost_listener(self._on_session_lost)
+        tasks = list(self._reconnects.values())
+        if self._probe_task:
+            tasks.append(self._probe_task)
+            self._probe_task = None
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        self._reconnects.clear()
+
+    async def probe_once(self) -> None:
+        """Probe every live session once, reporting the ones that fail."""
+
+        for identifier, session in self._manager.active_sessions().items():
+            if not isinstance(session, ProbeableSession):
+                continue
+            try:
+                await asyncio.wait_for(session.probe(), timeout=self._probe_timeout)
+            except Exception as exc:
+                reason = "probe timed out" if isinstance(exc, asyncio.TimeoutError) else exc
+                await self._manager.session_lost(identifier, session, reason)
+
+    def _on_session_lost(self, identifier: str) -> None:
+        if identifier in self._reconnects or not self._running:
+            return
+        self._reconnects[identifier] = asyncio.get_running_loop().create_task(self._reconnect(identifier))
+
+    async def _reconnect(self, identifier: str) -> None:
+        try:
+            while True:
+                try:
+                    await self._manager.reconnect(identifier)
+                    return
+                except ConnectionBackoffError as exc:
+                    await asyncio.sleep(exc.retry_in)
+                except KeyError:  # train was removed meanwhile
+                    return
+                except Exception:  # reported by the manager
+                    if identifier in self._manager.active_sessions():
+                        return  # connected; the hub rejected the restore, reconnecting won't help
+                    await asyncio.sleep(self._retry_delay)
+        finally:
+            if self._reconnects.get(identifier) is asyncio.current_task():
+                del self._reconnects[identifier]
+
+    async def _probe_loop(self) -> None:
+        assert self._probe_interval
+        while True:
+            await asyncio.sleep(self._probe_interval)
+            await self.probe_once()
+
+
+__all__ = ["SessionSupervisor"]
@@ -3,12 +3,22 @@
 from __future__ import annotations
 
 import asyncio
-from collections.abc import Iterable
-from dataclasses import dataclass, field, replace
-from datetime import datetime, timezone
+import contextlib
+import sys
+import time
+from collections.abc import AsyncIterator, Callable, Hashable, Iterable
+from contextvars import ContextVar
+from dataclasses import FrozenInstanceError, dataclass, field, fields, replace
+from datetime import datetime, timedelta, timezone
 from enum import Enum, auto
 from typing import Any, MutableMapping
 
+from .persistent_map import PersistentMap
+from .subscriptions import BackpressurePolicy, SubscriberQueue, SubscriptionStats
+
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
 
 class HubConnectionState(Enum):
     """Connection lifecycle state for a Powered Up hub."""
@@ -34,7 +44,7 @@ class EventSeverity(Enum):
     ERROR = auto()
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class HubState:
     """Runtime details for a hub connection."""
 
@@ -44,7 +54,7 @@ class HubState:
     rssi: float | None = None  # retained for future metrics but no longer populated
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class TrainState:
     """Runtime snapshot for a train."""
 
@@ -56,21 +66,123 @@ class TrainState:
     active_program: str | None = None
 
 
-@dataclass(frozen=True)
 class AppState:
-    """Immutable snapshot of the entire application state."""
-
-    trains: tuple[TrainState, ...] = ()
-    updated_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    """Immutable snapshot of the entire application state.
+
+    Trains are held in a persistent identifier index, so lookups are O(1)-ish and
+    replacing a single train shares every other entry with the previous snapshot.
+    """
+
+    __slots__ = ("_index", "_order", "_trains", "version", "updated_at")
+
+    _index: PersistentMap[str, TrainState]
+    _order: tuple[str, ...]
+    _trains: tuple[TrainState, ...] | None
+    version: int
+    updated_at: datetime
+
+    def __init__(
+        self,
+        trains: Iterable[TrainState] = (),
+        updated_at: datetime | None = None,
+        version: int = 0,
+    ) -> None:
+        index: PersistentMap[str, TrainState] = PersistentMap()
+        order: list[str] = []
+        for train in trains:
+            if train.identifier not in index:
+                order.append(train.identifier)
+            index = index.set(train.identifier, train)
+        self._init(index, tuple(order), version, updated_at)
+
+    def _init(
+        self,
+        index: PersistentMap[str, TrainState],
+        order: tuple[str, ...],
+        version: int,
+        updated_at: datetime | None,
+    ) -> None:
+        object.__setattr__(self, "_index", index)
+        object.__setattr__(self, "_order", order)
+        object.__setattr__(self, "_trains", None)
+        object.__setattr__(self, "version", version)
+        object.__setattr__(self, "updated_at", updated_at or datetime.now(timezone.utc))
+
+    def _derive(self, index: PersistentMap[str, TrainState], order: tuple[str, ...]) -> AppState:
+        """Build the next snapshot (one version newer) from an updated index."""
+
+        state = type(self).__new__(type(self))
+        state._init(index, order, self.version + 1, None)
+        return state
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise FrozenInstanceError(f"cannot assign to field {name!r}")
+
+    def __delattr__(self, name: str) -> None:
+        raise FrozenInstanceError(f"cannot delete field {name!r}")
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, AppState):
+            return NotImplemented
+        return (
+            self.version == other.version
+            and self.trains == other.trains
+            and self.updated_at == other.updated_at
+        )
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"AppState(trains={self.trains!r}, updated_at={self.updated_at!r}, version={self.version})"
+
+    @property
+    def trains(self) -> tuple[TrainState, ...]:
+        """Trains in registration order; materialized lazily and cached."""
+
+        if self._trains is None:
+            index = self._index
+            object.__setattr__(self, "_trains", tuple(index[identifier] for identifier in self._order))
+        return self._trains  # type: ignore[return-value]
 
     def get_train(self, identifier: str) -> TrainState | None:
-        for train in self.trains:
-            if train.identifier == identifier:
-                return train
-        return None
+        return self._index.get(identifier)
 
+    def with_train(self, train: TrainState) -> AppState:
+        """Return the next snapshot with ``train`` inserted or replaced."""
 
-@dataclass(frozen=True)
+        order = self._order
+        if train.identifier not in self._index:
+            order = order + (train.identifier,)
+        return self._derive(self._index.set(train.identifier, train), order)
+
+    def with_trains(self, trains: Iterable[TrainState]) -> AppState:
+        """Return the next snapshot with every train in ``trains`` inserted or replaced."""
+
+        return self._apply(trains, ())
+
+    def without_train(self, identifier: str) -> AppState:
+        """Return the next snapshot without ``identifier``; raises ``KeyError`` when missing."""
+
+        return self._apply((), (identifier,))
+
+    def _apply(self, trains: Iterable[TrainState], removed: Iterable[str]) -> AppState:
+        index = self._index
+        order = self._order
+        dropped: set[str] = set()
+        for identifier in removed:
+            index = index.delete(identifier)
+            dropped.add(identifier)
+        if dropped:
+            order = tuple(identifier for identifier in order if identifier not in dropped)
+        added: list[str] = []
+        for train in trains:
+            if train.identifier not in index:
+                added.append(train.identifier)
+            index = index.set(train.identifier, train)
+        return self._derive(index, order + tuple(added) if added else order)
+
+
+@dataclass(frozen=True, slots=True)
 class Event:
     """Domain event published to subscribers."""
 
@@ -79,46 +191,385 @@ class Event:
     severity: EventSeverity = EventSeverity.INFO
     payload: MutableMapping[str, Any] | None = None
     timestamp: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    sequence: int = field(default=0, compare=False)  # assigned by EventBus on publish
 
+    def compact(self) -> CompactEvent:
+        return CompactEvent.from_event(self)
 
-class EventBus:
-    """Async-safe publish/subscribe event bus."""
 
-    def __init__(self) -> None:
-        self._subscribers: set[asyncio.Queue[Event]] = set()
-        self._lock = asyncio.Lock()
-        self._loop: asyncio.AbstractEventLoop | None = None
+# Offset between the monotonic clock and wall-clock time, sampled once so that
+# CompactEvent only has to read the (cheaper) monotonic clock per event.
+_MONOTONIC_TO_WALL_NS = time.time_ns() - time.monotonic_ns()
 
-    def subscribe(self, *, maxsize: int = 100) -> asyncio.Queue[Event]:
-        queue: asyncio.Queue[Event] = asyncio.Queue(maxsize=maxsize)
-        self._subscribers.add(queue)
+
+class CompactEvent:
+    """Allocation-light event record for high-volume producers and storage.
+
+    Compared with ``Event`` it has no per-instance ``__dict__``, stores a
+    monotonic nanosecond timestamp instead of an aware ``datetime`` (converted
+    only when read), interns the type string and keeps ``train`` in its own slot
+    with any other payload as a tuple of pairs instead of a dict.
+    """
+
+    __slots__ = ("type", "message", "severity", "train", "fields", "timestamp_ns", "sequence")
+
+    type: str
+    message: str
+    severity: EventSeverity
+    train: str | None
+    fields: tuple[tuple[str, Any], ...]
+    timestamp_ns: int
+    sequence: int
+
+    def __init__(
+        self,
+        type: str,
+        message: str,
+        severity: EventSeverity = EventSeverity.INFO,
+        train: str | None = None,
+        fields: tuple[tuple[str, Any], ...] = (),
+        *,
+        timestamp_ns: int | None = None,
+        sequence: int = 0,
+    ) -> None:
+        set_field = object.__setattr__
+        set_field(self, "type", sys.intern(type))
+        set_field(self, "message", message)
+        set_field(self, "severity", severity)
+        set_field(self, "train", train)
+        set_field(self, "fields", fields)
+        set_field(self, "timestamp_ns", time.monotonic_ns() if timestamp_ns is None else timestamp_ns)
+        set_field(self, "sequence", sequence)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise FrozenInstanceError(f"cannot assign to field {name!r}")
+
+    def __repr__(self) -> str:
+        return (
+            f"CompactEvent(type={self.type!r}, message={self.message!r}, severity={self.severity}, "
+            f"train={self.train!r}, fields={self.fields!r}, sequence={self.sequence})"
+        )
+
+    @property
+    def timestamp(self) -> datetime:
+        """Wall-clock time of the event, computed on access."""
+
+        wall_ns = self.timestamp_ns + _MONOTONIC_TO_WALL_NS
+        return _EPOCH + timedelta(microseconds=wall_ns // 1000)
+
+    @property
+    def payload(self) -> dict[str, Any] | None:
+        if self.train is None and not self.fields:
+            return None
+        payload = dict(self.fields)
+        if self.train is not None:
+            payload["train"] = self.train
+        return payload
+
+    @classmethod
+    def from_event(cls, event: Event) -> CompactEvent:
+        payload = event.payload or {}
+        train = payload.get("train")
+        fields = tuple((key, value) for key, value in payload.items() if key != "train")
+        wall_ns = (event.timestamp - _EPOCH) // timedelta(microseconds=1) * 1000
+        return cls(
+            event.type,
+            event.message,
+            event.severity,
+            train,
+            fields,
+            timestamp_ns=wall_ns - _MONOTONIC_TO_WALL_NS,
+            sequence=event.sequence,
+        )
+
+    def to_event(self) -> Event:
+        """Convert to the public ``Event`` shape."""
+
+        return Event(
+            type=self.type,
+            message=self.message,
+            severity=self.severity,
+            payload=self.payload,
+            timestamp=self.timestamp,
+            sequence=self.sequence,
+        )
+
+
+class EventHistory:
+    """Fixed-capacity ring buffer of published events addressed by sequence number."""
+
+    __slots__ = ("_buffer", "_capacity", "_last")
+
+    def __init__(self, capacity: int) -> None:
+        if capacity < 0:
+            raise ValueError("History capacity must not be negative.")
+        self._capacity = capacity
+        self._buffer: list[Event | None] = [None] * capacity
+        self._last = 0
+
+    def __len__(self) -> int:
+        return min(self._last, self._capacity)
+
+    @property
+    def last_sequence(self) -> int:
+        return self._last
+
+    @property
+    def first_sequence(self) -> int:
+        """Oldest sequence number still retained (``last_sequence + 1`` when empty)."""
+
+        return self._last - len(self) + 1
+
+    def append(self, event: Event) -> None:
+        self._last = event.sequence
+        if self._capacity:
+            self._buffer[event.sequence % self._capacity] = event
+
+    def since(self, sequence: int) -> list[Event]:
+        """Return retained events with a sequence number greater than ``sequence``."""
+
+        start = max(sequence + 1, self.first_sequence)
+        count = self._last - start + 1
+        if count <= 0:
+            return []
+        offset = start % self._capacity
+        end = offset + count
+        if end <= self._capacity:
+            events = self._buffer[offset:end]
+        else:
+            events = self._buffer[offset:] + self._buffer[: end - self._capacity]
+        return events  # type: ignore[return-value]
+
+    def tail(self, count: int) -> list[Event]:
+        """Return up to ``count`` of the most recent events."""
+
+        return self.since(self._last - count) if count > 0 else []
+
+
+@dataclass(frozen=True, slots=True)
+class EventFilter:
+    """Subscription filter; empty ``types``/``trains`` match everything."""
+
+    types: tuple[str, ...] = ()
+    min_severity: EventSeverity = EventSeverity.INFO
+    trains: frozenset[str] = frozenset()
+
+    def matches_route(self, event_type: str, severity: EventSeverity) -> bool:
+        if severity.value < self.min_severity.value:
+            return False
+        return not self.types or event_type.startswith(self.types)
+
+    def matches(self, event: Event) -> bool:
+        if not self.matches_route(event.type, event.severity):
+            return False
+        return not self.trains or _event_train(event) in self.trains
+
+
+def _event_train(event: Event) -> Any:
+    return event.payload.get("train") if event.payload else None
+
+
+_Route = tuple[tuple[SubscriberQueue[Event], frozenset[str]], ...]
+
+
+class EventBus:
+    """Lock-free publish/subscribe event bus for use on the event loop thread.
+
+    Subscribers may filter by event type prefix, minimum severity and payload
+    ``train``. Routes are cached per (type, severity) pair, so publishing only
+    touches queues that can be interested in the event.
+
+    Every published event gets a monotonic ``sequence`` number and the most
+    recent ``history_size`` events are retained, so late subscribers can catch
+    up with ``subscribe(replay=...)`` or ``since(sequence)``.
+    """
+
+    def __init__(self, *, history_size: int = 256) -> None:
+        self._subscribers: dict[SubscriberQueue[Event], EventFilter] = {}
+        self._routes: dict[tuple[str, EventSeverity], _Route] = {}
+        self._history = EventHistory(history_size)
+        self._sequence = 0
+
+    @property
+    def sequence(self) -> int:
+        """Sequence number of the most recently published event."""
+
+        return self._sequence
+
+    def subscribe(
+        self,
+        *,
+        maxsize: int = 100,
+        types: str | Iterable[str] | None = None,
+        min_severity: EventSeverity = EventSeverity.INFO,
+        trains: str | Iterable[str] | None = None,
+        policy: BackpressurePolicy = BackpressurePolicy.DROP_OLDEST,
+        key: Callable[[Event], Hashable] | None = None,
+        timeout: float = 1.0,
+        replay: int = 0,
+    ) -> SubscriberQueue[Event]:
+        """Subscribe to events, optionally filtered.
+
+        Args:
+            maxsize: Queue capacity.
+            types: Event type prefix (or prefixes) to receive, e.g. ``"hub_"``.
+            min_severity: Lowest severity to receive.
+            trains: Only receive events whose payload ``train`` is one of these.
+            policy: What to do when the queue is full; see ``SubscriberQueue``.
+            key: Coalescing key for ``BackpressurePolicy.COALESCE``.
+            timeout: How long ``BackpressurePolicy.BLOCK`` holds an overflowing event.
+            replay: Queue up to this many of the most recent retained events that
+                match the filter before any new ones.
+        """
+
+        queue: SubscriberQueue[Event] = SubscriberQueue(
+            maxsize, policy=policy, key=key, timeout=timeout
+        )
+        event_filter = EventFilter(
+            types=_as_tuple(types),
+            min_severity=min_severity,
+            trains=frozenset(_as_tuple(trains)),
+        )
+        if replay > 0:
+            matching = [event for event in self._history.since(0) if event_filter.matches(event)]
+            for event in matching[-replay:]:
+                queue.offer(event)
+        self._subscribers[queue] = event_filter
+        self._routes.clear()
         return queue
 
-    def unsubscribe(self, queue: asyncio.Queue[Event]) -> None:
-        self._subscribers.discard(queue)
+    def since(self, sequence: int) -> list[Event]:
+        """Return retained events published after ``sequence``, oldest first."""
+
+        return self._history.since(sequence)
+
+    def unsubscribe(self, queue: SubscriberQueue[Event]) -> None:
+        if self._subscribers.pop(queue, None) is not None:
+            self._routes.clear()
+            queue.close()
+
+    def stats(self) -> list[tuple[EventFilter, SubscriptionStats]]:
+        """Delivery counters for every active subscription."""
+
+        return [(event_filter, queue.stats) for queue, event_filter in self._subscribers.items()]
+
+    def publish_nowait(self, event: Event) -> None:
+        """Deliver ``event`` to every interested subscriber without awaiting.
+
+        Enqueueing never suspends, so publishers never contend with each other;
+        callers on the event loop thread can log without an ``await``.
+        """
+
+        self._sequence += 1
+        if event.sequence:
+            # Already published once; keep that copy's sequence intact.
+            event = replace(event, sequence=self._sequence)
+        else:
+            object.__setattr__(event, "sequence", self._sequence)
+        self._history.append(event)
+        train = _event_train(event)
+        for queue, trains in self._route(event):
+            if trains and train not in trains:
+                continue
+            queue.offer(event)
 
     async def publish(self, event: Event) -> None:
-        if self._loop is None:
-            try:
-                self._loop = asyncio.get_running_loop()
-            except RuntimeError:
-                self._loop = None
-        async with self._lock:
-            dead: list[asyncio.Queue[Event]] = []
-            for queue in self._subscribers:
-                try:
-                    queue.put_nowait(event)
-                except asyncio.QueueFull:
-                    try:
-                        queue.get_nowait()
-                        queue.put_nowait(event)
-                    except asyncio.QueueEmpty:
-                        dead.append(queue)
-            for queue in dead:
-                self._subscribers.discard(queue)
+        self.publish_nowait(event)
 
     async def log(self, message: str, severity: EventSeverity = EventSeverity.INFO):
-        await self.publish(Event(type="log", message=message, severity=severity))
+        self.publish_nowait(Event(type="log", message=message, severity=severity))
+
+    def _route(self, event: Event) -> _Route:
+        key = (event.type, event.severity)
+        route = self._routes.get(key)
+        if route is None:
+            route = tuple(
+                (queue, event_filter.trains)
+                for queue, event_filter in self._subscribers.items()
+                if event_filter.matches_route(event.type, event.severity)
+            )
+            self._routes[key] = route
+        return route
+
+
+def _as_tuple(value: str | Iterable[str] | None) -> tuple[str, ...]:
+    if value is None:
+        return ()
+    if isinstance(value, str):
+        return (value,)
+    return tuple(value)
+
+
+@dataclass(frozen=True)
+class TrainStateDelta:
+    """Change to a single train produced by one StateStore commit.
+
+    ``train`` is ``None`` when the train was removed from the store.
+    """
+
+    identifier: str
+    train: TrainState | None
+    changed: frozenset[str]
+    version: int
+
+
+_TRAIN_FIELDS: tuple[str, ...] = tuple(f.name for f in fields(TrainState))
+
+
+def diff_train(previous: TrainState | None, current: TrainState) -> frozenset[str]:
+    """Return the names of TrainState fields that differ between two snapshots."""
+
+    if previous is None:
+        return frozenset(_TRAIN_FIELDS)
+    if previous is current:
+        return frozenset()
+    return frozenset(
+        name for name in _TRAIN_FIELDS if getattr(previous, name) != getattr(current, name)
+    )
+
+
+class StateTransaction:
+    """Train changes staged against a StateStore and committed as one version."""
+
+    def __init__(self, store: StateStore) -> None:
+        self._store = store
+        self._pending: dict[str, TrainState | None] = {}  # None marks a removal
+        self._open = True
+
+    @property
+    def is_open(self) -> bool:
+        return self._open
+
+    def get_train(self, identifier: str) -> TrainState | None:
+        """Return the staged train if any, otherwise the committed one."""
+
+        if identifier in self._pending:
+            return self._pending[identifier]
+        return self._store._state.get_train(identifier)
+
+    def upsert_trains(self, trains: Iterable[TrainState]) -> None:
+        for train in trains:
+            self._pending[train.identifier] = train
+
+    def update_train(self, identifier: str, **changes: Any) -> TrainState:
+        train = self.get_train(identifier)
+        if train is None:
+            raise KeyError(f"Train `{identifier}` not found in state store.")
+        updated_train = replace(train, **changes)
+        self._pending[identifier] = updated_train
+        return updated_train
+
+    def remove_train(self, identifier: str) -> None:
+        if self.get_train(identifier) is None:
+            raise KeyError(f"Train `{identifier}` not found in state store.")
+        self._pending[identifier] = None
+
+    def _close(self) -> tuple[tuple[TrainState, ...], tuple[str, ...]]:
+        self._open = False
+        trains = tuple(train for train in self._pending.values() if train is not None)
+        removed = tuple(identifier for identifier, train in self._pending.items() if train is None)
+        return trains, removed
+
 
 class StateStore:
     """Concurrency-safe store for immutable AppState snapshots."""
@@ -126,73 +577,293 @@ class StateStore:
     def __init__(self, initial_state: AppState | None = None) -> None:
         self._state = initial_state or AppState()
         self._lock = asyncio.Lock()
-        self._subscribers: set[asyncio.Queue[AppState]] = set()
+        self._subscribers: set[SubscriberQueue[AppState]] = set()
+        self._delta_subscribers: set[SubscriberQueue[TrainStateDelta]] = set()
+        self._waiters: list[_StateWaiter] = []
+        self._suppressed_updates = 0
+        self._transaction: ContextVar[StateTransaction | None] = ContextVar(
+            f"legotrains_state_transaction_{id(self)}", default=None
+        )
+
+    @property
+    def version(self) -> int:
+        """Version of the current snapshot; incremented by every commit."""
+
+        return self._state.version
+
+    @property
+    def suppressed_updates(self) -> int:
+        """Train updates dropped because they matched the stored state."""
+
+        return self._suppressed_updates
 
     async def snapshot(self) -> AppState:
         async with self._lock:
             return self._state
 
+    @contextlib.asynccontextmanager
+    async def transaction(self) -> AsyncIterator[StateTransaction]:
+        """Batch every change made inside the block into a single commit.
+
+        While the block is active, ``upsert_trains`` and ``update_train`` calls from
+        the same task (and tasks it spawns) are staged instead of broadcast. On a
+        clean exit the staged trains are committed as one version with one
+        broadcast; if the block raises, they are discarded. Nested blocks join the
+        outermost transaction.
+        """
+
+        active = self._transaction.get()
+        if active is not None and active.is_open:
+            yield active
+            return
+        transaction = StateTransaction(self)
+        token = self._transaction.set(transaction)
+        try:
+            yield transaction
+        except BaseException:
+            transaction._close()
+            raise
+        finally:
+            self._transaction.reset(token)
+        trains, removed = transaction._close()
+        if not trains and not removed:
+            return
+        async with self._lock:
+            new_state, deltas = self._commit(trains, removed)
+        if deltas:
+            await self._broadcast(new_state, deltas)
+
     async def upsert_trains(self, trains: Iterable[TrainState]) -> AppState:
+        transaction = self._active_transaction()
+        if transaction is not None:
+            transaction.upsert_trains(trains)
+            return self._state
         async with self._lock:
-            current = {train.identifier: train for train in self._state.trains}
-            for train in trains:
-                current[train.identifier] = train
-            self._state = AppState(trains=tuple(current.values()))
-            new_state = self._state
-        await self._broadcast(new_state)
+            new_state, deltas = self._commit(trains)
+        if deltas:
+            await self._broadcast(new_state, deltas)
         return new_state
 
     async def update_train(self, identifier: str, **changes: Any) -> TrainState:
+        transaction = self._active_transaction()
+        if transaction is not None:
+            return transaction.update_train(identifier, **changes)
         async with self._lock:
             train = self._find_train(identifier)
             updated_train = replace(train, **changes)
-            trains = {
-                t.identifier: (updated_train if t.identifier == identifier else t)
-                for t in self._state.trains
-            }
-            self._state = AppState(trains=tuple(trains.values()))
-            new_state = self._state
-        await self._broadcast(new_state)
+            _, deltas = self._commit((updated_train,))
+        if not deltas:
+            return train
+        await self._broadcast(self._state, deltas)
         return updated_train
 
-    def subscribe(self, *, maxsize: int = 1) -> asyncio.Queue[AppState]:
-        queue: asyncio.Queue[AppState] = asyncio.Queue(maxsize=maxsize)
-        queue.put_nowait(self._state)
+    async def remove_train(self, identifier: str) -> AppState:
+        """Drop ``identifier`` from the store, broadcasting a delta with ``train=None``."""
+
+        transaction = self._active_transaction()
+        if transaction is not None:
+            transaction.remove_train(identifier)
+            return self._state
+        async with self._lock:
+            self._find_train(identifier)
+            new_state, deltas = self._commit((), (identifier,))
+        await self._broadcast(new_state, deltas)
+        return new_state
+
+    async def compare_and_swap(self, expected_version: int, trains: Iterable[TrainState]) -> AppState | None:
+        """Commit ``trains`` only if the store is still at ``expected_version``.
+
+        Returns the new snapshot, or ``None`` when another commit got there first.
+        Runs immediately even inside a ``transaction()`` block.
+        """
+
+        async with self._lock:
+            if self._state.version != expected_version:
+                return None
+            new_state, deltas = self._commit(trains)
+        if deltas:
+            await self._broadcast(new_state, deltas)
+        return new_state
+
+    async def wait_for(
+        self,
+        predicate: Callable[[AppState], bool],
+        *,
+        trains: Iterable[str] | None = None,
+        timeout: float | None = None,
+    ) -> AppState:
+        """Wait until ``predicate`` holds for a committed snapshot and return it.
+
+        The predicate is evaluated by the committer, so the waiting task only wakes
+        up once it is satisfied. Passing ``trains`` restricts evaluation to commits
+        that change one of those trains. Raises ``TimeoutError`` after ``timeout``.
+        """
+
+        if predicate(self._state):
+            return self._state
+        waiter = _StateWaiter(
+            predicate=predicate,
+            trains=frozenset(trains) if trains is not None else None,
+            future=asyncio.get_running_loop().create_future(),
+        )
+        self._waiters.append(waiter)
+        try:
+            return await asyncio.wait_for(waiter.future, timeout=timeout)
+        finally:
+            with contextlib.suppress(ValueError):
+                self._waiters.remove(waiter)
+
+    def subscribe(
+        self,
+        *,
+        maxsize: int = 1,
+        policy: BackpressurePolicy = BackpressurePolicy.DROP_OLDEST,
+        timeout: float = 1.0,
+    ) -> SubscriberQueue[AppState]:
+        queue: SubscriberQueue[AppState] = SubscriberQueue(maxsize, policy=policy, timeout=timeout)
+        queue.offer(self._state)
         self._subscribers.add(queue)
         return queue
 
-    def unsubscribe(self, queue: asyncio.Queue[AppState]) -> None:
+    def unsubscribe(self, queue: SubscriberQueue[AppState]) -> None:
         self._subscribers.discard(queue)
+        queue.close()
+
+    def subscribe_deltas(
+        self,
+        *,
+        maxsize: int = 100,
+        policy: BackpressurePolicy = BackpressurePolicy.DROP_OLDEST,
+        timeout: float = 1.0,
+    ) -> SubscriberQueue[TrainStateDelta]:
+        """Subscribe to per-train changes instead of full snapshots.
+
+        No initial item is queued; pair this with ``snapshot()`` to seed the consumer.
+        With ``BackpressurePolicy.COALESCE`` pending deltas for the same train are
+        merged, so a slow consumer only sees the latest state of each train.
+        """
+
+        queue: SubscriberQueue[TrainStateDelta] = SubscriberQueue(
+            maxsize,
+            policy=policy,
+            key=_delta_key,
+            merge=_merge_deltas,
+            timeout=timeout,
+        )
+        self._delta_subscribers.add(queue)
+        return queue
+
+    def unsubscribe_deltas(self, queue: SubscriberQueue[TrainStateDelta]) -> None:
+        self._delta_subscribers.discard(queue)
+        queue.close()
 
     def _find_train(self, identifier: str) -> TrainState:
-        for train in self._state.trains:
-            if train.identifier == identifier:
-                return train
+        train = self._state.get_train(identifier)
+        if train is not None:
+            return train
         raise KeyError(f"Train `{identifier}` not found in state store.")
 
-    async def _broadcast(self, state: AppState) -> None:
-        dead: list[asyncio.Queue[AppState]] = []
+    def _active_transaction(self) -> StateTransaction | None:
+        transaction = self._transaction.get()
+        if transaction is not None and transaction.is_open:
+            return transaction
+        return None
+
+    def _commit(
+        self,
+        trains: Iterable[TrainState],
+        removed: Iterable[str] = (),
+    ) -> tuple[AppState, list[TrainStateDelta]]:
+        """Apply ``trains`` and removals as a single new version; must be called with the lock held.
+
+        Trains equal to what is already stored are skipped; if nothing changes, no
+        new snapshot is created and the version stays the same.
+        """
+
+        current = self._state
+        version = current.version + 1
+        deltas: list[TrainStateDelta] = []
+        gone = tuple(identifier for identifier in removed if current.get_train(identifier) is not None)
+        for identifier in gone:
+            deltas.append(
+                TrainStateDelta(
+                    identifier=identifier,
+                    train=None,
+                    changed=frozenset(_TRAIN_FIELDS),
+                    version=version,
+                )
+            )
+        for train in trains:
+            changed = diff_train(current.get_train(train.identifier), train)
+            if not changed:
+                self._suppressed_updates += 1
+                continue
+            deltas.append(
+                TrainStateDelta(
+                    identifier=train.identifier,
+                    train=train,
+                    changed=changed,
+                    version=version,
+                )
+            )
+        if deltas:
+            self._state = current._apply((delta.train for delta in deltas if delta.train), gone)
+        return self._state, deltas
+
+    async def _broadcast(self, state: AppState, deltas: Iterable[TrainStateDelta] = ()) -> None:
         for queue in self._subscribers:
+            queue.offer(state)
+        for delta in deltas:
+            for delta_queue in self._delta_subscribers:
+                delta_queue.offer(delta)
+        if self._waiters:
+            self._wake_waiters(state, deltas)
+
+    def _wake_waiters(self, state: AppState, deltas: Iterable[TrainStateDelta]) -> None:
+        touched = {delta.identifier for delta in deltas}
+        for waiter in tuple(self._waiters):
+            if waiter.future.done():
+                continue
+            if waiter.trains is not None and waiter.trains.isdisjoint(touched):
+                continue
             try:
-                queue.put_nowait(state)
-            except asyncio.QueueFull:
-                try:
-                    queue.get_nowait()
-                    queue.put_nowait(state)
-                except asyncio.QueueEmpty:
-                    dead.append(queue)
-        for queue in dead:
-            self._subscribers.discard(queue)
+                satisfied = waiter.predicate(state)
+            except Exception as exc:  # surface predicate bugs to the waiting task
+                waiter.future.set_exception(exc)
+                continue
+            if satisfied:
+                waiter.future.set_result(state)
+
+
+@dataclass(slots=True)
+class _StateWaiter:
+    predicate: Callable[[AppState], bool]
+    trains: frozenset[str] | None
+    future: asyncio.Future[AppState]
+
+
+def _delta_key(delta: TrainStateDelta) -> str:
+    return delta.identifier
+
+
+def _merge_deltas(previous: TrainStateDelta, current: TrainStateDelta) -> TrainStateDelta:
+    return replace(current, changed=previous.changed | current.changed)
 
 
 __all__ = [
     "AppState",
+    "CompactEvent",
     "Event",
     "EventBus",
+    "EventFilter",
+    "EventHistory",
     "EventSeverity",
     "HubConnectionState",
     "HubState",
     "StateStore",
+    "StateTransaction",
     "TrainMotion",
     "TrainState",
+    "TrainStateDelta",
+    "diff_train",
 ]
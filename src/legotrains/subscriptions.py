@@ -0,0 +1,171 @@
+"""Subscriber queues with configurable backpressure handling."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+from collections import OrderedDict, deque
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass
+from enum import Enum, auto
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+
+class BackpressurePolicy(Enum):
+    """What a subscriber queue does when a new item arrives while it is full."""
+
+    DROP_OLDEST = auto()
+    DROP_NEWEST = auto()
+    COALESCE = auto()
+    BLOCK = auto()
+
+
+@dataclass(slots=True)
+class SubscriptionStats:
+    """Delivery counters for a single subscriber queue."""
+
+    delivered: int = 0
+    dropped: int = 0
+    coalesced: int = 0
+
+
+class SubscriberQueue(asyncio.Queue[T]):
+    """``asyncio.Queue`` that applies a backpressure policy on non-blocking delivery.
+
+    Publishers call :meth:`offer`, which never suspends:
+
+    * ``DROP_OLDEST`` evicts the oldest queued item to make room.
+    * ``DROP_NEWEST`` discards the incoming item.
+    * ``COALESCE`` replaces a queued item with the same ``key`` in place (optionally
+      combining them with ``merge``); when full and nothing matches, the oldest is
+      evicted.
+    * ``BLOCK`` parks overflow in order and feeds it in as consumers free space;
+      at most ``max_overflow`` items (default ``maxsize``) are parked, further
+      ones are dropped, and an item still parked ``timeout`` seconds after it
+      arrived is dropped.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 0,
+        *,
+        policy: BackpressurePolicy = BackpressurePolicy.DROP_OLDEST,
+        key: Callable[[T], Hashable] | None = None,
+        merge: Callable[[T, T], T] | None = None,
+        timeout: float = 1.0,
+        max_overflow: int | None = None,
+    ) -> None:
+        if policy is BackpressurePolicy.COALESCE and key is None:
+            raise ValueError("COALESCE policy requires a key function.")
+        self._policy = policy
+        self._key = key
+        self._merge = merge
+        self._timeout = timeout
+        self._max_overflow = maxsize if max_overflow is None else max_overflow
+        self._overflow: deque[tuple[T, float]] = deque()  # (item, deadline)
+        self._drainer: asyncio.Task[None] | None = None
+        self._stats = SubscriptionStats()
+        super().__init__(maxsize)
+
+    @property
+    def policy(self) -> BackpressurePolicy:
+        return self._policy
+
+    @property
+    def stats(self) -> SubscriptionStats:
+        return self._stats
+
+    def offer(self, item: T) -> bool:
+        """Deliver ``item`` according to the policy; returns False if it was dropped."""
+
+        policy = self._policy
+        if policy is BackpressurePolicy.COALESCE:
+            key = self._key(item)  # type: ignore[misc]
+            if key in self._queue:
+                existing = self._queue[key]
+                self._queue[key] = self._merge(existing, item) if self._merge else item
+                self._stats.coalesced += 1
+                return True
+            if self.full():
+                self.get_nowait()
+                self._stats.dropped += 1
+        elif policy is BackpressurePolicy.BLOCK:
+            if self._overflow or self.full():
+                return self._park(item)
+        elif self.full():
+            if policy is BackpressurePolicy.DROP_NEWEST:
+                self._stats.dropped += 1
+                return False
+            self.get_nowait()
+            self._stats.dropped += 1
+        self.put_nowait(item)
+        self._stats.delivered += 1
+        return True
+
+    def close(self) -> None:
+        """Cancel pending overflow delivery for a BLOCK queue."""
+
+        if self._drainer:
+            self._drainer.cancel()
+            self._drainer = None
+        self._stats.dropped += len(self._overflow)
+        self._overflow.clear()
+
+    # asyncio.Queue storage hooks -------------------------------------------------
+
+    def _init(self, maxsize: int) -> None:
+        if self._policy is BackpressurePolicy.COALESCE:
+            self._queue: Any = OrderedDict()
+        else:
+            self._queue = deque()
+
+    def _put(self, item: T) -> None:
+        if self._policy is BackpressurePolicy.COALESCE:
+            self._queue[self._key(item)] = item  # type: ignore[misc]
+        else:
+            self._queue.append(item)
+
+    def _get(self) -> T:
+        if self._policy is BackpressurePolicy.COALESCE:
+            return self._queue.popitem(last=False)[1]
+        return self._queue.popleft()
+
+    # BLOCK policy ----------------------------------------------------------------
+
+    def _park(self, item: T) -> bool:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._stats.dropped += 1
+            return False
+        if len(self._overflow) >= self._max_overflow:
+            self._stats.dropped += 1
+            return False
+        self._overflow.append((item, loop.time() + self._timeout))
+        if self._drainer is None:
+            self._drainer = loop.create_task(self._drain())
+        return True
+
+    async def _drain(self) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            while self._overflow:
+                item, deadline = self._overflow[0]
+                try:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        raise asyncio.TimeoutError
+                    await asyncio.wait_for(self.put(item), timeout=remaining)
+                    self._stats.delivered += 1
+                except asyncio.TimeoutError:
+                    self._stats.dropped += 1
+                with contextlib.suppress(IndexError):
+                    self._overflow.popleft()
+        finally:
+            if self._drainer is asyncio.current_task():
+                self._drainer = None
+
+
+__all__ = ["BackpressurePolicy", "SubscriberQueue", "SubscriptionStats"]
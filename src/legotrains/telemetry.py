@@ -59,11 +59,12 @@ class EventBusHandler(logging.Handler):
             severity=_map_level(record.levelno),
             payload=payload,
         )
-        loop = self._loop or _get_event_loop()
-        if loop and loop.is_running():
-            asyncio.run_coroutine_threadsafe(self._bus.publish(event), loop)
+        running = _get_event_loop()
+        loop = self._loop or running
+        if loop and loop.is_running() and loop is not running:
+            loop.call_soon_threadsafe(self._bus.publish_nowait, event)
         else:
-            asyncio.run(self._bus.publish(event))
+            self._bus.publish_nowait(event)
 
 
 def _extract_payload(record: logging.LogRecord) -> dict[str, Any]:
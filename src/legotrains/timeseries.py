@@ -0,0 +1,235 @@
+"""Fixed-capacity per-train telemetry time series."""
+
+from __future__ import annotations
+
+import math
+import operator
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from itertools import compress
+from typing import Callable, Iterable
+
+from .state import TrainState
+
+SERIES_FIELDS: tuple[str, ...] = ("speed", "connection", "battery_level", "rssi")
+DEFAULT_CAPACITY = 4096
+_MISSING = math.nan
+
+
+@dataclass(frozen=True, slots=True)
+class WindowStats:
+    """Aggregate over the samples of one field inside a time window.
+
+    ``count`` is the number of non-missing samples that contributed.
+    """
+
+    count: int
+    minimum: float
+    maximum: float
+    mean: float
+
+
+_EMPTY_STATS = WindowStats(count=0, minimum=_MISSING, maximum=_MISSING, mean=_MISSING)
+
+
+class TrainSeries:
+    """Ring buffer of timestamped samples backed by typed arrays.
+
+    Each field lives in its own ``array('f')`` column next to an ``array('d')``
+    of monotonic timestamps, so a sample costs a few bytes rather than a
+    dataclass instance. Queries binary-search the timestamps in place and copy
+    only the requested range out of the ring. Missing values (e.g. battery level
+    before the hub reports it) are stored as NaN and skipped by aggregates.
+    ``connection`` holds ``HubConnectionState.value`` (0 when there is no hub).
+    """
+
+    __slots__ = ("_capacity", "_timestamps", "_columns", "_next", "_count")
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY) -> None:
+        if capacity <= 0:
+            raise ValueError("Series capacity must be positive.")
+        self._capacity = capacity
+        self._timestamps = array("d", bytes(8 * capacity))
+        self._columns = {name: array("f", [_MISSING]) * capacity for name in SERIES_FIELDS}
+        self._next = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    def append(self, timestamp: float, state: TrainState) -> None:
+        index = self._next
+        hub = state.hub
+        self._timestamps[index] = timestamp
+        columns = self._columns
+        columns["speed"][index] = state.speed
+        columns["connection"][index] = hub.connection_state.value if hub else 0
+        columns["battery_level"][index] = _MISSING if not hub or hub.battery_level is None else hub.battery_level
+        columns["rssi"][index] = _MISSING if not hub or hub.rssi is None else hub.rssi
+        self._next = (index + 1) % self._capacity
+        self._count = min(self._count + 1, self._capacity)
+
+    def samples(self, field: str, *, since: float | None = None) -> tuple[array, array]:
+        """Return ``(timestamps, values)`` in chronological order, optionally from ``since``."""
+
+        column = self._column(field)
+        start = 0 if since is None else self._bisect_left(since)
+        return self._slice(self._timestamps, start, self._count), self._slice(column, start, self._count)
+
+    def window(self, field: str, seconds: float, *, now: float) -> WindowStats:
+        """Min/max/time-weighted mean of ``field`` over the last ``seconds`` before ``now``.
+
+        Samples are steps: each value holds until the next sample, so the last
+        sample taken before the window opened counts as the value at its start.
+        """
+
+        column = self._column(field)
+        start = now - seconds
+        end = self._bisect_right(now)
+        first = max(self._bisect_right(start) - 1, 0)
+        if first >= end:
+            return _EMPTY_STATS
+        times = self._slice(self._timestamps, first, end)
+        values = self._slice(column, first, end)
+        if times[0] < start:
+            times[0] = start
+        ends = times[1:]
+        ends.append(now)
+        return _aggregate(values, map(operator.sub, ends, times))
+
+    def downsample(
+        self,
+        field: str,
+        bucket_seconds: float,
+        *,
+        since: float | None = None,
+    ) -> list[tuple[float, WindowStats]]:
+        """Aggregate ``field`` into consecutive buckets of ``bucket_seconds``.
+
+        Returns ``(bucket_start, stats)`` pairs for non-empty buckets; useful for
+        feeding charts a bounded number of points regardless of sample rate.
+        """
+
+        if bucket_seconds <= 0:
+            raise ValueError("bucket_seconds must be positive.")
+        timestamps, values = self.samples(field, since=since)
+        if not timestamps:
+            return []
+        buckets: list[tuple[float, WindowStats]] = []
+        start = 0
+        total = len(timestamps)
+        while start < total:
+            bucket_start = timestamps[start] - (timestamps[start] % bucket_seconds)
+            end = bisect_left(timestamps, bucket_start + bucket_seconds, lo=start)
+            buckets.append((bucket_start, _aggregate(values[start:end])))
+            start = end
+        return buckets
+
+    def _column(self, field: str) -> array:
+        try:
+            return self._columns[field]
+        except KeyError as exc:
+            raise KeyError(f"Unknown series field `{field}`.") from exc
+
+    def _bisect_left(self, timestamp: float) -> int:
+        """Chronological index of the first sample at or after ``timestamp``."""
+
+        return self._bisect(bisect_left, timestamp)
+
+    def _bisect_right(self, timestamp: float) -> int:
+        """Chronological index of the first sample after ``timestamp``."""
+
+        return self._bisect(bisect_right, timestamp)
+
+    def _bisect(self, search: Callable[..., int], timestamp: float) -> int:
+        # The ring holds at most two sorted runs: [_next, capacity) then [0, _next).
+        oldest = self._next if self._count == self._capacity else 0
+        if oldest == 0:
+            return search(self._timestamps, timestamp, 0, self._count)
+        older = self._capacity - oldest
+        index = search(self._timestamps, timestamp, oldest, self._capacity) - oldest
+        if index < older:
+            return index
+        return older + search(self._timestamps, timestamp, 0, oldest)
+
+    def _slice(self, column: array, start: int, stop: int) -> array:
+        """Copy of chronological samples ``[start, stop)``; at most two C-level slices."""
+
+        if start >= stop:
+            return column[:0]
+        oldest = self._next if self._count == self._capacity else 0
+        begin = (oldest + start) % self._capacity
+        end = begin + stop - start
+        if end <= self._capacity:
+            return column[begin:end]
+        return column[begin:] + column[: end - self._capacity]
+
+
+def _aggregate(values: array, durations: Iterable[float] | None = None) -> WindowStats:
+    """Stats over the non-NaN ``values``; the mean is weighted by ``durations`` when given.
+
+    NaN filtering and the sums run through ``compress``/``map`` so no Python code
+    executes per sample.
+    """
+
+    present_mask = list(map(operator.eq, values, values))  # NaN != NaN
+    present = values if all(present_mask) else array(values.typecode, compress(values, present_mask))
+    if not present:
+        return _EMPTY_STATS
+    mean = math.fsum(present) / len(present)
+    if durations is not None:
+        weights = list(compress(durations, present_mask))
+        held = math.fsum(weights)
+        if held > 0:
+            mean = math.fsum(map(operator.mul, present, weights)) / held
+    return WindowStats(count=len(present), minimum=min(present), maximum=max(present), mean=mean)
+
+
+class TelemetryRecorder:
+    """Keeps a ``TrainSeries`` per train, fed by the registry whenever a train's state changes.
+
+    Unchanged updates are not recorded, so a value stays in effect until the next
+    sample; ``window`` accounts for that.
+    """
+
+    def __init__(
+        self,
+        *,
+        capacity: int = DEFAULT_CAPACITY,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._capacity = capacity
+        self._clock = clock
+        self._series: dict[str, TrainSeries] = {}
+
+    def record(self, state: TrainState) -> None:
+        series = self._series.get(state.identifier)
+        if series is None:
+            series = self._series[state.identifier] = TrainSeries(self._capacity)
+        series.append(self._clock(), state)
+
+    def series(self, identifier: str) -> TrainSeries:
+        try:
+            return self._series[identifier]
+        except KeyError as exc:
+            raise KeyError(f"No telemetry recorded for `{identifier}`.") from exc
+
+    def window(self, identifier: str, field: str, seconds: float) -> WindowStats:
+        """Stats for ``field`` of ``identifier`` over the last ``seconds``."""
+
+        series = self._series.get(identifier)
+        if series is None:
+            return _EMPTY_STATS
+        return series.window(field, seconds, now=self._clock())
+
+    def discard(self, identifier: str) -> None:
+        self._series.pop(identifier, None)
+
+
+__all__ = ["SERIES_FIELDS", "TelemetryRecorder", "TrainSeries", "WindowStats"]
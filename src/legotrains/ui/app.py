@@ -12,11 +12,15 @@ from textual.events import Key
 from textual.widgets import Footer, Header, ListView
 
 from ..config import DEFAULT_TRAINS
+from ..config_watcher import ConfigWatcher
 from ..control_commands import TrainCommandHandler
 from ..control_input import InputMapper
 from ..programs import load_program
-from ..state import AppState, Event, EventBus, StateStore, TrainMotion, TrainState
+from ..state import AppState, Event, EventBus, StateStore, TrainMotion, TrainState, TrainStateDelta
 from ..hardware_scanner import BleScannerService
+from ..journal import EventJournal
+from ..session_supervisor import SessionSupervisor
+from ..subscriptions import BackpressurePolicy, SubscriberQueue
 from .widgets import LogPanel, ProgramList, TrainPanel, TrainPanelData
 
 
@@ -51,52 +55,40 @@ class LegoTrainsApp(App[None]):
         input_mapper: InputMapper | None = None,
         event_bus: EventBus | None = None,
         scanner: BleScannerService | None = None,
+        journal: EventJournal | None = None,
+        config_watcher: ConfigWatcher | None = None,
+        supervisor: SessionSupervisor | None = None,
     ) -> None:
         super().__init__()
         self._state_store = state_store or self._build_default_state_store()
         self._program_names = list(program_names or [])
         self._state_task: asyncio.Task[None] | None = None
-        self._state_queue: asyncio.Queue[AppState] | None = None
+        self._delta_queue: SubscriberQueue[TrainStateDelta] | None = None
+        self._synced_version = 0
+        self._seen_dropped = 0
         self._command_handler = command_handler
         self._input_mapper = input_mapper
         self._event_bus = event_bus
         self._scanner = scanner
+        self._journal = journal
+        self._config_watcher = config_watcher
+        self._supervisor = supervisor
         self._event_queue: asyncio.Queue[Event] | None = None
         self._event_task: asyncio.Task[None] | None = None
         self._log_panel: LogPanel
 
     def compose(self) -> ComposeResult:
-        self._passenger_panel = TrainPanel(
-            TrainPanelData(
-                name="PassengerTrain",
-                status="<Stopped>",
-                speed=0,
-                connection="DISCONNECTED",
-            ),
-            id="passenger-panel",
-        )
-        self._freight_panel = TrainPanel(
-            TrainPanelData(
-                name="FreightTrain",
-                status="<Stopped>",
-                speed=0,
-                connection="DISCONNECTED",
-            ),
-            id="freight-panel",
-        )
         self._program_list = ProgramList(programs=self._program_names)
-        self._panels = {
-            "passenger": self._passenger_panel,
-            "freight": self._freight_panel,
-        }
+        # Train panels are mounted from the state store, so trains added or
+        # removed at runtime appear and disappear without a restart. They
+        # alternate around the program list, starting on its right, which keeps
+        # the default pair as passenger | programs | freight.
+        self._panels: dict[str, TrainPanel] = {}
+        self._left_panels: set[str] = set()
+        self._main_panels = Container(self._program_list, id="main-panels")
 
         yield Header(show_clock=True)
-        yield Container(
-            self._passenger_panel,
-            self._program_list,
-            self._freight_panel,
-            id="main-panels",
-        )
+        yield self._main_panels
         self._log_panel = LogPanel()
         yield self._log_panel
         yield Footer()
@@ -107,7 +99,8 @@ class LegoTrainsApp(App[None]):
             if event.character:
                 command = self._input_mapper.map_key(event.character)
                 if command:
-                    await self._command_handler.handle(command)
+                    # Don't block the message loop on BLE; held keys coalesce in the mailbox.
+                    self._command_handler.submit(command)
                     return
         if event.key == "q":
             await self.action_quit()
@@ -127,16 +120,29 @@ class LegoTrainsApp(App[None]):
         await program.run()
 
     async def on_mount(self) -> None:
-        self._state_queue = self._state_store.subscribe(maxsize=5)
+        if self._journal:
+            self._journal.start()
+        self._delta_queue = self._state_store.subscribe_deltas(
+            maxsize=100, policy=BackpressurePolicy.COALESCE
+        )
+        self._apply_state(await self._state_store.snapshot())
         loop = asyncio.get_running_loop()
         self._state_task = loop.create_task(self._watch_state())
         if self._event_bus:
-            self._event_queue = self._event_bus.subscribe(maxsize=20)
+            self._event_queue = self._event_bus.subscribe(maxsize=100)
             self._event_task = loop.create_task(self._watch_events())
         if self._scanner:
             self._scanner.start()
+        if self._config_watcher:
+            self._config_watcher.start()
+        if self._supervisor:
+            self._supervisor.start()
 
     async def on_unmount(self) -> None:
+        if self._supervisor:
+            await self._supervisor.stop()
+        if self._config_watcher:
+            await self._config_watcher.stop()
         if self._scanner:
             await self._scanner.stop()
         if self._state_task:
@@ -144,18 +150,30 @@ class LegoTrainsApp(App[None]):
             with contextlib.suppress(asyncio.CancelledError):
                 await self._state_task
             self._state_task = None
+        if self._delta_queue:
+            self._state_store.unsubscribe_deltas(self._delta_queue)
+            self._delta_queue = None
         if self._event_task:
             self._event_task.cancel()
             with contextlib.suppress(asyncio.CancelledError):
                 await self._event_task
             self._event_task = None
+        if self._journal:
+            await self._journal.stop()
 
     async def _watch_state(self) -> None:
-        if not self._state_queue:
+        queue = self._delta_queue
+        if not queue:
             return
         while True:
-            state = await self._state_queue.get()
-            self._apply_state(state)
+            delta = await queue.get()
+            if queue.stats.dropped != self._seen_dropped:
+                # COALESCE evicted some train's latest delta; it will not be
+                # resent, so catch up from a full snapshot.
+                self._seen_dropped = queue.stats.dropped
+                self._resync(await self._state_store.snapshot())
+            if delta.version > self._synced_version:
+                self._apply_delta(delta)
 
     async def _watch_events(self) -> None:
         if not self._event_queue:
@@ -165,12 +183,41 @@ class LegoTrainsApp(App[None]):
             self._log_panel.add_entry(event.message)
 
     def _apply_state(self, state: AppState) -> None:
+        self._synced_version = state.version
         for train in state.trains:
-            panel = self._panels.get(train.identifier)
-            if panel:
-                panel.update_data(self._panel_data_from_train(train))
+            self._show_train(train)
         self._program_list.update_programs(self._program_names)
 
+    def _resync(self, state: AppState) -> None:
+        for identifier in [identifier for identifier in self._panels if state.get_train(identifier) is None]:
+            self._remove_panel(identifier)
+        self._apply_state(state)
+
+    def _apply_delta(self, delta: TrainStateDelta) -> None:
+        if delta.train is None:
+            self._remove_panel(delta.identifier)
+            return
+        self._show_train(delta.train)
+
+    def _remove_panel(self, identifier: str) -> None:
+        panel = self._panels.pop(identifier, None)
+        self._left_panels.discard(identifier)
+        if panel:
+            panel.remove()
+
+    def _show_train(self, train: TrainState) -> None:
+        data = self._panel_data_from_train(train)
+        panel = self._panels.get(train.identifier)
+        if panel:
+            panel.update_data(data)
+            return
+        panel = self._panels[train.identifier] = TrainPanel(data)
+        if len(self._panels) - 1 - len(self._left_panels) > len(self._left_panels):
+            self._left_panels.add(train.identifier)
+            self._main_panels.mount(panel, before=self._program_list)
+        else:
+            self._main_panels.mount(panel)
+
     @staticmethod
     def _panel_data_from_train(train: TrainState) -> TrainPanelData:
         status = "<Moving>" if train.speed != 0 or train.motion != TrainMotion.STOPPED else "<Stopped>"
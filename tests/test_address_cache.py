@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from legotrains.address_cache import AddressCache
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_cache_round_trips_and_filters_by_adapter_and_age(tmp_path: Path) -> None:
+    path = tmp_path / "cache" / "addresses.json"
+    clock = Clock()
+    cache = AddressCache(path, adapter="hci0", max_age=60, clock=clock)
+    assert cache.remember("FreightTrain", "AA:BB:CC:DD:EE:01")
+    assert not cache.remember("freighttrain", "AA:BB:CC:DD:EE:01")
+    cache.save()
+
+    reloaded = AddressCache.load(path, adapter="hci0", max_age=60, clock=clock)
+    entry = reloaded.get("FREIGHTTRAIN")
+    assert entry is not None
+    assert (entry.address, entry.last_seen, entry.adapter) == ("AA:BB:CC:DD:EE:01", 1_000.0, "hci0")
+    assert AddressCache.load(path, adapter="hci1", clock=clock).get("FreightTrain") is None
+
+    clock.now += 61
+    assert reloaded.get("FreightTrain") is None
+    assert reloaded.forget("FreightTrain")
+    assert len(reloaded) == 0
+
+
+def test_unreadable_cache_starts_empty(tmp_path: Path) -> None:
+    path = tmp_path / "addresses.json"
+    path.write_text("{not json", encoding="utf-8")
+
+    assert len(AddressCache.load(path)) == 0
+    assert len(AddressCache.load(tmp_path / "missing.json")) == 0
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from legotrains.command_mailbox import CommandMailbox, CommandOutcome
+
+
+class GatedController:
+    def __init__(self) -> None:
+        self.writes: list[tuple[str, int | str]] = []
+        self.gate = asyncio.Event()
+        self.gate.set()
+        self.fail = False
+
+    async def set_speed(self, identifier: str, speed: int) -> None:
+        self.writes.append((identifier, speed))
+        await self.gate.wait()
+        if self.fail:
+            raise RuntimeError("write failed")
+
+    async def stop(self, identifier: str) -> None:
+        self.writes.append((identifier, "stop"))
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_pending_speeds_coalesce_to_latest() -> None:
+    async def scenario() -> None:
+        controller = GatedController()
+        controller.gate.clear()
+        mailbox = CommandMailbox(controller)
+
+        first = mailbox.post_speed("freight", 10)
+        await asyncio.sleep(0)  # first write is now in flight
+        later = [mailbox.post_speed("freight", speed) for speed in (20, 30, 40)]
+        assert mailbox.target("freight") == 40
+        controller.gate.set()
+        outcomes = await asyncio.gather(first, *later)
+
+        assert controller.writes == [("freight", 10), ("freight", 40)]
+        assert mailbox.coalesced == 2
+        written, superseded = CommandOutcome.WRITTEN, CommandOutcome.SUPERSEDED
+        assert outcomes == [written, superseded, superseded, written]
+        assert mailbox.target("freight") is None
+
+    run(scenario())
+
+
+def test_stop_bypasses_rate_limit_and_supersedes_pending_speed() -> None:
+    async def scenario() -> None:
+        controller = GatedController()
+        mailbox = CommandMailbox(controller, max_write_rate=1.0)
+
+        await mailbox.post_speed("freight", 10)
+        pending = mailbox.post_speed("freight", 50)  # held back by the rate limit
+        stop = mailbox.post_stop("freight")
+        outcomes = await asyncio.wait_for(asyncio.gather(pending, stop), timeout=0.5)
+
+        assert controller.writes == [("freight", 10), ("freight", "stop")]
+        assert outcomes == [CommandOutcome.SUPERSEDED, CommandOutcome.WRITTEN]
+
+    run(scenario())
+
+
+def test_write_errors_reach_the_caller_whose_speed_was_written() -> None:
+    async def scenario() -> None:
+        controller = GatedController()
+        controller.fail = True
+        mailbox = CommandMailbox(controller)
+
+        futures = [mailbox.post_speed("freight", 10), mailbox.post_speed("freight", 20)]
+        results = await asyncio.gather(*futures, return_exceptions=True)
+
+        assert results[0] is CommandOutcome.SUPERSEDED
+        assert isinstance(results[1], RuntimeError)
+        with pytest.raises(ValueError):
+            CommandMailbox(controller, max_write_rate=0)
+
+    run(scenario())
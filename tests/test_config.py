@@ -4,7 +4,16 @@ from pathlib import Path
 
 import pytest
 
-from legotrains.config import AppConfig, BLEConfig, ConfigError, TrainConfig, load_config
+from legotrains.config import (
+    AppConfig,
+    BLEConfig,
+    DEFAULT_ADDRESS_CACHE_PATH,
+    ConfigError,
+    TrainConfig,
+    diff_configs,
+    load_config,
+    resolve_config_path,
+)
 
 
 def test_load_config_defaults_when_file_missing(tmp_path: Path) -> None:
@@ -99,3 +108,101 @@ def test_mac_is_optional_and_defaults_to_name(tmp_path: Path) -> None:
 
     assert config.trains[0].hub_mac is None
     assert config.trains[0].match_identifier == "Passenger"
+
+
+def test_diff_configs_reports_train_and_ble_changes() -> None:
+    ble = BLEConfig(adapter=None, scan_interval=2.5, connect_timeout=8.0)
+    old = AppConfig(
+        trains=(
+            TrainConfig(identifier="freight", name="Freight", hub_mac="AA:BB:CC:DD:EE:01"),
+            TrainConfig(identifier="passenger", name="Passenger"),
+            TrainConfig(identifier="tram", name="Tram"),
+        ),
+        ble=ble,
+        log_level="INFO",
+    )
+    new = AppConfig(
+        trains=(
+            TrainConfig(identifier="freight", name="Freight", hub_mac="AA:BB:CC:DD:EE:02"),
+            TrainConfig(identifier="passenger", name="Passenger"),
+            TrainConfig(identifier="express", name="Express"),
+        ),
+        ble=BLEConfig(adapter=None, scan_interval=5.0, connect_timeout=8.0),
+        log_level="INFO",
+    )
+
+    diff = diff_configs(old, new)
+
+    assert [train.identifier for train in diff.added] == ["express"]
+    assert [train.identifier for train in diff.removed] == ["tram"]
+    assert diff.changed == (new.trains[0],)
+    assert diff.scan_interval == 5.0
+    assert diff.connect_timeout is None
+    assert diff.max_write_rate is None
+    assert diff.restart_required == ()
+    assert diff_configs(old, old).is_empty
+
+
+def test_diff_configs_flags_settings_that_need_a_restart() -> None:
+    old = AppConfig(
+        trains=(), ble=BLEConfig(adapter=None, scan_interval=2.5, connect_timeout=8.0), log_level="INFO"
+    )
+    new = AppConfig(
+        trains=(),
+        ble=BLEConfig(
+            adapter="hci1",
+            scan_interval=2.5,
+            connect_timeout=8.0,
+            max_concurrent_connects=old.ble.max_concurrent_connects + 1,
+            max_write_rate=old.ble.max_write_rate * 2,
+        ),
+        log_level="DEBUG",
+        hardware_adapter="lwp3",
+    )
+
+    diff = diff_configs(old, new)
+
+    assert not diff.is_empty
+    assert diff.max_write_rate == new.ble.max_write_rate
+    assert diff.restart_required == (
+        "ble.adapter",
+        "ble.max_concurrent_connects",
+        "hardware_adapter",
+        "log_level",
+    )
+
+
+def test_resolve_config_path_prefers_override_then_env(tmp_path: Path) -> None:
+    env = {"LEGOTRAINS_CONFIG_FILE": str(tmp_path / "env.yaml")}
+
+    assert resolve_config_path(tmp_path / "cli.yaml", env) == tmp_path / "cli.yaml"
+    assert resolve_config_path(None, env) == tmp_path / "env.yaml"
+
+
+def test_max_concurrent_connects_must_be_positive_integer(tmp_path: Path) -> None:
+    yaml_path = tmp_path / "config.yaml"
+    yaml_path.write_text("ble:\n  max_concurrent_connects: 4\n", encoding="utf-8")
+    assert load_config(path=yaml_path, env={}).ble.max_concurrent_connects == 4
+
+    with pytest.raises(ConfigError):
+        load_config(path=tmp_path / "missing.yaml", env={"LEGOTRAINS_BLE_MAX_CONCURRENT_CONNECTS": "0"})
+
+
+def test_hardware_adapter_selection(tmp_path: Path) -> None:
+    missing = tmp_path / "missing.yaml"
+    assert load_config(path=missing, env={}).hardware_adapter == "pylgbst"
+    assert load_config(path=missing, env={"LEGOTRAINS_HARDWARE_ADAPTER": "LWP3"}).hardware_adapter == "lwp3"
+    with pytest.raises(ConfigError):
+        load_config(path=missing, env={"LEGOTRAINS_HARDWARE_ADAPTER": "serial"})
+
+
+def test_address_cache_path_defaults_and_can_be_disabled(tmp_path: Path) -> None:
+    missing = tmp_path / "missing.yaml"
+    assert load_config(path=missing, env={}).address_cache == DEFAULT_ADDRESS_CACHE_PATH
+    assert load_config(path=missing, env={"LEGOTRAINS_ADDRESS_CACHE": "off"}).address_cache is None
+
+    yaml_path = tmp_path / "config.yaml"
+    yaml_path.write_text("address_cache: null\n", encoding="utf-8")
+    assert load_config(path=yaml_path, env={}).address_cache is None
+    yaml_path.write_text(f"address_cache: {tmp_path / 'cache.json'}\n", encoding="utf-8")
+    assert load_config(path=yaml_path, env={}).address_cache == tmp_path / "cache.json"
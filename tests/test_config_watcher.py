@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import asyncio
+import os
+from pathlib import Path
+
+from legotrains.config import AppConfig, ConfigDiff, load_config
+from legotrains.config_watcher import ConfigWatcher
+from legotrains.state import EventBus
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def _write(path: Path, body: str, mtime_ns: int) -> None:
+    path.write_text(body, encoding="utf-8")
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_watcher_applies_only_on_change(tmp_path: Path) -> None:
+    async def scenario() -> None:
+        path = tmp_path / "config.yaml"
+        _write(path, "trains:\n  - id: freight\n    name: Freight\n", 1_000_000_000)
+        applied: list[ConfigDiff] = []
+
+        async def apply(config: AppConfig, diff: ConfigDiff) -> None:
+            applied.append(diff)
+
+        watcher = ConfigWatcher(path, load_config(path, env={}), apply, env={})
+        assert await watcher.check() is None
+
+        _write(
+            path,
+            "trains:\n  - id: freight\n    name: Freight\n  - id: tram\n    name: Tram\nble:\n  scan_interval: 4\n",
+            2_000_000_000,
+        )
+        diff = await watcher.check()
+
+        assert diff is not None and applied == [diff]
+        assert [train.identifier for train in diff.added] == ["tram"]
+        assert diff.scan_interval == 4.0
+        assert await watcher.check() is None
+
+    run(scenario())
+
+
+def test_watcher_keeps_config_when_reload_fails(tmp_path: Path) -> None:
+    async def scenario() -> None:
+        path = tmp_path / "config.yaml"
+        _write(path, "trains:\n  - id: freight\n    name: Freight\n", 1_000_000_000)
+        bus = EventBus()
+        queue = bus.subscribe()
+        original = load_config(path, env={})
+
+        async def apply(config: AppConfig, diff: ConfigDiff) -> None:
+            raise AssertionError("should not apply")
+
+        watcher = ConfigWatcher(path, original, apply, env={}, event_bus=bus)
+        _write(path, "trains:\n  - id: freight\n    name: Freight\n    hub_mac: nope\n", 2_000_000_000)
+
+        assert await watcher.check() is None
+        assert watcher.config is original
+        assert queue.get_nowait().type == "config_reload"
+
+    run(scenario())
+
+
+def test_watcher_ignores_truncated_file_and_retries_failed_apply(tmp_path: Path) -> None:
+    async def scenario() -> None:
+        path = tmp_path / "config.yaml"
+        _write(path, "trains:\n  - id: t1\n    name: Tram\n", 1_000_000_000)
+        original = load_config(path, env={})
+        applied: list[ConfigDiff] = []
+        fail = [True]
+
+        async def apply(config: AppConfig, diff: ConfigDiff) -> None:
+            if fail[0]:
+                raise RuntimeError("hub busy")
+            applied.append(diff)
+
+        bus = EventBus()
+        queue = bus.subscribe()
+        watcher = ConfigWatcher(path, original, apply, env={}, event_bus=bus)
+
+        _write(path, "", 2_000_000_000)
+        assert await watcher.check() is None
+        assert watcher.config is original
+        assert queue.get_nowait().severity.name == "WARNING"
+
+        path.unlink()
+        assert await watcher.check() is None
+        assert watcher.config is original
+
+        _write(path, "trains:\n  - id: t1\n    name: Tram\n  - id: t2\n    name: Bus\n", 3_000_000_000)
+        try:
+            await watcher.check()
+        except RuntimeError:
+            pass
+        assert watcher.config is original
+
+        fail[0] = False
+        _write(path, "trains:\n  - id: t1\n    name: Tram\n  - id: t2\n    name: Bus\n", 4_000_000_000)
+        diff = await watcher.check()
+        assert diff is not None and [train.identifier for train in diff.added] == ["t2"]
+        assert [train.identifier for train in watcher.config.trains] == ["t1", "t2"]
+
+    run(scenario())
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from legotrains.connection_backoff import BackoffPolicy, ConnectionBackoff, ConnectionBackoffError
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_backoff_grows_exponentially_within_jitter() -> None:
+    clock = FakeClock()
+    backoff = ConnectionBackoff(
+        BackoffPolicy(base=1.0, factor=2.0, jitter=0.5, failure_threshold=10),
+        clock=clock,
+        rng=random.Random(7),
+    )
+
+    for failures, ceiling in enumerate((1.0, 2.0, 4.0, 8.0), start=1):
+        backoff.record_failure("freight")
+        with pytest.raises(ConnectionBackoffError) as info:
+            backoff.check("freight")
+        assert ceiling / 2 <= info.value.retry_in <= ceiling
+        assert backoff.failures("freight") == failures
+        clock.now += ceiling
+
+    backoff.check("freight")
+    backoff.record_success("freight")
+    assert backoff.failures("freight") == 0
+
+
+def test_circuit_opens_after_threshold_and_half_opens_after_cooldown() -> None:
+    clock = FakeClock()
+    backoff = ConnectionBackoff(
+        BackoffPolicy(base=0.1, failure_threshold=3, cooldown=30.0),
+        clock=clock,
+    )
+
+    assert [backoff.record_failure("freight") for _ in range(3)] == [False, False, True]
+    assert backoff.is_open("freight")
+    clock.now = 29.0
+    with pytest.raises(ConnectionBackoffError) as info:
+        backoff.check("freight")
+    assert info.value.circuit_open
+
+    clock.now = 31.0
+    backoff.check("freight")  # one trial attempt allowed
+    assert backoff.record_failure("freight") is False  # still open, reopened for another cooldown
+    with pytest.raises(ConnectionBackoffError):
+        backoff.check("freight")
+    backoff.check("passenger")
@@ -7,6 +7,7 @@ from legotrains.control_commands import TrainCommandHandler, clamp_speed
 from legotrains.control_input import CommandType, InputCommand
 from legotrains.hardware_connection import HubConnectionManager
 from legotrains.hardware_registry import HubRegistry
+from legotrains.state import EventBus
 
 
 class FakeConnections:
@@ -64,3 +65,47 @@ def test_stop_command_calls_stop(monkeypatch) -> None:
         assert fake_connections.stop_calls == ["freight"]
 
     run(scenario())
+
+
+def test_submitted_steps_accumulate_while_writes_are_pending() -> None:
+    async def scenario() -> None:
+        registry = HubRegistry.from_train_configs(
+            (TrainConfig(identifier="freight", name="Freight", hub_mac="AA:BB"),)
+        )
+        fake_connections = FakeConnections()
+        handler = TrainCommandHandler(registry=registry, connections=fake_connections)  # type: ignore[arg-type]
+        step = InputCommand(train_id="freight", command=CommandType.SPEED_STEP, value=10)
+
+        pending = [handler.submit(step) for _ in range(3)]
+        pending.append(handler.submit(InputCommand(train_id="freight", command=CommandType.SPEED_STOP)))
+        await asyncio.gather(*pending)
+
+        assert fake_connections.speed_calls == []
+        assert fake_connections.stop_calls == ["freight"]
+
+        pending = [handler.submit(step) for _ in range(3)]
+        await asyncio.gather(*pending)
+        assert fake_connections.speed_calls == [("freight", 30)]
+
+    run(scenario())
+
+
+def test_superseded_commands_are_not_logged_as_written() -> None:
+    async def scenario() -> None:
+        registry = HubRegistry.from_train_configs(
+            (TrainConfig(identifier="freight", name="Freight", hub_mac="AA:BB"),)
+        )
+        bus = EventBus()
+        queue = bus.subscribe(maxsize=10)
+        handler = TrainCommandHandler(
+            registry=registry, connections=FakeConnections(), event_bus=bus  # type: ignore[arg-type]
+        )
+        step = InputCommand(train_id="freight", command=CommandType.SPEED_STEP, value=10)
+
+        pending = [handler.submit(step), handler.submit(step)]
+        pending.append(handler.submit(InputCommand(train_id="freight", command=CommandType.SPEED_STOP)))
+        await asyncio.gather(*pending)
+
+        assert [queue.get_nowait().message for _ in range(queue.qsize())] == ["freight stopped"]
+
+    run(scenario())
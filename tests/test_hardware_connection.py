@@ -1,12 +1,16 @@
 from __future__ import annotations
 
 import asyncio
+from pathlib import Path
+from types import SimpleNamespace
 
 import pytest
 
 from typing import Iterable
 
+from legotrains.address_cache import AddressCache
 from legotrains.config import TrainConfig
+from legotrains.connection_backoff import ConnectionBackoffError
 from legotrains.hardware_connection import HubConnectionManager, HubSession
 from legotrains.hardware_registry import HubRegistry
 from legotrains.state import AppState, EventBus, HubConnectionState, StateStore, TrainState
@@ -31,11 +35,13 @@ class FakeSession(HubSession):
 class FakeAdapter:
     def __init__(self) -> None:
         self.targets: list[str] = []
+        self.devices: list[object] = []
         self.session = FakeSession()
         self.should_fail = False
 
-    async def connect(self, target: str) -> HubSession:
+    async def connect(self, target: str, *, device: object | None = None) -> HubSession:
         self.targets.append(target)
+        self.devices.append(device)
         if self.should_fail:
             raise RuntimeError("boom")
         return self.session
@@ -45,6 +51,21 @@ def run(coro):
     return asyncio.run(coro)
 
 
+def test_connect_hands_scanned_device_to_adapter() -> None:
+    async def scenario() -> None:
+        registry = HubRegistry.from_train_configs((TrainConfig(identifier="freight", name="Freight"),))
+        adapter = FakeAdapter()
+        manager = HubConnectionManager(registry, adapter, loop=asyncio.get_running_loop())
+        advertisement = object()
+
+        await manager.connect("freight", device=advertisement)
+
+        assert adapter.targets == ["Freight"]
+        assert adapter.devices == [advertisement]
+
+    run(scenario())
+
+
 def test_connect_invoked_updates_state() -> None:
     async def scenario() -> None:
         configs = (
@@ -114,6 +135,179 @@ def test_connect_failure_updates_state_and_emits_event() -> None:
         assert event.type == "hub_connect_failed"
 
     run(scenario())
+
+
+def test_shutdown_commits_all_disconnects_in_one_update() -> None:
+    async def scenario() -> None:
+        registry = HubRegistry.from_train_configs(
+            (
+                TrainConfig(identifier="freight", name="Freight", hub_mac="AA:BB:CC:01"),
+                TrainConfig(identifier="passenger", name="Passenger", hub_mac="AA:BB:CC:02"),
+            )
+        )
+        state_store = StateStore(AppState(trains=registry.train_states()))
+        manager = HubConnectionManager(
+            registry, FakeAdapter(), loop=asyncio.get_running_loop(), state_store=state_store
+        )
+        await manager.connect("freight")
+        await manager.connect("passenger")
+        version = state_store.version
+
+        await manager.shutdown()
+
+        assert state_store.version == version + 1
+        snapshot = await state_store.snapshot()
+        assert all(
+            train.hub.connection_state == HubConnectionState.DISCONNECTED for train in snapshot.trains
+        )
+
+    run(scenario())
+
+
+def test_wait_until_connected_resolves_after_connect() -> None:
+    async def scenario() -> None:
+        registry = HubRegistry.from_train_configs(
+            (TrainConfig(identifier="freight", name="Freight", hub_mac="AA:BB:CC:01"),)
+        )
+        state_store = StateStore(AppState(trains=registry.train_states()))
+        manager = HubConnectionManager(
+            registry, FakeAdapter(), loop=asyncio.get_running_loop(), state_store=state_store
+        )
+
+        waiter = asyncio.create_task(manager.wait_until_connected("freight", timeout=1))
+        await asyncio.sleep(0)
+        assert not waiter.done()
+        await manager.connect("freight")
+
+        await waiter
+
+    run(scenario())
+
+
+def test_add_and_remove_train_keep_other_sessions() -> None:
+    async def scenario() -> None:
+        registry = HubRegistry.from_train_configs(
+            (TrainConfig(identifier="freight", name="Freight", hub_mac="AA:BB:CC:01"),)
+        )
+        state_store = StateStore(AppState(trains=registry.train_states()))
+        adapter = FakeAdapter()
+        manager = HubConnectionManager(
+            registry, adapter, loop=asyncio.get_running_loop(), state_store=state_store
+        )
+        await manager.connect("freight")
+        freight_session = adapter.session
+
+        adapter.session = FakeSession()
+        await manager.add_train(TrainConfig(identifier="passenger", name="Passenger", hub_mac="AA:BB:CC:02"))
+        await manager.connect("passenger")
+        await manager.remove_train("passenger")
+
+        assert adapter.session.closed
+        assert not freight_session.closed
+        assert [train.identifier for train in (await state_store.snapshot()).trains] == ["freight"]
+        with pytest.raises(KeyError):
+            registry.get("passenger")
+        await manager.set_speed("freight", 30)
+        assert freight_session.speeds == [30]
+
+    run(scenario())
+
+
+class BrokenCloseSession(FakeSession):
+    async def close(self) -> None:
+        raise RuntimeError("BLE disconnect failed")
+
+
+def test_remove_train_completes_when_close_fails() -> None:
+    async def scenario() -> None:
+        registry = HubRegistry.from_train_configs(
+            (TrainConfig(identifier="freight", name="Freight", hub_mac="AA:BB:CC:01"),)
+        )
+        state_store = StateStore(AppState(trains=registry.train_states()))
+        adapter = FakeAdapter()
+        adapter.session = BrokenCloseSession()
+        bus = EventBus()
+        queue = bus.subscribe(maxsize=10, types="hub_close_failed")
+        manager = HubConnectionManager(
+            registry, adapter, event_bus=bus, loop=asyncio.get_running_loop(), state_store=state_store
+        )
+        await manager.connect("freight")
+
+        await manager.remove_train("freight")
+
+        assert queue.get_nowait().payload == {"train": "freight"}
+        assert (await state_store.snapshot()).trains == ()
+        assert manager.active_sessions() == {}
+        with pytest.raises(KeyError):
+            registry.get("freight")
+        await manager.add_train(TrainConfig(identifier="freight", name="Freight", hub_mac="AA:BB:CC:01"))
+
+    run(scenario())
+
+
+def test_update_train_reconnects_only_when_target_changes() -> None:
+    async def scenario() -> None:
+        registry = HubRegistry.from_train_configs(
+            (
+                TrainConfig(identifier="freight", name="Freight", hub_mac="AA:BB:CC:01"),
+                TrainConfig(identifier="passenger", name="Passenger", hub_mac="AA:BB:CC:02"),
+            )
+        )
+        adapter = FakeAdapter()
+        manager = HubConnectionManager(registry, adapter, loop=asyncio.get_running_loop())
+        await manager.connect("freight")
+        freight_session = adapter.session
+        adapter.session = passenger_session = FakeSession()
+        await manager.connect("passenger")
+        adapter.session = FakeSession()
+
+        await manager.update_train(TrainConfig(identifier="passenger", name="Express", hub_mac="AA:BB:CC:02"))
+        assert registry.get("passenger").state.name == "Express"
+
+        await manager.update_train(TrainConfig(identifier="freight", name="Freight", hub_mac="AA:BB:CC:09"))
+        assert freight_session.closed
+        assert not passenger_session.closed
+        assert adapter.targets[-1] == "AA:BB:CC:09"
+        assert registry.find_by_mac("AA:BB:CC:09").config.identifier == "freight"
+
+    run(scenario())
+
+
+def test_connect_times_out_and_backs_off() -> None:
+    async def scenario() -> None:
+        registry = HubRegistry.from_train_configs(
+            (TrainConfig(identifier="freight", name="Freight", hub_mac="AA:BB:CC:01"),)
+        )
+        adapter = HangingAdapter()
+        bus = EventBus()
+        queue = bus.subscribe(maxsize=10)
+        manager = HubConnectionManager(
+            registry, adapter, event_bus=bus, loop=asyncio.get_running_loop(), connect_timeout=0.01
+        )
+
+        with pytest.raises(asyncio.TimeoutError):
+            await manager.connect("freight")
+        with pytest.raises(ConnectionBackoffError):
+            await manager.connect("freight")
+
+        assert adapter.attempts == 1
+        assert registry.get("freight").state.hub.connection_state == HubConnectionState.DISCONNECTED
+        assert (await queue.get()).type == "hub_connecting"
+        assert "timed out" in (await queue.get()).message
+
+    run(scenario())
+
+
+class HangingAdapter:
+    def __init__(self) -> None:
+        self.attempts = 0
+
+    async def connect(self, target: str) -> HubSession:
+        self.attempts += 1
+        await asyncio.Event().wait()
+        raise AssertionError("unreachable")
+
+
 class FakeStateStore(StateStore):
     def __init__(self) -> None:
         super().__init__(AppState(trains=()))
@@ -122,3 +316,29 @@ class FakeStateStore(StateStore):
     async def upsert_trains(self, trains: Iterable[TrainState]):
         await super().upsert_trains(trains)
         self.updates.append(tuple(state.identifier for state in trains))
+
+
+def test_name_only_train_connects_at_cached_address_and_forgets_it_on_failure(tmp_path: Path) -> None:
+    async def scenario() -> None:
+        registry = HubRegistry.from_train_configs((TrainConfig(identifier="freight", name="Freight"),))
+        cache = AddressCache(tmp_path / "addresses.json")
+        cache.remember("Freight", "AA:BB:CC:DD:EE:01")
+        adapter = FakeAdapter()
+        manager = HubConnectionManager(
+            registry, adapter, loop=asyncio.get_running_loop(), address_cache=cache
+        )
+
+        adapter.should_fail = True
+        with pytest.raises(RuntimeError):
+            await manager.connect("freight")
+        assert adapter.targets == ["AA:BB:CC:DD:EE:01"]
+        assert cache.get("Freight") is None
+        assert manager.backoff.failures("freight") == 0  # straight back to name discovery
+
+        adapter.should_fail = False
+        await manager.connect("freight", device=SimpleNamespace(address="AA:BB:CC:DD:EE:02"))
+        reloaded = AddressCache.load(tmp_path / "addresses.json")
+        entry = reloaded.get("freight")
+        assert entry is not None and entry.address == "AA:BB:CC:DD:EE:02"
+
+    run(scenario())
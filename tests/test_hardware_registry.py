@@ -66,3 +66,49 @@ def test_train_states_snapshot() -> None:
     states = registry.train_states()
     assert len(states) == 2
     assert {state.identifier for state in states} == {"freight", "passenger"}
+
+
+def test_unchanged_updates_are_suppressed() -> None:
+    registry = HubRegistry.from_train_configs(
+        (TrainConfig(identifier="freight", name="Freight", hub_mac=None),)
+    )
+    hub = registry.update_hub_state("freight", connection_state=HubConnectionState.CONNECTED, rssi=-60)
+    state = registry.set_speed("freight", 30)
+
+    assert registry.update_hub_state("freight", connection_state=HubConnectionState.CONNECTED) is hub
+    assert registry.set_speed("freight", 30) is state
+    assert registry.get("freight").state is state
+    assert registry.suppressed_updates == 2
+
+
+def test_lookups_return_current_state_and_first_duplicate() -> None:
+    registry = HubRegistry.from_train_configs(
+        (
+            TrainConfig(identifier="freight", name="Cargo", hub_mac="aa:bb:cc:00:00:01"),
+            TrainConfig(identifier="spare", name="cargo", hub_mac="AA:BB:CC:00:00:01"),
+        )
+    )
+    updated = registry.set_speed("freight", 40)
+
+    by_mac = registry.find_by_mac("AA:BB:CC:00:00:01")
+    by_name = registry.find_by_name("CARGO")
+    assert by_mac is not None and by_mac.state is updated
+    assert by_name is not None and by_name.config.identifier == "freight"
+
+
+def test_add_and_remove_train_update_indexes() -> None:
+    registry = HubRegistry.from_train_configs(
+        (
+            TrainConfig(identifier="freight", name="Cargo", hub_mac="AA:01"),
+            TrainConfig(identifier="spare", name="Cargo", hub_mac=None),
+        )
+    )
+    registry.add_train(TrainConfig(identifier="passenger", name="Express", hub_mac="aa:02"))
+
+    assert registry.find_by_mac("AA:02").config.identifier == "passenger"
+    assert registry.find_by_name("express").config.identifier == "passenger"
+
+    registry.remove_train("freight")
+    assert registry.find_by_mac("AA:01") is None
+    assert registry.find_by_name("cargo").config.identifier == "spare"
+    assert [train.config.identifier for train in registry] == ["spare", "passenger"]
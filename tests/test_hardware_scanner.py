@@ -3,7 +3,9 @@ from __future__ import annotations
 import asyncio
 from typing import Iterable, List
 
+from legotrains.address_cache import AddressCache
 from legotrains.config import TrainConfig
+from legotrains.connection_scheduler import ConnectionScheduler
 from legotrains.hardware_registry import HubRegistry
 from legotrains.hardware_scanner import BleScannerService, ScanResult
 from legotrains.state import EventBus
@@ -30,7 +32,10 @@ def test_scanner_publishes_events_for_known_macs() -> None:
                 TrainConfig(identifier="freight", name="Freight", hub_mac="AA:BB:CC:01"),
             )
         )
-        backend = FakeScannerBackend([ScanResult(address="aa:bb:cc:01", name="Freight")])
+        advertisement = object()
+        backend = FakeScannerBackend(
+            [ScanResult(address="aa:bb:cc:01", name="Freight", device=advertisement)]
+        )
         bus = EventBus()
         queue = bus.subscribe(maxsize=5)
 
@@ -44,16 +49,98 @@ def test_scanner_publishes_events_for_known_macs() -> None:
             connection_manager=manager,
         )
         await scanner._perform_scan()
+        assert scanner.scheduler is not None
+        await scanner.scheduler.join()
 
         event = await queue.get()
         assert event.type == "hub_discovered"
         assert event.payload["train"] == "freight"
         assert manager.calls == ["freight"]
+        assert manager.devices == [advertisement]
 
     run(scenario())
-class FakeConnectionManager:
+
+
+def test_scanner_connects_in_parallel_with_bounded_concurrency() -> None:
+    async def scenario() -> None:
+        registry = HubRegistry.from_train_configs(
+            tuple(TrainConfig(identifier=f"t{index}", name=f"Train{index}") for index in range(4))
+        )
+        backend = FakeScannerBackend([ScanResult(address=f"00:{index}", name=f"Train{index}") for index in range(4)])
+        manager = SlowConnectionManager()
+        scanner = BleScannerService(
+            registry,
+            backend,
+            loop=asyncio.get_running_loop(),
+            scheduler=ConnectionScheduler(manager.connect, max_concurrent=2),
+        )
+
+        await scanner._perform_scan()
+        await scanner._perform_scan()  # duplicates of in-flight connects are ignored
+        assert scanner.scheduler is not None
+        await asyncio.sleep(0)
+        assert scanner.scheduler.in_flight == 2
+        manager.release.set()
+        await scanner.scheduler.join()
+
+        assert sorted(manager.calls) == ["t0", "t1", "t2", "t3"]
+        assert manager.peak == 2
+
+    run(scenario())
+
+
+def test_scanner_dials_cached_trains_before_first_scan(tmp_path) -> None:
+    async def scenario() -> None:
+        registry = HubRegistry.from_train_configs(
+            (
+                TrainConfig(identifier="freight", name="Freight"),
+                TrainConfig(identifier="tram", name="Tram"),
+            )
+        )
+        cache = AddressCache(tmp_path / "addresses.json")
+        cache.remember("Freight", "AA:BB:CC:DD:EE:01")
+        backend = FakeScannerBackend([])
+        manager = FakeConnectionManager()
+        scanner = BleScannerService(
+            registry,
+            backend,
+            loop=asyncio.get_running_loop(),
+            connection_manager=manager,
+            address_cache=cache,
+        )
+
+        scanner._connect_cached()
+        assert scanner.scheduler is not None
+        await scanner.scheduler.join()
+
+        assert manager.calls == ["freight"]
+        assert backend.calls == 0
+
+    run(scenario())
+
+
+class SlowConnectionManager:
     def __init__(self) -> None:
         self.calls: list[str] = []
+        self.release = asyncio.Event()
+        self.active = 0
+        self.peak = 0
 
     async def connect(self, identifier: str, *, rssi: float | None = None) -> None:
         self.calls.append(identifier)
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await self.release.wait()
+        self.active -= 1
+
+
+class FakeConnectionManager:
+    def __init__(self) -> None:
+        self.calls: list[str] = []
+        self.devices: list[object] = []
+
+    async def connect(
+        self, identifier: str, *, rssi: float | None = None, device: object | None = None
+    ) -> None:
+        self.calls.append(identifier)
+        self.devices.append(device)
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from legotrains.hardware.hub_worker import HubWorker
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_worker_runs_calls_in_order_on_one_thread() -> None:
+    async def scenario() -> None:
+        worker = HubWorker("freight")
+        seen: list[tuple[int, str]] = []
+
+        def record(index: int) -> int:
+            time.sleep(0.001)
+            seen.append((index, threading.current_thread().name))
+            return index
+
+        results = await asyncio.gather(*(worker.run(record, index) for index in range(5)))
+        worker.shutdown(wait=True)
+
+        assert results == [0, 1, 2, 3, 4]
+        assert [index for index, _ in seen] == [0, 1, 2, 3, 4]
+        assert len({name for _, name in seen}) == 1
+        assert seen[0][1].startswith("legotrains-hub-freight")
+        metrics = worker.metrics()
+        assert metrics.completed == 5
+        assert metrics.queue_depth == 0
+        assert metrics.max_queue_depth == 5
+        assert metrics.max_wait >= metrics.mean_wait > 0
+
+    run(scenario())
+
+
+def test_slow_hub_does_not_delay_another() -> None:
+    async def scenario() -> None:
+        slow, fast = HubWorker("slow"), HubWorker("fast")
+        release = threading.Event()
+        blocked = asyncio.ensure_future(slow.run(release.wait, 1))
+
+        assert await asyncio.wait_for(fast.run(lambda: "ok"), timeout=0.5) == "ok"
+        release.set()
+        await blocked
+        for worker in (slow, fast):
+            worker.shutdown(wait=True)
+        with pytest.raises(RuntimeError):
+            await fast.run(lambda: None)
+        assert fast.metrics().queue_depth == 0
+
+    run(scenario())
+
+
+def test_cancelled_calls_release_depth_and_discard_late_results() -> None:
+    async def scenario() -> None:
+        worker = HubWorker("freight")
+        release = threading.Event()
+        discarded: list[str] = []
+
+        running = asyncio.ensure_future(
+            worker.run(release.wait, 1, discard=lambda _: discarded.append("late"))
+        )
+        queued = asyncio.ensure_future(worker.run(lambda: "never"))
+        await asyncio.sleep(0.01)
+        running.cancel()
+        queued.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await running
+        with pytest.raises(asyncio.CancelledError):
+            await queued
+
+        release.set()
+        worker.shutdown(wait=True)
+
+        assert discarded == ["late"]
+        assert worker.metrics().queue_depth == 0
+
+    run(scenario())
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+
+from legotrains.journal import EventJournal, JournalReader, segment_paths
+from legotrains.state import Event, EventBus, EventSeverity
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_journal_round_trips_events(tmp_path: Path) -> None:
+    async def scenario() -> None:
+        bus = EventBus()
+        journal = EventJournal(bus, tmp_path)
+        journal.start()
+
+        bus.publish_nowait(Event(type="command", message="freight speed set to 20"))
+        bus.publish_nowait(
+            Event(
+                type="hub_connect_failed",
+                message="Failed to connect passenger",
+                severity=EventSeverity.ERROR,
+                payload={"train": "passenger", "attempt": 3},
+            )
+        )
+        await journal.stop()
+
+    run(scenario())
+
+    records = list(JournalReader(tmp_path))
+    assert [record.sequence for record in records] == [1, 2]
+    assert records[0].message == "freight speed set to 20"
+    assert records[0].train is None
+    assert records[1].severity == EventSeverity.ERROR
+    assert records[1].train == "passenger"
+    assert records[1].payload == {"attempt": 3}
+
+
+def test_journal_rotates_segments_and_filters(tmp_path: Path) -> None:
+    async def scenario() -> None:
+        bus = EventBus()
+        journal = EventJournal(bus, tmp_path, segment_bytes=256)
+        journal.start()
+        for index in range(20):
+            train = "freight" if index % 2 else "passenger"
+            bus.publish_nowait(Event(type="hub_connected", message=f"#{index}", payload={"train": train}))
+            bus.publish_nowait(Event(type="scanner_log", message=f"scan {index}"))
+            await asyncio.sleep(0)
+        await journal.stop()
+
+    run(scenario())
+
+    assert len(segment_paths(tmp_path)) > 1
+    reader = JournalReader(tmp_path)
+    assert len(list(reader)) == 40
+    freight = list(reader.records(types="hub_", train="freight"))
+    assert [record.message for record in freight] == [f"#{index}" for index in range(1, 20, 2)]
+
+
+def test_reader_ignores_truncated_tail(tmp_path: Path) -> None:
+    async def scenario() -> None:
+        bus = EventBus()
+        journal = EventJournal(bus, tmp_path)
+        journal.start()
+        bus.publish_nowait(Event(type="command", message="one"))
+        bus.publish_nowait(Event(type="command", message="two"))
+        await journal.stop()
+
+    run(scenario())
+    segment = segment_paths(tmp_path)[-1]
+    segment.write_bytes(segment.read_bytes()[:-3])
+
+    assert [record.message for record in JournalReader(tmp_path)] == ["one"]
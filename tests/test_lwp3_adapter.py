@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Callable
+
+import pytest
+
+from legotrains.hardware.lwp3_adapter import (
+    LWP3_CHARACTERISTIC_UUID,
+    Lwp3Adapter,
+    Lwp3HubSession,
+    FEEDBACK_COMPLETED,
+    FEEDBACK_DISCARDED,
+    FEEDBACK_IDLE,
+    decode_attached_io,
+    decode_port_feedback,
+    encode_start_power,
+)
+
+
+class FakeGattPeripheral:
+    """In-process stand-in for a hub: records writes and pushes notifications."""
+
+    def __init__(self, attached: list[bytes] | None = None) -> None:
+        self.attached = attached or []
+        self.writes: list[tuple[bytes, bool | None]] = []
+        self.is_connected = False
+        self._notify: Callable[[Any, bytearray], Any] | None = None
+        self._on_disconnect: Callable[[Any], None] | None = None
+
+    def client(self, device: Any, on_disconnect: Callable[[Any], None]) -> "FakeGattPeripheral":
+        self._on_disconnect = on_disconnect
+        return self
+
+    async def connect(self) -> None:
+        self.is_connected = True
+
+    async def disconnect(self) -> None:
+        self.is_connected = False
+
+    async def start_notify(self, char_specifier: str, callback: Callable[[Any, bytearray], Any]) -> None:
+        assert char_specifier == LWP3_CHARACTERISTIC_UUID
+        self._notify = callback
+        for message in self.attached:
+            asyncio.get_running_loop().call_soon(callback, None, bytearray(message))
+
+    async def write_gatt_char(self, char_specifier: str, data: bytes, response: bool | None = None) -> None:
+        self.writes.append((bytes(data), response))
+
+    def feedback(self, port: int, flags: int) -> None:
+        assert self._notify is not None
+        self._notify(None, bytearray((0x05, 0x00, 0x82, port, flags)))
+
+    def drop_link(self) -> None:
+        self.is_connected = False
+        assert self._on_disconnect is not None
+        self._on_disconnect(self)
+
+
+async def _resolve(target: str) -> str:
+    return target
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_encode_start_power_frames_port_output_command() -> None:
+    assert encode_start_power(0x01, 50) == bytes((0x08, 0x00, 0x81, 0x01, 0x11, 0x51, 0x00, 50))
+    assert encode_start_power(0x00, -150)[-1] == (-100) & 0xFF
+    assert decode_attached_io(bytes((0x0F, 0x00, 0x04, 0x01, 0x01, 0x02, 0x00))) == (1, 1, 2)
+
+
+def test_adapter_discovers_motor_port_and_writes_without_response() -> None:
+    async def scenario() -> None:
+        hub = FakeGattPeripheral(
+            attached=[
+                bytes((0x0F, 0x00, 0x04, 0x32, 0x01, 0x17, 0x00)),  # LED on internal port
+                bytes((0x0F, 0x00, 0x04, 0x01, 0x01, 0x02, 0x00)),  # train motor on port B
+            ]
+        )
+        adapter = Lwp3Adapter(client_factory=hub.client, resolve_device=_resolve, port_timeout=0.5)
+
+        session = await adapter.connect("AA:BB:CC:DD:EE:01")
+        assert isinstance(session, Lwp3HubSession)
+        assert session.port == 0x01
+        await session.set_speed(40)
+        await session.stop()
+
+        assert hub.writes == [
+            (encode_start_power(0x01, 40), False),
+            (encode_start_power(0x01, 0), False),
+        ]
+
+    run(scenario())
+
+
+def test_session_reports_link_loss() -> None:
+    async def scenario() -> None:
+        hub = FakeGattPeripheral()
+        adapter = Lwp3Adapter(client_factory=hub.client, resolve_device=_resolve, port_timeout=0.01)
+        session = await adapter.connect("Freight")
+        assert session.port == 0x00  # fell back to port A
+        lost: list[bool] = []
+        session.add_disconnect_callback(lambda: lost.append(True))
+
+        hub.drop_link()
+
+        assert lost == [True]
+        with pytest.raises(RuntimeError):
+            await session.probe()
+        with pytest.raises(RuntimeError):
+            await session.set_speed(10)
+
+    run(scenario())
+
+
+def test_connect_uses_scanned_device_without_resolving() -> None:
+    async def unreachable(target: str) -> None:
+        raise AssertionError("connect must not rescan when given the advertisement")
+
+    async def scenario() -> None:
+        hub = FakeGattPeripheral()
+        devices: list[Any] = []
+
+        def client(device: Any, on_disconnect: Callable[[Any], None]) -> FakeGattPeripheral:
+            devices.append(device)
+            return hub.client(device, on_disconnect)
+
+        adapter = Lwp3Adapter(client_factory=client, resolve_device=unreachable, port_timeout=0.01)
+        advertisement = object()
+        await adapter.connect("Freight", device=advertisement)
+
+        assert devices == [advertisement]
+
+    run(scenario())
+
+
+def test_connect_fails_when_hub_not_found() -> None:
+    async def missing(target: str) -> None:
+        return None
+
+    adapter = Lwp3Adapter(client_factory=FakeGattPeripheral().client, resolve_device=missing)
+    with pytest.raises(RuntimeError):
+        run(adapter.connect("Ghost"))
+
+
+def test_decode_port_feedback_returns_port_flag_pairs() -> None:
+    assert decode_port_feedback(bytes((0x07, 0x00, 0x82, 0x00, 0x0A, 0x01, 0x02))) == [(0, 0x0A), (1, 0x02)]
+    assert decode_port_feedback(bytes((0x0F, 0x00, 0x04, 0x01, 0x01))) == []
+
+
+def test_session_pipelines_writes_up_to_depth_and_reconciles_feedback() -> None:
+    async def scenario() -> None:
+        hub = FakeGattPeripheral()
+        adapter = Lwp3Adapter(
+            client_factory=hub.client, resolve_device=_resolve, port_timeout=0.01, pipeline_depth=2
+        )
+        session = await adapter.connect("Freight")
+
+        await session.set_speed(10)
+        await session.set_speed(20)
+        assert session.in_flight == 2
+        third = asyncio.create_task(session.set_speed(30))
+        await asyncio.sleep(0.01)
+        assert len(hub.writes) == 2  # pipeline full until the hub reports back
+
+        hub.feedback(0x00, FEEDBACK_COMPLETED | FEEDBACK_IDLE)
+        await third
+        assert len(hub.writes) == 3
+        assert session.acknowledged_power == 10
+
+        hub.feedback(0x01, FEEDBACK_COMPLETED)  # another port: ignored
+        hub.feedback(0x00, FEEDBACK_DISCARDED | FEEDBACK_COMPLETED)
+        await session.flush()
+        assert session.in_flight == 0
+        assert session.acknowledged_power == 30
+        assert (session.stats.sent, session.stats.completed, session.stats.discarded) == (3, 2, 1)
+
+    run(scenario())
+
+
+def test_session_writes_off_commands_whose_feedback_never_arrives() -> None:
+    async def scenario() -> None:
+        hub = FakeGattPeripheral()
+        await hub.connect()
+        session = Lwp3HubSession(hub, pipeline_depth=1, feedback_timeout=0.01)
+
+        await session.set_speed(10)
+        await session.set_speed(20)  # waits out the lost acknowledgement
+
+        assert len(hub.writes) == 2
+        assert session.stats.unacknowledged == 1
+        assert session.in_flight == 1
+
+    run(scenario())
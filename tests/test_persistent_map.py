@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import pytest
+
+from legotrains.persistent_map import PersistentMap
+
+
+class CollidingKey:
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def __hash__(self) -> int:
+        return 42
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, CollidingKey) and other.name == self.name
+
+
+def test_set_returns_new_map_and_keeps_original() -> None:
+    original = PersistentMap({"freight": 1})
+    updated = original.set("passenger", 2)
+
+    assert dict(original) == {"freight": 1}
+    assert dict(updated) == {"freight": 1, "passenger": 2}
+    assert len(updated) == 2
+
+
+def test_matches_dict_semantics_for_many_keys() -> None:
+    reference: dict[str, int] = {}
+    pmap: PersistentMap[str, int] = PersistentMap()
+    for value in range(2000):
+        key = f"train-{value % 700}"
+        reference[key] = value
+        pmap = pmap.set(key, value)
+    for value in range(0, 700, 3):
+        key = f"train-{value}"
+        del reference[key]
+        pmap = pmap.delete(key)
+
+    assert len(pmap) == len(reference)
+    assert dict(pmap) == reference
+    assert "train-0" not in pmap
+    assert pmap.get("train-1") == reference["train-1"]
+
+
+def test_hash_collisions_are_kept_apart() -> None:
+    first, second = CollidingKey("a"), CollidingKey("b")
+    pmap = PersistentMap([(first, 1), (second, 2)])
+
+    assert pmap[first] == 1
+    assert pmap[second] == 2
+    assert dict(pmap.delete(first)) == {second: 2}
+
+
+def test_delete_missing_key_raises() -> None:
+    with pytest.raises(KeyError):
+        PersistentMap({"freight": 1}).delete("passenger")
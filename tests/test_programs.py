@@ -4,6 +4,9 @@ import asyncio
 
 import pytest
 
+from legotrains.config import TrainConfig
+from legotrains.hardware_connection import HubConnectionManager
+from legotrains.hardware_registry import HubRegistry
 from legotrains.programs import (
     ProgramMetadata,
     TrainProgram,
@@ -12,6 +15,7 @@ from legotrains.programs import (
     load_program,
     register_program,
 )
+from legotrains.state import AppState, EventBus, StateStore
 
 
 class FakeConnections:
@@ -70,3 +74,57 @@ def test_discover_programs(monkeypatch) -> None:
     monkeypatch.setattr("legotrains.programs.import_module", lambda module: fake_import(module))
     discover_programs("programs.one", "programs.two")
     assert calls == ["programs.one", "programs.two"]
+
+
+def test_set_speeds_dispatches_concurrently_and_reports_failures() -> None:
+    async def scenario() -> None:
+        registry = HubRegistry.from_train_configs(
+            (
+                TrainConfig(identifier="freight", name="Freight", hub_mac="AA:BB:CC:01"),
+                TrainConfig(identifier="passenger", name="Passenger", hub_mac="AA:BB:CC:02"),
+                TrainConfig(identifier="tram", name="Tram", hub_mac="AA:BB:CC:03"),
+            )
+        )
+        adapter = SlowAdapter()
+        store = StateStore(AppState(trains=registry.train_states()))
+        manager = HubConnectionManager(registry, adapter, loop=asyncio.get_running_loop(), state_store=store)
+        await manager.connect("freight")
+        await manager.connect("passenger")
+        bus = EventBus()
+        queue = bus.subscribe(maxsize=10)
+        program = load_program("Demo", manager, bus)
+        version = store.version
+
+        started = asyncio.get_running_loop().time()
+        ok = await program.set_speeds({"freight": 20, "passenger": 20, "tram": 20})
+        elapsed = asyncio.get_running_loop().time() - started
+
+        assert not ok
+        assert elapsed < 0.15  # two 0.1s writes overlap instead of queueing
+        assert store.version == version + 1
+        assert {train.identifier: train.speed for train in (await store.snapshot()).trains} == {
+            "freight": 20,
+            "passenger": 20,
+            "tram": 0,
+        }
+        messages = [queue.get_nowait().message for _ in range(queue.qsize())]
+        assert messages[0].startswith("tram:")
+        assert "skew" in messages[1]
+
+    run(scenario())
+
+
+class SlowSession:
+    async def set_speed(self, speed: int) -> None:
+        await asyncio.sleep(0.1)
+
+    async def stop(self) -> None:
+        await asyncio.sleep(0.1)
+
+    async def close(self) -> None:
+        pass
+
+
+class SlowAdapter:
+    async def connect(self, target: str) -> SlowSession:
+        return SlowSession()
@@ -43,3 +43,54 @@ def test_adapter_connects_with_dummy_hub() -> None:
     )
     session = asyncio.run(adapter.connect("Freight"))  # type: ignore[arg-type]
     assert isinstance(session, PylgbstHubSession)
+
+
+class DeadConnection:
+    def is_alive(self) -> bool:
+        return False
+
+
+def test_probe_raises_when_connection_is_dead() -> None:
+    session = PylgbstHubSession(hub=DummyHub(connection=DeadConnection()))  # type: ignore[arg-type]
+
+    try:
+        asyncio.run(session.probe())
+    except RuntimeError:
+        pass
+    else:
+        raise AssertionError("probe should fail for a dead connection")
+
+
+def test_hub_connected_after_timeout_is_disconnected() -> None:
+    import time
+
+    created: list[TrackingHub] = []
+
+    class TrackingHub(DummyHub):
+        def __init__(self, connection=None) -> None:
+            super().__init__(connection)
+            self.disconnected = False
+            created.append(self)
+
+        def disconnect(self) -> None:
+            self.disconnected = True
+
+    def slow_connection_factory(*, hub_mac=None, hub_name=None):
+        time.sleep(0.2)
+        return object()
+
+    async def scenario() -> None:
+        adapter = PylgbstAdapter(
+            connection_factory=slow_connection_factory,
+            hub_cls=TrackingHub,  # type: ignore[arg-type]
+        )
+        try:
+            await asyncio.wait_for(adapter.connect("Freight"), timeout=0.05)
+        except asyncio.TimeoutError:
+            pass
+        else:
+            raise AssertionError("expected the connect to time out")
+        await asyncio.sleep(0.4)
+
+    asyncio.run(scenario())
+    assert [hub.disconnected for hub in created] == [True]
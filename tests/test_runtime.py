@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import asyncio
 
+from legotrains.config import diff_configs, load_config
 from legotrains.runtime import build_runtime
 
 
@@ -9,3 +10,42 @@ def test_build_runtime_initializes_state_store(monkeypatch) -> None:
     runtime = build_runtime()
     snapshot = asyncio.run(runtime.state_store.snapshot())
     assert len(snapshot.trains) >= 1
+
+
+def test_build_runtime_selects_lwp3_adapter(monkeypatch, tmp_path) -> None:
+    from legotrains.hardware.lwp3_adapter import Lwp3Adapter
+
+    monkeypatch.setenv("LEGOTRAINS_CONFIG_FILE", str(tmp_path / "missing.yaml"))
+    monkeypatch.setenv("LEGOTRAINS_HARDWARE_ADAPTER", "lwp3")
+    runtime = build_runtime()
+    assert isinstance(runtime.connection_manager._adapter, Lwp3Adapter)
+
+
+def test_apply_config_reconciles_after_partial_failure(monkeypatch, tmp_path) -> None:
+    path = tmp_path / "config.yaml"
+    path.write_text("trains:\n  - id: freight\n    name: Freight\n", encoding="utf-8")
+    monkeypatch.setenv("LEGOTRAINS_CONFIG_FILE", str(path))
+    monkeypatch.setenv("LEGOTRAINS_HARDWARE_ADAPTER", "lwp3")
+    runtime = build_runtime()
+    old = runtime.config
+    path.write_text(
+        "trains:\n  - id: tram\n    name: Tram\nble:\n  adapter: hci1\n  max_write_rate: 5\n",
+        encoding="utf-8",
+    )
+    new = load_config(path)
+    diff = diff_configs(old, new)
+
+    async def scenario() -> None:
+        # A previous attempt got as far as removing freight and adding tram.
+        await runtime.remove_train("freight")
+        await runtime.add_train(new.trains[0])
+        await runtime.apply_config(new, diff)
+        await runtime.apply_config(new, diff)
+
+    asyncio.run(scenario())
+
+    assert [train.config.identifier for train in runtime.registry] == ["tram"]
+    assert runtime.command_handler.mailbox.max_write_rate == 5.0
+    assert runtime.config is new
+    warnings = [event for event in runtime.event_bus.since(0) if event.type == "restart_required"]
+    assert warnings and warnings[-1].payload == {"settings": ["ble.adapter"]}
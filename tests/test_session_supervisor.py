@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Callable
+
+import pytest
+
+from legotrains.config import TrainConfig
+from legotrains.connection_backoff import BackoffPolicy, ConnectionBackoff
+from legotrains.hardware_connection import HubConnectionManager, HubSession
+from legotrains.hardware_registry import HubRegistry
+from legotrains.session_supervisor import SessionSupervisor
+from legotrains.state import EventBus, HubConnectionState
+
+
+class FlakySession:
+    def __init__(self) -> None:
+        self.speeds: list[int] = []
+        self.fail_writes = False
+        self.alive = True
+        self.closed = False
+        self.callbacks: list[Callable[[], None]] = []
+
+    async def set_speed(self, speed: int) -> None:
+        if self.fail_writes:
+            raise RuntimeError("write failed")
+        self.speeds.append(speed)
+
+    async def stop(self) -> None:
+        self.speeds.append(0)
+
+    async def close(self) -> None:
+        self.closed = True
+
+    async def probe(self) -> None:
+        if not self.alive:
+            raise RuntimeError("gone")
+
+    def add_disconnect_callback(self, callback: Callable[[], None]) -> None:
+        self.callbacks.append(callback)
+
+
+class SessionFactoryAdapter:
+    def __init__(self) -> None:
+        self.sessions: list[FlakySession] = []
+
+    async def connect(self, target: str) -> HubSession:
+        session = FlakySession()
+        self.sessions.append(session)
+        return session
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+async def _setup() -> tuple[HubConnectionManager, SessionFactoryAdapter, HubRegistry, EventBus]:
+    registry = HubRegistry.from_train_configs(
+        (TrainConfig(identifier="freight", name="Freight", hub_mac="AA:BB:CC:01"),)
+    )
+    adapter = SessionFactoryAdapter()
+    bus = EventBus()
+    manager = HubConnectionManager(
+        registry,
+        adapter,
+        event_bus=bus,
+        loop=asyncio.get_running_loop(),
+        backoff=ConnectionBackoff(BackoffPolicy(base=0.01, jitter=0.0)),
+    )
+    await manager.connect("freight")
+    await manager.set_speed("freight", 40)
+    return manager, adapter, registry, bus
+
+
+async def _wait_for_sessions(adapter: SessionFactoryAdapter, count: int) -> None:
+    for _ in range(100):
+        if len(adapter.sessions) >= count and adapter.sessions[-1].speeds:
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("supervisor did not reconnect")
+
+
+def test_failed_write_triggers_reconnect_with_last_speed() -> None:
+    async def scenario() -> None:
+        manager, adapter, registry, bus = await _setup()
+        queue = bus.subscribe(maxsize=20)
+        supervisor = SessionSupervisor(manager)
+        supervisor.start()
+
+        adapter.sessions[0].fail_writes = True
+        adapter.sessions[0].alive = False  # the write failed because the link is gone
+        with pytest.raises(RuntimeError):
+            await manager.set_speed("freight", 60)
+
+        await _wait_for_sessions(adapter, 2)
+        assert adapter.sessions[0].closed  # closed in the background after the loss
+        assert adapter.sessions[1].speeds == [60]
+        assert registry.get("freight").state.hub.connection_state == HubConnectionState.CONNECTED
+        types = [queue.get_nowait().type for _ in range(queue.qsize())]
+        assert types[:3] == ["hub_lost", "hub_connecting", "hub_connected"]
+        await supervisor.stop()
+
+    run(scenario())
+
+
+def test_disconnect_callback_and_probe_detect_loss() -> None:
+    async def scenario() -> None:
+        manager, adapter, _, _ = await _setup()
+        supervisor = SessionSupervisor(manager)
+        supervisor.start()
+
+        adapter.sessions[0].callbacks[0]()
+        await _wait_for_sessions(adapter, 2)
+        assert adapter.sessions[1].speeds == [40]
+
+        adapter.sessions[1].alive = False
+        await supervisor.probe_once()
+        await _wait_for_sessions(adapter, 3)
+        assert adapter.sessions[2].speeds == [40]
+        await supervisor.stop()
+
+    run(scenario())
+
+
+def test_intentional_disconnect_does_not_reconnect() -> None:
+    async def scenario() -> None:
+        manager, adapter, _, _ = await _setup()
+        supervisor = SessionSupervisor(manager)
+        supervisor.start()
+
+        await manager.disconnect("freight")
+        adapter.sessions[0].callbacks[0]()
+        await asyncio.sleep(0.05)
+
+        assert len(adapter.sessions) == 1
+        assert supervisor.reconnecting == frozenset()
+        await supervisor.stop()
+
+    run(scenario())
+
+
+class HungSession(FlakySession):
+    async def close(self) -> None:
+        await asyncio.Event().wait()
+
+
+def test_loss_is_reported_even_when_close_hangs() -> None:
+    async def scenario() -> None:
+        registry = HubRegistry.from_train_configs(
+            (TrainConfig(identifier="freight", name="Freight", hub_mac="AA:BB:CC:01"),)
+        )
+        session = HungSession()
+
+        class Adapter:
+            async def connect(self, target: str) -> HubSession:
+                return session
+
+        manager = HubConnectionManager(registry, Adapter(), loop=asyncio.get_running_loop())
+        await manager.connect("freight")
+        lost: list[str] = []
+        manager.add_session_lost_listener(lost.append)
+
+        await asyncio.wait_for(manager.session_lost("freight", session, "probe timed out"), timeout=0.5)
+
+        assert lost == ["freight"]
+        assert registry.get("freight").state.hub.connection_state == HubConnectionState.DISCONNECTED
+
+    run(scenario())
+
+
+def test_rejected_write_on_live_link_is_not_treated_as_loss() -> None:
+    async def scenario() -> None:
+        manager, adapter, registry, _ = await _setup()
+        supervisor = SessionSupervisor(manager, retry_delay=0.01)
+        supervisor.start()
+
+        adapter.sessions[0].fail_writes = True  # e.g. no motor attached; probe still succeeds
+        with pytest.raises(RuntimeError):
+            await manager.set_speed("freight", 60)
+        await asyncio.sleep(0.05)
+
+        assert len(adapter.sessions) == 1
+        assert registry.get("freight").state.hub.connection_state == HubConnectionState.CONNECTED
+        await supervisor.stop()
+
+    run(scenario())
+
+
+def test_failed_speed_restore_counts_towards_circuit_breaker() -> None:
+    async def scenario() -> None:
+        registry = HubRegistry.from_train_configs(
+            (TrainConfig(identifier="freight", name="Freight", hub_mac="AA:BB:CC:01"),)
+        )
+
+        class DyingAdapter(SessionFactoryAdapter):
+            async def connect(self, target: str) -> HubSession:
+                session = FlakySession()
+                if self.sessions:  # every reconnect dies on its first write
+                    session.fail_writes, session.alive = True, False
+                self.sessions.append(session)
+                return session
+
+        adapter = DyingAdapter()
+        manager = HubConnectionManager(
+            registry,
+            adapter,
+            loop=asyncio.get_running_loop(),
+            backoff=ConnectionBackoff(
+                BackoffPolicy(base=0.001, jitter=0.0, failure_threshold=3, cooldown=60)
+            ),
+        )
+        await manager.connect("freight")
+        await manager.set_speed("freight", 40)
+        supervisor = SessionSupervisor(manager, retry_delay=0.001)
+        supervisor.start()
+
+        adapter.sessions[0].callbacks[0]()
+        for _ in range(100):
+            if manager.backoff.is_open("freight"):
+                break
+            await asyncio.sleep(0.01)
+
+        assert manager.backoff.is_open("freight")
+        assert len(adapter.sessions) == 4  # the first connect plus three failed recoveries
+        await supervisor.stop()
+
+    run(scenario())
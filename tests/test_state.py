@@ -1,9 +1,12 @@
 from __future__ import annotations
 
 import asyncio
+from dataclasses import replace
 
 from typing import Any, Coroutine, List, TypeVar
 
+import pytest
+
 from legotrains.state import (
     AppState,
     Event,
@@ -59,6 +62,82 @@ def test_state_store_update_train() -> None:
     run(scenario())
 
 
+def test_state_store_publishes_deltas_for_changed_trains_only() -> None:
+    async def scenario() -> None:
+        freight = TrainState(identifier="freight", name="Freight")
+        passenger = TrainState(identifier="passenger", name="Passenger")
+        store = StateStore(AppState(trains=(freight, passenger)))
+        deltas = store.subscribe_deltas(maxsize=5)
+
+        await store.upsert_trains([replace(freight, speed=20), passenger])
+
+        delta = deltas.get_nowait()
+        assert delta.identifier == "freight"
+        assert delta.changed == frozenset({"speed"})
+        assert delta.train.speed == 20
+        assert delta.version == store.version == 1
+        assert deltas.empty()
+
+    run(scenario())
+
+
+def test_state_store_transaction_commits_once() -> None:
+    async def scenario() -> None:
+        store = StateStore(
+            AppState(
+                trains=(
+                    TrainState(identifier="freight", name="Freight"),
+                    TrainState(identifier="passenger", name="Passenger"),
+                )
+            )
+        )
+        queue = store.subscribe(maxsize=5)
+        queue.get_nowait()
+
+        async with store.transaction():
+            await store.update_train("freight", speed=20)
+            await store.update_train("passenger", speed=30)
+            await store.update_train("freight", motion=TrainMotion.FORWARD)
+            assert queue.empty()
+
+        assert store.version == 1
+        committed = queue.get_nowait()
+        assert committed.get_train("freight").speed == 20
+        assert committed.get_train("freight").motion == TrainMotion.FORWARD
+        assert committed.get_train("passenger").speed == 30
+        assert queue.empty()
+
+    run(scenario())
+
+
+def test_state_store_transaction_discards_on_error() -> None:
+    async def scenario() -> None:
+        store = StateStore(AppState(trains=(TrainState(identifier="freight", name="Freight"),)))
+
+        with pytest.raises(RuntimeError):
+            async with store.transaction():
+                await store.update_train("freight", speed=20)
+                raise RuntimeError("boom")
+
+        assert store.version == 0
+        assert (await store.snapshot()).get_train("freight").speed == 0
+
+    run(scenario())
+
+
+def test_app_state_with_train_shares_unchanged_trains() -> None:
+    trains = tuple(TrainState(identifier=f"train-{i}", name=f"Train {i}") for i in range(300))
+    state = AppState(trains=trains)
+
+    updated = state.with_train(TrainState(identifier="train-7", name="Train 7", speed=30))
+
+    assert state.get_train("train-7").speed == 0
+    assert updated.get_train("train-7").speed == 30
+    assert updated.get_train("train-8") is state.get_train("train-8")
+    assert [train.identifier for train in updated.trains] == [train.identifier for train in trains]
+    assert updated.get_train("missing") is None
+
+
 def test_event_bus_publish_order() -> None:
     async def scenario() -> None:
         bus = EventBus()
@@ -75,3 +154,187 @@ def test_event_bus_publish_order() -> None:
         assert received == events
 
     run(scenario())
+
+
+def test_event_bus_filtered_subscriptions() -> None:
+    async def scenario() -> None:
+        bus = EventBus()
+        everything = bus.subscribe(maxsize=10)
+        hubs = bus.subscribe(maxsize=10, types="hub_")
+        errors = bus.subscribe(maxsize=10, min_severity=EventSeverity.ERROR)
+        freight = bus.subscribe(maxsize=10, trains="freight")
+
+        await bus.publish(Event(type="scanner_log", message="Found BLE devices"))
+        await bus.publish(Event(type="hub_connected", message="ok", payload={"train": "freight"}))
+        await bus.publish(
+            Event(
+                type="hub_connect_failed",
+                message="boom",
+                severity=EventSeverity.ERROR,
+                payload={"train": "passenger"},
+            )
+        )
+
+        assert [e.type for e in await _collect(everything, 3)] == [
+            "scanner_log",
+            "hub_connected",
+            "hub_connect_failed",
+        ]
+        assert [e.type for e in await _collect(hubs, 2)] == ["hub_connected", "hub_connect_failed"]
+        assert [e.type for e in await _collect(errors, 1)] == ["hub_connect_failed"]
+        assert [e.type for e in await _collect(freight, 1)] == ["hub_connected"]
+        assert hubs.empty() and errors.empty() and freight.empty()
+
+    run(scenario())
+
+
+def test_event_bus_publish_nowait_outside_coroutine() -> None:
+    bus = EventBus()
+    queue = bus.subscribe(maxsize=5)
+
+    bus.publish_nowait(Event(type="command", message="freight speed set to 10"))
+
+    assert queue.get_nowait().message == "freight speed set to 10"
+
+
+def test_event_bus_stamps_sequence_without_copying() -> None:
+    bus = EventBus()
+    queue = bus.subscribe(maxsize=10)
+    event = Event(type="log", message="hello")
+
+    bus.publish_nowait(event)
+    bus.publish_nowait(event)  # republishing must not renumber the first delivery
+
+    first, second = queue.get_nowait(), queue.get_nowait()
+    assert first is event and first.sequence == 1
+    assert second is not event and second.sequence == 2
+
+
+def test_event_bus_replays_history_to_late_subscribers() -> None:
+    bus = EventBus(history_size=3)
+    for index in range(5):
+        bus.publish_nowait(Event(type="hub_connected" if index % 2 else "scanner_log", message=str(index)))
+
+    assert bus.sequence == 5
+    assert [event.message for event in bus.since(0)] == ["2", "3", "4"]
+    assert [event.sequence for event in bus.since(3)] == [4, 5]
+    assert bus.since(5) == []
+
+    late = bus.subscribe(maxsize=10, types="hub_", replay=5)
+    assert late.get_nowait().message == "3"
+    assert late.empty()
+
+
+def test_compact_event_round_trips_to_event() -> None:
+    event = Event(
+        type="hub_connect_failed",
+        message="boom",
+        severity=EventSeverity.ERROR,
+        payload={"train": "freight", "attempt": 2},
+    )
+
+    compact = event.compact()
+
+    assert compact.train == "freight"
+    assert compact.fields == (("attempt", 2),)
+    restored = compact.to_event()
+    assert restored == event
+    assert restored.timestamp == event.timestamp
+    assert not hasattr(compact, "__dict__")
+
+
+def test_state_store_compare_and_swap() -> None:
+    async def scenario() -> None:
+        store = StateStore(AppState(trains=(TrainState(identifier="freight", name="Freight"),)))
+        version = store.version
+
+        swapped = await store.compare_and_swap(version, [TrainState(identifier="freight", name="Freight", speed=10)])
+        stale = await store.compare_and_swap(version, [TrainState(identifier="freight", name="Freight", speed=50)])
+
+        assert swapped is not None and swapped.version == version + 1
+        assert stale is None
+        assert (await store.snapshot()).get_train("freight").speed == 10
+
+    run(scenario())
+
+
+def test_state_store_wait_for_wakes_on_matching_commit() -> None:
+    async def scenario() -> None:
+        store = StateStore(
+            AppState(
+                trains=(
+                    TrainState(identifier="freight", name="Freight"),
+                    TrainState(identifier="passenger", name="Passenger"),
+                )
+            )
+        )
+        calls: list[int] = []
+
+        def fast_freight(state: AppState) -> bool:
+            calls.append(state.version)
+            return state.get_train("freight").speed >= 50
+
+        waiter = asyncio.create_task(store.wait_for(fast_freight, trains=["freight"], timeout=1))
+        await asyncio.sleep(0)
+        await store.update_train("passenger", speed=80)
+        await store.update_train("freight", speed=20)
+        await store.update_train("freight", speed=60)
+
+        state = await waiter
+        assert state.get_train("freight").speed == 60
+        assert calls == [0, 2, 3]
+
+        with pytest.raises(TimeoutError):
+            await store.wait_for(lambda s: False, timeout=0.01)
+
+    run(scenario())
+
+
+def test_state_store_suppresses_unchanged_updates() -> None:
+    async def scenario() -> None:
+        train = TrainState(identifier="freight", name="Freight", speed=20)
+        store = StateStore(AppState(trains=(train,)))
+        queue = store.subscribe_deltas()
+        before = await store.snapshot()
+
+        same = await store.upsert_trains([replace(train)])
+        updated = await store.update_train("freight", speed=20)
+
+        assert same is before
+        assert updated is train
+        assert store.version == 0
+        assert store.suppressed_updates == 2
+        assert queue.empty()
+
+    run(scenario())
+
+
+def test_state_store_remove_train_emits_removal_delta() -> None:
+    async def scenario() -> None:
+        store = StateStore(
+            AppState(
+                trains=(
+                    TrainState(identifier="freight", name="Freight"),
+                    TrainState(identifier="passenger", name="Passenger"),
+                )
+            )
+        )
+        queue = store.subscribe_deltas()
+
+        state = await store.remove_train("freight")
+        delta = queue.get_nowait()
+
+        assert [train.identifier for train in state.trains] == ["passenger"]
+        assert delta.identifier == "freight" and delta.train is None
+        assert delta.version == state.version == 1
+        with pytest.raises(KeyError):
+            await store.remove_train("freight")
+
+        async with store.transaction():
+            await store.upsert_trains([TrainState(identifier="tram", name="Tram")])
+            await store.remove_train("passenger")
+        snapshot = await store.snapshot()
+        assert [train.identifier for train in snapshot.trains] == ["tram"]
+        assert snapshot.version == 2
+
+    run(scenario())
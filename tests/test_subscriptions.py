@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from legotrains.subscriptions import BackpressurePolicy, SubscriberQueue
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_drop_oldest_counts_evictions() -> None:
+    queue: SubscriberQueue[int] = SubscriberQueue(2)
+    for item in range(4):
+        queue.offer(item)
+
+    assert [queue.get_nowait(), queue.get_nowait()] == [2, 3]
+    assert queue.stats.dropped == 2
+    assert queue.stats.delivered == 4
+
+
+def test_drop_newest_keeps_queued_items() -> None:
+    queue: SubscriberQueue[int] = SubscriberQueue(2, policy=BackpressurePolicy.DROP_NEWEST)
+    results = [queue.offer(item) for item in range(3)]
+
+    assert results == [True, True, False]
+    assert [queue.get_nowait(), queue.get_nowait()] == [0, 1]
+    assert queue.stats.dropped == 1
+
+
+def test_coalesce_replaces_pending_item_with_same_key() -> None:
+    queue: SubscriberQueue[tuple[str, int]] = SubscriberQueue(
+        10, policy=BackpressurePolicy.COALESCE, key=lambda item: item[0]
+    )
+    queue.offer(("freight", 10))
+    queue.offer(("passenger", 10))
+    queue.offer(("freight", 20))
+
+    assert queue.qsize() == 2
+    assert queue.get_nowait() == ("freight", 20)
+    assert queue.get_nowait() == ("passenger", 10)
+    assert queue.stats.coalesced == 1
+
+
+def test_coalesce_requires_key() -> None:
+    with pytest.raises(ValueError):
+        SubscriberQueue(1, policy=BackpressurePolicy.COALESCE)
+
+
+def test_block_delivers_overflow_in_order_once_space_frees() -> None:
+    async def scenario() -> None:
+        queue: SubscriberQueue[int] = SubscriberQueue(
+            1, policy=BackpressurePolicy.BLOCK, timeout=1.0, max_overflow=2
+        )
+        for item in range(3):
+            queue.offer(item)
+
+        received = [await queue.get() for _ in range(3)]
+
+        assert received == [0, 1, 2]
+        assert queue.stats.dropped == 0
+
+    run(scenario())
+
+
+def test_block_drops_after_timeout() -> None:
+    async def scenario() -> None:
+        queue: SubscriberQueue[int] = SubscriberQueue(1, policy=BackpressurePolicy.BLOCK, timeout=0.01)
+        queue.offer(0)
+        queue.offer(1)
+        await asyncio.sleep(0.05)
+
+        assert queue.stats.dropped == 1
+        assert queue.get_nowait() == 0
+
+    run(scenario())
+
+
+def test_block_caps_overflow_and_expires_from_arrival() -> None:
+    async def scenario() -> None:
+        queue: SubscriberQueue[int] = SubscriberQueue(2, policy=BackpressurePolicy.BLOCK, timeout=0.05)
+        accepted = [queue.offer(item) for item in range(10_000)]
+
+        assert accepted.count(True) == 4  # two queued, two parked
+        assert queue.stats.dropped == 9_996
+
+        await asyncio.sleep(0.1)  # both parked items expire together, not one timeout after another
+        assert queue.stats.dropped == 9_998
+        assert [queue.get_nowait(), queue.get_nowait()] == [0, 1]
+
+    run(scenario())
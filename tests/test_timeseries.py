@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import math
+
+from legotrains.config import TrainConfig
+from legotrains.hardware_registry import HubRegistry
+from legotrains.state import HubConnectionState, TrainState
+from legotrains.timeseries import TelemetryRecorder, TrainSeries
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_series_window_stats_cover_recent_samples_only() -> None:
+    series = TrainSeries(capacity=8)
+    for second, speed in enumerate([10, 20, 30, 40, 50]):
+        series.append(float(second), TrainState(identifier="freight", name="Freight", speed=speed))
+
+    stats = series.window("speed", 2.0, now=4.0)
+
+    # 30 and 40 each held for one second; 50 was taken at ``now``.
+    assert stats.count == 3
+    assert (stats.minimum, stats.maximum, stats.mean) == (30, 50, 35)
+    assert math.isnan(series.window("battery_level", 10.0, now=4.0).mean)
+
+
+def test_series_window_holds_the_last_value_before_it_opens() -> None:
+    series = TrainSeries(capacity=8)
+    series.append(0.0, TrainState(identifier="freight", name="Freight", speed=50))
+    series.append(100.0, TrainState(identifier="freight", name="Freight", speed=50))
+
+    steady = series.window("speed", 10.0, now=95.0)
+    changed = series.window("speed", 10.0, now=105.0)
+
+    assert (steady.count, steady.minimum, steady.maximum, steady.mean) == (1, 50, 50, 50)
+    assert (changed.count, changed.mean) == (2, 50)
+    assert series.window("speed", 10.0, now=-1.0).count == 0
+
+
+def test_series_window_weights_by_time_across_the_ring_seam() -> None:
+    series = TrainSeries(capacity=4)
+    for second, speed in enumerate([0, 0, 10, 10, 40, 20]):
+        series.append(float(second * 10), TrainState(identifier="freight", name="Freight", speed=speed))
+
+    stats = series.window("speed", 25.0, now=55.0)
+
+    # 10 from 30 to 40, 40 from 40 to 50, 20 from 50 to 55.
+    assert (stats.count, stats.minimum, stats.maximum) == (3, 10, 40)
+    assert stats.mean == (10 * 10 + 40 * 10 + 20 * 5) / 25
+    assert list(series.samples("speed", since=25.0)[1]) == [10.0, 40.0, 20.0]
+
+
+def test_series_wraps_around_capacity() -> None:
+    series = TrainSeries(capacity=3)
+    for second in range(5):
+        series.append(float(second), TrainState(identifier="freight", name="Freight", speed=second))
+
+    timestamps, values = series.samples("speed")
+
+    assert len(series) == 3
+    assert list(timestamps) == [2.0, 3.0, 4.0]
+    assert list(values) == [2.0, 3.0, 4.0]
+
+
+def test_series_downsamples_into_buckets() -> None:
+    series = TrainSeries(capacity=16)
+    for tenth in range(10):
+        series.append(tenth / 2, TrainState(identifier="freight", name="Freight", speed=tenth))
+
+    buckets = series.downsample("speed", 2.0)
+
+    assert [start for start, _ in buckets] == [0.0, 2.0, 4.0]
+    assert [stats.count for _, stats in buckets] == [4, 4, 2]
+    assert buckets[0][1].mean == 1.5
+
+
+def test_registry_records_samples_on_updates() -> None:
+    clock = FakeClock()
+    recorder = TelemetryRecorder(clock=clock)
+    registry = HubRegistry.from_train_configs(
+        (TrainConfig(identifier="freight", name="Freight"),), recorder=recorder
+    )
+
+    registry.update_hub_state("freight", connection_state=HubConnectionState.CONNECTED, battery_level=80.0)
+    clock.now = 1.0
+    registry.set_speed("freight", 40)
+
+    _, speeds = recorder.series("freight").samples("speed")
+    assert list(speeds) == [0.0, 40.0]
+    assert recorder.window("freight", "battery_level", 5.0).mean == 80.0
+    assert recorder.window("freight", "connection", 5.0).maximum == HubConnectionState.CONNECTED.value
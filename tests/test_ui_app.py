@@ -49,3 +49,39 @@ def test_run_program_invokes_registered_program() -> None:
     asyncio.run(app._run_program("FakeProgram"))
 
     assert FakeProgram.called is True
+
+
+def test_panels_resync_when_coalesced_deltas_are_dropped() -> None:
+    from legotrains.state import AppState, StateStore
+
+    async def scenario() -> None:
+        trains = [TrainState(identifier=f"t{index}", name=f"Train {index}") for index in range(150)]
+        store = StateStore(AppState(trains=trains))
+        app = LegoTrainsApp(state_store=store)
+        async with app.run_test() as pilot:
+            async with store.transaction():
+                for train in trains:
+                    await store.update_train(train.identifier, speed=30)
+            for _ in range(50):
+                await pilot.pause(0.01)
+                if all(panel._data.speed == 30 for panel in app._panels.values()):
+                    break
+            assert len(app._panels) == 150
+            assert all(panel._data.speed == 30 for panel in app._panels.values())
+
+    asyncio.run(scenario())
+
+
+def test_program_list_stays_between_the_default_trains() -> None:
+    from legotrains.ui.widgets import ProgramList, TrainPanel
+
+    async def scenario() -> None:
+        app = LegoTrainsApp()
+        async with app.run_test() as pilot:
+            await pilot.pause()
+            children = list(app._main_panels.children)
+            assert [type(child) for child in children] == [TrainPanel, ProgramList, TrainPanel]
+            assert children[0] is app._panels["passenger"]
+            assert children[2] is app._panels["freight"]
+
+    asyncio.run(scenario())